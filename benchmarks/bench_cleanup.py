@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark für die Seitenverarbeitung: Seiten/Sekunde pro Parser-Backend
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from smart_crawler_final import PARSER_BACKENDS, SmartCrawler, render_page  # noqa: E402
+
+
+def build_synthetic_corpus(pages: int, chapters: int):
+    """Erzeugt Bookdown-ähnliche Seiten mit Navigation, Copy-Buttons und Scripts"""
+    nav = "".join(f'<li><a href="chapter-{i}.html">{i} Kapitel {i}</a></li>' for i in range(1, chapters + 1))
+    corpus = []
+    for n in range(pages):
+        sections = "".join(
+            f'<h2 id="s{j}">Abschnitt {j}</h2><p>{"Lorem ipsum dolor sit amet. " * 20}'
+            f'<a href="chapter-{(n + j) % chapters + 1}.html#s{j}">weiter</a></p>'
+            f'<pre><code>print({j})</code><button class="copy-button" title="Copy">Copy</button></pre>'
+            for j in range(20)
+        )
+        corpus.append(
+            f'<html><head><meta charset="utf-8"><link rel="stylesheet" href="style.css">'
+            f'<script>var x = {n};</script><style>body {{}}</style></head>'
+            f'<body><nav class="sidebar"><ul>{nav}</ul></nav><main>{sections}</main>'
+            f'<aside class="toc">TOC</aside></body></html>'
+        )
+    return corpus
+
+
+def load_corpus(corpus_dir: Path):
+    """Liest alle gespeicherten .html-Seiten eines Verzeichnisses"""
+    return [path.read_text(encoding='utf-8', errors='replace') for path in sorted(corpus_dir.glob('*.html'))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für Bereinigung und Konvertierung")
+    parser.add_argument('--corpus', type=Path, help='Verzeichnis mit gespeicherten .html-Seiten')
+    parser.add_argument('--pages', type=int, default=50, help='Anzahl synthetischer Seiten')
+    parser.add_argument('--chapters', type=int, default=100, help='Kapitel in der Navigation')
+    parser.add_argument('--rounds', type=int, default=3, help='Durchläufe pro Messung (bester zählt)')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else build_synthetic_corpus(args.pages, args.chapters)
+    if not corpus:
+        print("❌ Keine Seiten im Korpus gefunden")
+        return
+
+    crawler = SmartCrawler()
+    crawler.chapter_order = [(f"https://example.com/chapter-{i}.html", str(i), f"Kapitel {i}")
+                             for i in range(1, args.chapters + 1)]
+
+    print(f"📄 {len(corpus)} Seiten, {sum(len(page) for page in corpus) / 1024:.0f} KB")
+    print(f"{'Backend':>12s} | {'Format':>6s} | {'Seiten/s':>10s}")
+    print("-" * 36)
+    for backend in PARSER_BACKENDS:
+        if backend != 'html.parser' and importlib.util.find_spec(backend) is None:
+            print(f"{backend:>12s} | {'-':>6s} | {'nicht installiert':>10s}")
+            continue
+        for format_type in ('html', 'md'):
+            link_index = crawler.get_link_index(format_type)
+            best = None
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                for n, html in enumerate(corpus):
+                    render_page(html, f"https://example.com/page-{n}.html", format_type,
+                                include_nav=False, clean_output=True, link_index=link_index, parser=backend)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{backend:>12s} | {format_type:>6s} | {len(corpus) / best:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+End-to-End-Benchmark: crawl_website gegen eine lokale Fixture-Website, beide Ausgabeformate
+
+Jeder Lauf startet in einem frischen Prozess, damit Peak-RSS pro Format vergleichbar ist.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixture_site import build_site, serve  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak-RSS des aktuellen Prozesses in MB (None, wo nicht verfügbar)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_crawl(start_url: str, output_dir: str, format_type: str, options: dict) -> dict:
+    """Führt einen Crawl aus (im Kindprozess) und liefert Durchsatz, Peak-RSS und Stufen-Zeiten"""
+    from smart_crawler_final import SmartCrawler
+
+    crawler = SmartCrawler(concurrency=options['concurrency'], engine=options['engine'],
+                           workers=options['workers'], parser=options['parser'], fsync=False)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(crawler.crawl_website(start_url, output_dir, format_type,
+                                          clean_output=True, depth=options['depth']))
+    elapsed = time.perf_counter() - start
+    summary = crawler.metrics.summary()
+    pages = summary["pages"].get("success", 0)
+    return {
+        "pages": pages,
+        "failed": summary["pages"].get("failed", 0),
+        "elapsed": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {name: stats["sum"] for name, stats in summary["stages"].items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-End-Benchmark gegen eine lokale Fixture-Website")
+    parser.add_argument('--pages', type=int, default=200, help='Anzahl Kapitel der Fixture-Website')
+    parser.add_argument('--page-kb', type=int, default=20, help='Ungefähre Inhaltsgröße pro Seite in KB')
+    parser.add_argument('--links', type=int, default=20, help='Interne Links pro Seite')
+    parser.add_argument('--nav', choices=['flat', 'sections'], default='flat', help='Navigationsstruktur')
+    parser.add_argument('--formats', nargs='+', default=['md', 'html'], help='Zu messende Ausgabeformate')
+    parser.add_argument('-j', '--concurrency', type=int, default=8)
+    parser.add_argument('-e', '--engine', choices=['browser', 'http', 'auto'], default='http',
+                        help='Abruf-Engine (browser benötigt ein eingerichtetes crawl4ai)')
+    parser.add_argument('-w', '--workers', type=int, default=0)
+    parser.add_argument('-P', '--parser', default='html.parser')
+    args = parser.parse_args()
+
+    options = {"concurrency": args.concurrency, "engine": args.engine, "workers": args.workers,
+               "parser": args.parser, "depth": 1 if args.nav == 'sections' else 0}
+
+    with tempfile.TemporaryDirectory(prefix="bench_crawl_") as tmp:
+        root = Path(tmp)
+        start_page = build_site(root / "site", args.pages, args.page_kb, args.links, args.nav)
+        server, base_url = serve(start_page.parent)
+        start_url = f"{base_url}{start_page.name}"
+        print(f"🌐 Fixture: {args.pages} Kapitel à ~{args.page_kb} KB, Navigation '{args.nav}', {start_url}")
+
+        results = {}
+        try:
+            for format_type in args.formats:
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    results[format_type] = executor.submit(
+                        run_crawl, start_url, str(root / f"out_{format_type}"), format_type, options
+                    ).result()
+        finally:
+            server.shutdown()
+
+    print(f"{'Format':>6s} | {'Seiten':>6s} | {'Zeit (s)':>8s} | {'Seiten/s':>8s} | {'Peak RSS (MB)':>13s}")
+    print("-" * 55)
+    for format_type, result in results.items():
+        rss = f"{result['peak_rss_mb']:13.1f}" if result['peak_rss_mb'] is not None else f"{'-':>13s}"
+        print(f"{format_type:>6s} | {result['pages']:6d} | {result['elapsed']:8.2f} | "
+              f"{result['pages_per_sec']:8.1f} | {rss}")
+        if result['failed']:
+            print(f"       ⚠️  {result['failed']} Seiten fehlgeschlagen")
+
+    print()
+    print("Stufen-Zeiten (Summe über alle Seiten, s)")
+    for format_type, result in results.items():
+        stages = ", ".join(f"{name} {seconds:.2f}" for name, seconds in result['stages'].items())
+        print(f"{format_type:>6s}: {stages}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Import-Zeit-Benchmark: Startzeit von Modul und CLI, Wächter gegen schwere Top-Level-Imports
+
+Beendet sich mit Code 1, wenn ein schweres Paket beim Import geladen wird oder die
+Startzeit über --max-ms liegt - geeignet als Regressionstest in CI.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ['crawl4ai', 'playwright', 'bs4', 'requests', 'aiohttp', 'html2text', 'lxml', 'selectolax']
+
+CHECK_MODULES = (
+    "import sys, smart_crawler_final; "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def best_of(command, rounds: int) -> float:
+    """Beste Laufzeit eines Kindprozesses in Millisekunden"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-Zeit-Benchmark für smart_crawler_final")
+    parser.add_argument('--rounds', type=int, default=5, help='Durchläufe pro Messung (bester zählt)')
+    parser.add_argument('--max-ms', type=float, default=500, help='Obergrenze für die CLI-Startzeit')
+    args = parser.parse_args()
+
+    baseline_ms = best_of([sys.executable, '-c', 'pass'], args.rounds)
+    import_ms = best_of([sys.executable, '-c', 'import smart_crawler_final'], args.rounds)
+    help_ms = best_of([sys.executable, 'smart_crawler_final.py', '--help'], args.rounds)
+
+    loaded = subprocess.run([sys.executable, '-c', CHECK_MODULES], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout.strip()
+
+    print(f"{'Messung':>22s} | {'ms':>8s}")
+    print("-" * 33)
+    print(f"{'Python ohne Import':>22s} | {baseline_ms:8.1f}")
+    print(f"{'import':>22s} | {import_ms:8.1f}")
+    print(f"{'--help':>22s} | {help_ms:8.1f}")
+
+    failed = False
+    if loaded:
+        print(f"❌ Schwere Module beim Import geladen: {loaded}")
+        failed = True
+    if help_ms > args.max_ms:
+        print(f"❌ CLI-Start {help_ms:.0f} ms über der Grenze von {args.max_ms:.0f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Keine schweren Module beim Start geladen")
+
+
+if __name__ == "__main__":
+    main()
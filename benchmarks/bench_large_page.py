@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Speicher-Benchmark für sehr große Einzelseiten: normale Verarbeitung gegen den speicherarmen Streaming-Modus
+
+Gemessen wird der zusätzliche Spitzenbedarf des Python-Heaps (tracemalloc) während der
+Verarbeitung einer Seite, dazu die Laufzeit. Das HTML selbst ist in beiden Fällen schon geladen.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from smart_crawler_final import LinkIndex, SmartCrawler, peak_memory, render_page, render_page_streaming  # noqa: E402
+from fixture_site import page_html  # noqa: E402
+from bench_link_index import build_chapter_order  # noqa: E402
+
+
+def measure(function) -> tuple:
+    """(Peak in MB, Sekunden) eines Aufrufs"""
+    start = time.perf_counter()
+    with peak_memory(True) as memory:
+        function()
+    return memory["peak"] / 1024 / 1024, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speicher-Benchmark für sehr große Einzelseiten")
+    parser.add_argument('--mb', type=float, nargs='+', default=[5, 20], help='Seitengrößen in MB')
+    parser.add_argument('--formats', nargs='+', default=['md', 'html'], help='Zu messende Ausgabeformate')
+    parser.add_argument('-P', '--parser', default='html.parser', help='Parser der normalen Verarbeitung')
+    args = parser.parse_args()
+
+    chapter_order = build_chapter_order(200)
+    generate_filename = SmartCrawler().generate_filename
+
+    print(f"{'Größe (MB)':>10s} | {'Format':>6s} | {'Peak normal (MB)':>16s} | {'Peak Stream (MB)':>16s} | "
+          f"{'Zeit normal (s)':>15s} | {'Zeit Stream (s)':>15s}")
+    print("-" * 95)
+    with tempfile.TemporaryDirectory(prefix="bench_large_") as tmp:
+        target = Path(tmp) / "page.out"
+        for size_mb in args.mb:
+            html = page_html("Handbuch", '<nav class="sidebar"><ul><li>Start</li></ul></nav>',
+                             int(size_mb * 1024), 2000, 200, seed=7)
+            for format_type in args.formats:
+                link_index = LinkIndex(chapter_order, format_type, generate_filename)
+                normal = measure(lambda: render_page(html, "https://example.com/book/handbuch.html", format_type,
+                                                     False, True, link_index, args.parser))
+                stream = measure(lambda: render_page_streaming(html, "https://example.com/book/handbuch.html",
+                                                               format_type, False, True, link_index, target))
+                print(f"{len(html) / 1024 / 1024:10.1f} | {format_type:>6s} | {normal[0]:16.1f} | {stream[0]:16.1f} | "
+                      f"{normal[1]:15.2f} | {stream[1]:15.2f}")
+
+
+if __name__ == "__main__":
+    main()
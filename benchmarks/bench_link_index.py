@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark für die Link-Korrektur: Kosten pro Seite bei wachsender Kapitelanzahl
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from smart_crawler_final import SmartCrawler  # noqa: E402
+
+
+def build_chapter_order(count: int):
+    """Erzeugt eine synthetische Kapitel-Reihenfolge"""
+    return [(f"https://example.com/book/chapter-{i}.html", str(i), f"Kapitel Nummer {i}")
+            for i in range(1, count + 1)]
+
+
+def build_markdown_page(count: int, links: int) -> str:
+    """Erzeugt eine Markdown-Seite mit internen .html- und .md-Links"""
+    lines = []
+    for j in range(links):
+        target = (j * 7919) % count + 1
+        if j % 3 == 0:
+            lines.append(f"Siehe [Kapitel {target}]({target:04d}_Kapitel.md#abschnitt)")
+        else:
+            lines.append(f"Weiter mit [Kapitel {target}](chapter-{target}.html#abschnitt)")
+    return "\n".join(lines)
+
+
+def bench(count: int, pages: int, links: int):
+    """Misst Aufbau des Link-Index und die durchschnittliche Zeit pro Seite in Millisekunden"""
+    crawler = SmartCrawler()
+    crawler.chapter_order = build_chapter_order(count)
+    content = build_markdown_page(count, links)
+
+    start = time.perf_counter()
+    crawler.get_link_index('md')
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        crawler.fix_internal_links(content, 'md')
+    return build_ms, (time.perf_counter() - start) / pages * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für fix_internal_links")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--pages', type=int, default=200, help='Seiten pro Messung')
+    parser.add_argument('--links', type=int, default=50, help='Links pro Seite')
+    args = parser.parse_args()
+
+    print(f"{'Kapitel':>8s} | {'Index (ms)':>10s} | {'ms/Seite':>10s}")
+    print("-" * 35)
+    for count in args.sizes:
+        build_ms, page_ms = bench(count, args.pages, args.links)
+        print(f"{count:8d} | {build_ms:10.2f} | {page_ms:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
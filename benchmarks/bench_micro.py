@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmarks für Navigation, Link-Korrektur und Dateinamen bei wachsender Kapitelanzahl
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from smart_crawler_final import SmartCrawler  # noqa: E402
+from bench_link_index import build_chapter_order, build_markdown_page  # noqa: E402
+
+START_URL = "https://example.com/book/index.html"
+
+
+def build_navigation_page(count: int) -> bytes:
+    """Startseite mit Bookdown-Navigation über alle Kapitel (inklusive Unterkapiteln)"""
+    items = "".join(
+        f'<li><a href="chapter-{i}.html">{i} Kapitel {i}</a>'
+        f'<ul><li><a href="chapter-{i}.html#teil">{i}.1 Teil</a></li></ul></li>'
+        for i in range(1, count + 1)
+    )
+    return f'<html><body><nav class="sidebar"><ul>{items}</ul></nav></body></html>'.encode('utf-8')
+
+
+def timed(function, rounds: int) -> float:
+    """Beste Laufzeit in Millisekunden über mehrere Runden"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_navigation(count: int, rounds: int) -> float:
+    """extract_navigation_order ohne Netzwerk: die Navigationsseite liegt bereits vor"""
+    crawler = SmartCrawler()
+    content = build_navigation_page(count)
+    crawler.fetch_navigation_page = lambda url: content
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            crawler.extract_navigation_order(START_URL)
+    return timed(run, rounds)
+
+
+def bench_fix_links(count: int, rounds: int, pages: int, links: int) -> float:
+    """fix_internal_links pro Seite, Link-Index bereits aufgebaut"""
+    crawler = SmartCrawler()
+    crawler.chapter_order = build_chapter_order(count)
+    crawler.get_link_index('md')
+    content = build_markdown_page(count, links)
+
+    def run():
+        for _ in range(pages):
+            crawler.fix_internal_links(content, 'md')
+    return timed(run, rounds) / pages
+
+
+def bench_filenames(count: int, rounds: int) -> float:
+    """generate_filename für alle Kapitel"""
+    crawler = SmartCrawler()
+    chapter_order = build_chapter_order(count)
+
+    def run():
+        for _, chapter_num, title in chapter_order:
+            crawler.generate_filename(chapter_num, title, 'md', count)
+    return timed(run, rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-Benchmarks für Navigation, Links und Dateinamen")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--rounds', type=int, default=3, help='Durchläufe pro Messung (bester zählt)')
+    parser.add_argument('--pages', type=int, default=50, help='Seiten pro Messung der Link-Korrektur')
+    parser.add_argument('--links', type=int, default=50, help='Links pro Seite')
+    args = parser.parse_args()
+
+    print(f"{'Kapitel':>8s} | {'Navigation (ms)':>15s} | {'Links (ms/Seite)':>16s} | {'Dateinamen (ms)':>15s}")
+    print("-" * 65)
+    for count in args.sizes:
+        nav_ms = bench_navigation(count, args.rounds)
+        links_ms = bench_fix_links(count, args.rounds, args.pages, args.links)
+        names_ms = bench_filenames(count, args.rounds)
+        print(f"{count:8d} | {nav_ms:15.2f} | {links_ms:16.3f} | {names_ms:15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Suchindex-Benchmark: Indizierungsdurchsatz und Antwortzeit des Volltextindex über mehrere Sites
+
+Die Seiten bestehen aus Wörtern eines zufälligen Vokabulars mit Zipf-Verteilung, damit häufige
+und seltene Suchbegriffe realistisch verteilt sind.
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from smart_crawler_final import SearchIndex, percentile  # noqa: E402
+
+
+def build_vocabulary(size: int, rng: random.Random) -> list:
+    """Zufällige, aussprechbare Wörter"""
+    syllables = [c + v for c in "bdfgklmnprstwz" for v in "aeiou"]
+    return list({"".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(size)})
+
+
+def build_page(vocabulary: list, cum_weights: list, words: int, chapter: int, rng: random.Random) -> str:
+    """Markdown-Kapitel mit Überschriften und Absätzen aus dem Vokabular"""
+    def pick(k: int) -> str:
+        return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=k))
+    lines = [f"# {chapter} {pick(3)}", ""]
+    for _ in range(0, words, 80):
+        if rng.random() < 0.2:
+            lines += [f"## {pick(2)}", ""]
+        lines += [pick(80), ""]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suchindex-Benchmark: Indizierung und Antwortzeit")
+    parser.add_argument('--sites', type=int, default=5, help='Anzahl Sites im gemeinsamen Index')
+    parser.add_argument('--pages', type=int, default=500, help='Kapitel pro Site')
+    parser.add_argument('--page-kb', type=int, default=20, help='Ungefähre Textgröße pro Kapitel in KB')
+    parser.add_argument('--queries', type=int, default=200, help='Anzahl Suchanfragen')
+    parser.add_argument('--limit', type=int, default=10, help='Treffer pro Anfrage')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    vocabulary = build_vocabulary(20000, rng)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    words = args.page_kb * 1024 // 8
+
+    with tempfile.TemporaryDirectory(prefix="bench_search_") as tmp:
+        index = SearchIndex(str(Path(tmp) / "search.sqlite"), batch_size=256)
+        # Nur das Indizieren wird gemessen, nicht das Erzeugen der Seiten
+        index_seconds = 0.0
+        size = 0
+        for site_number in range(args.sites):
+            site = f"/crawls/site_{site_number}"
+            for i in range(args.pages):
+                text = build_page(vocabulary, cum_weights, words, i + 1, rng)
+                size += len(text)
+                entry = {"url": f"https://site{site_number}.example/ch{i}.html", "filename": f"{i:03d}_Kapitel.md",
+                         "chapter_number": str(i + 1), "title": f"Kapitel {i + 1}", "index": i}
+                start = time.perf_counter()
+                index.update(site, entry, text, 'md')
+                index_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        index.commit()
+        index_seconds += time.perf_counter() - start
+        pages = args.sites * args.pages
+        print(f"📚 {pages} Seiten ({size / 1024 / 1024:.0f} MB Text) in {index_seconds:.1f}s indiziert: "
+              f"{pages / index_seconds:.0f} Seiten/s, Datenbank {Path(index.path).stat().st_size / 1024 / 1024:.0f} MB")
+
+        # Häufige und seltene Einzelbegriffe, dazu Paare aus beiden Bereichen
+        queries = {
+            "häufig": [vocabulary[rng.randint(0, 50)] for _ in range(args.queries)],
+            "selten": [vocabulary[rng.randint(5000, len(vocabulary) - 1)] for _ in range(args.queries)],
+            "zwei Begriffe": [f"{vocabulary[rng.randint(0, 500)]} {vocabulary[rng.randint(0, 5000)]}"
+                              for _ in range(args.queries)],
+        }
+        print(f"{'Anfragen':>14s} | {'p50 (ms)':>8s} | {'p95 (ms)':>8s} | {'max (ms)':>8s} | {'Treffer':>7s}")
+        print("-" * 58)
+        for name, terms in queries.items():
+            timings = []
+            hits = 0
+            for query in terms:
+                start = time.perf_counter()
+                hits += len(index.search(query, args.limit))
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{name:>14s} | {percentile(timings, 0.5):8.2f} | {percentile(timings, 0.95):8.2f} | "
+                  f"{max(timings):8.2f} | {hits / len(terms):7.1f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
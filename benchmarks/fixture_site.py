@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Synthetische Dokumentations-Website mit nummerierten Kapiteln für Benchmarks, lokal ausgeliefert
+"""
+
+import argparse
+import functools
+import http.server
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+FILLER = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. "
+
+
+def chapter_file(i: int) -> str:
+    return f"chapter-{i}.html"
+
+
+def build_site(root: Path, pages: int = 100, page_kb: int = 20, links: int = 20,
+               nav: str = 'flat', section_size: int = 25) -> Path:
+    """Schreibt die Website nach root und gibt den Pfad der Startseite zurück
+
+    nav='flat': Jede Seite enthält die vollständige Kapitel-Navigation (Bookdown-typisch).
+    nav='sections': Die Startseite verweist nur auf Abschnitts-Indexseiten (Crawl mit --depth 1).
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    chapter_items = "".join(f'<li><a href="{chapter_file(i)}">{i} Kapitel {i}</a></li>'
+                            for i in range(1, pages + 1))
+    sections = [range(start, min(start + section_size, pages + 1))
+                for start in range(1, pages + 1, section_size)]
+
+    if nav == 'flat':
+        sidebar = f'<nav class="sidebar"><ul>{chapter_items}</ul></nav>'
+        start_links = sidebar
+    elif nav == 'sections':
+        sidebar = '<nav class="sidebar"><ul><li><a href="index.html">Start</a></li></ul></nav>'
+        start_links = '<nav class="sidebar"><ul>' + "".join(
+            f'<li><a href="section-{n}.html">Teil {n}</a></li>' for n in range(1, len(sections) + 1)
+        ) + '</ul></nav>'
+        for n, members in enumerate(sections, 1):
+            items = "".join(f'<li><a href="{chapter_file(i)}">{i} Kapitel {i}</a></li>' for i in members)
+            (root / f"section-{n}.html").write_text(
+                page_html(f"Teil {n}", f'<nav class="toc"><ul>{items}</ul></nav>', 0, 0, pages),
+                encoding='utf-8')
+    else:
+        raise ValueError(f"Unbekannte Navigationsstruktur: {nav}")
+
+    (root / "index.html").write_text(page_html("Start", start_links, 1, links, pages), encoding='utf-8')
+    for i in range(1, pages + 1):
+        (root / chapter_file(i)).write_text(page_html(f"{i} Kapitel {i}", sidebar, page_kb, links, pages, i),
+                                            encoding='utf-8')
+    return root / "index.html"
+
+
+def page_html(title: str, sidebar: str, page_kb: int, links: int, pages: int, seed: int = 0) -> str:
+    """Erzeugt eine Seite mit Abschnitten, Code-Blöcken, Copy-Buttons und internen Links"""
+    paragraph = FILLER * 12
+    blocks = []
+    size = 0
+    j = 0
+    while size < page_kb * 1024 or j < links:
+        target = (seed * 31 + j * 7919) % max(pages, 1) + 1
+        link = f' Siehe <a href="{chapter_file(target)}#s{j}">Kapitel {target}</a>.' if j < links else ""
+        block = (f'<h2 id="s{j}">Abschnitt {j}</h2><p>{paragraph}{link}</p>'
+                 f'<pre><code>print({j})</code><button class="copy-button" title="Copy">Copy</button></pre>')
+        blocks.append(block)
+        size += len(block)
+        j += 1
+    return (f'<html><head><meta charset="utf-8"><title>{title}</title>'
+            f'<script>var page = {seed};</script><style>body {{}}</style></head>'
+            f'<body>{sidebar}<main><h1>{title}</h1>{"".join(blocks)}</main></body></html>')
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(root: Path, port: int = 0, handler_class=QuietHandler):
+    """Startet einen HTTP-Server im Hintergrund-Thread und liefert (Server, Basis-URL)"""
+    handler = functools.partial(handler_class, directory=str(root))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetische Doku-Website erzeugen und lokal ausliefern")
+    parser.add_argument('--pages', type=int, default=100, help='Anzahl Kapitel')
+    parser.add_argument('--page-kb', type=int, default=20, help='Ungefähre Inhaltsgröße pro Seite in KB')
+    parser.add_argument('--links', type=int, default=20, help='Interne Links pro Seite')
+    parser.add_argument('--nav', choices=['flat', 'sections'], default='flat', help='Navigationsstruktur')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--dir', type=Path, help='Zielverzeichnis (Standard: temporär)')
+    args = parser.parse_args()
+
+    root = args.dir or Path(tempfile.mkdtemp(prefix="fixture_site_"))
+    build_site(root, args.pages, args.page_kb, args.links, args.nav)
+    server, base_url = serve(root, args.port)
+    print(f"🌐 {args.pages} Kapitel unter {base_url}index.html ({root}) - Strg+C beendet")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,19 +7,3094 @@ Funktionierender Smart Website Crawler mit korrekter Kapitel-Reihenfolge und dyn
 # │                              IMPORTS & SETUP                               │
 # ╰─────────────────────────────────────────────────────────────────────────────╯
 
+from __future__ import annotations
+
 import asyncio
 import argparse
 import sys
 import re
 import json
 import time
-from pathlib import Path
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-import requests
-import html2text
-from crawl4ai import AsyncWebCrawler
-from typing import List, Tuple, Optional
+import hashlib
+import os
+import threading
+import importlib.util
+import random
+import math
+import mimetypes
+import io
+import struct
+import tarfile
+import tempfile
+import secrets
+import sqlite3
+import zipfile
+from array import array
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from html import escape as html_escape, unescape as html_unescape
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing, asynccontextmanager, contextmanager
+from functools import lru_cache, partial
+from pathlib import Path, PurePosixPath
+from types import MappingProxyType
+from urllib.parse import unquote, urljoin, urlparse
+from typing import TYPE_CHECKING, Callable, Iterator, List, Tuple, Optional, Union
+
+# Schwere Abhängigkeiten (bs4, requests, aiohttp, html2text, crawl4ai) werden erst in den
+# Funktionen importiert, die sie brauchen - --help und Dry-Runs starten so ohne Playwright & Co.
+if TYPE_CHECKING:
+    import aiohttp
+    from bs4 import BeautifulSoup, Tag
+    from crawl4ai import AsyncWebCrawler
+
+
+# Vorkompilierte Muster für die Link-Korrektur in Markdown
+MD_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+MD_HTML_PAREN_PATTERN = re.compile(r'\(([^)]+\.html(?:#[^)]+)?)\)')
+MD_ROOT_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\(\.\/\)')
+
+# Kapitelnummern in Linktexten, z.B. "3.2 Daten einlesen"
+CHAPTER_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)*)')
+LEADING_CHAPTER_NUMBER_PATTERN = re.compile(r'^\d+(?:\.\d+)*\s*')
+
+# Heuristiken für JavaScript-gerenderte Seiten (Engine "auto")
+NOSCRIPT_PATTERN = re.compile(r'<noscript[^>]*>(.*?)</noscript>', re.IGNORECASE | re.DOTALL)
+NOSCRIPT_HINT_PATTERN = re.compile(r'(?:enable|requires?|aktivieren).{0,40}javascript|javascript.{0,40}(?:enable|required|aktivieren)',
+                                   re.IGNORECASE | re.DOTALL)
+SPA_ROOT_PATTERN = re.compile(r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>', re.IGNORECASE)
+BODY_PATTERN = re.compile(r'<body[^>]*>(.*)</body>', re.IGNORECASE | re.DOTALL)
+INVISIBLE_PATTERN = re.compile(r'<(script|style|noscript|template)[^>]*>.*?</\1>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+MIN_VISIBLE_TEXT = 200
+
+
+def normalize_url(url: str) -> str:
+    """Normalisiert eine URL für Duplikatprüfungen (Schema/Host klein, ohne Fragment und Standard-Port)"""
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    if parsed.port and not ((scheme == 'http' and parsed.port == 80) or (scheme == 'https' and parsed.port == 443)):
+        host = f"{host}:{parsed.port}"
+    path = re.sub(r'/{2,}', '/', parsed.path) or '/'
+    query = f"?{parsed.query}" if parsed.query else ''
+    return f"{scheme}://{host}{path}{query}"
+
+
+def looks_js_rendered(html: str) -> bool:
+    """Prüft grob, ob eine per HTTP geladene Seite erst im Browser ihren Inhalt erhält"""
+    if SPA_ROOT_PATTERN.search(html):
+        return True
+    for noscript in NOSCRIPT_PATTERN.finditer(html):
+        if NOSCRIPT_HINT_PATTERN.search(noscript.group(1)):
+            return True
+    body_match = BODY_PATTERN.search(html)
+    body = body_match.group(1) if body_match else html
+    visible_text = TAG_PATTERN.sub('', INVISIBLE_PATTERN.sub('', body))
+    return len(''.join(visible_text.split())) < MIN_VISIBLE_TEXT
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                          HOST RATE LIMITING                                │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+class RetryPolicy:
+    """Entscheidet über Wiederholungen: exponentieller Backoff mit Jitter, Retry-After, keine Retries bei Dauerfehlern"""
+
+    PERMANENT_STATUS = {400, 401, 403, 404, 405, 406, 410, 414, 451}
+    THROTTLE_STATUS = {429, 503}
+    MAX_RETRY_AFTER = 600
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0, jitter: float = 0.5):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def is_permanent(self, status_code: Optional[int]) -> bool:
+        """Dauerhafte Fehler (z.B. 404) werden nicht wiederholt"""
+        return status_code in self.PERMANENT_STATUS
+
+    def should_retry(self, attempt: int, status_code: Optional[int]) -> bool:
+        """Prüft, ob nach dem (0-basierten) Versuch attempt erneut versucht werden soll"""
+        return attempt < self.max_retries - 1 and not self.is_permanent(status_code)
+
+    def backoff(self, attempt: int, status_code: Optional[int] = None, retry_after: Optional[float] = None) -> float:
+        """Wartezeit vor dem nächsten Versuch in Sekunden"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        # Jitter verteilt Wiederholungen paralleler Seiten über das Intervall
+        delay = random.uniform(delay * (1 - self.jitter), delay)
+        if status_code in self.THROTTLE_STATUS and retry_after is not None:
+            delay = max(delay, min(retry_after, self.MAX_RETRY_AFTER))
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Wertet einen Retry-After-Header aus (Sekunden oder HTTP-Datum)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostLimiter:
+    """Begrenzt parallele Requests pro Host, hält Verzögerungen ein und pausiert Hosts mit hoher Fehlerrate
+
+    Im adaptiven Modus wird der Abstand zwischen Requests pro Host an die beobachtete
+    Latenz angepasst: schneller bei stabiler Latenz, langsamer bei Drosselung oder
+    steigender Latenz (AIMD). --delay bleibt dabei die Untergrenze.
+    """
+
+    def __init__(self, delay: float = 0, per_host_limit: int = 1, adaptive: bool = False,
+                 breaker_threshold: float = 0.5, breaker_window: int = 20, breaker_cooldown: float = 30,
+                 max_interval: float = 30, log: Callable[..., None] = print):
+        self.log = log  # Meldungen für Hosts ohne eigene Ausgabe (siehe set_log)
+        self.delay = delay
+        self.per_host_limit = max(1, per_host_limit)
+        self.adaptive = adaptive
+        self.breaker_threshold = breaker_threshold
+        self.breaker_window = breaker_window
+        self.breaker_cooldown = breaker_cooldown
+        self.max_interval = max_interval
+        self._semaphores: dict = {}
+        self._locks: dict = {}
+        self._last_activity: dict = {}
+        self._interval: dict = {}     # aktueller Abstand pro Host (adaptiv)
+        self._latency: dict = {}      # geglättete Latenz pro Host
+        self._baseline: dict = {}     # niedrigste geglättete Latenz pro Host
+        self._outcomes: dict = {}     # letzte Ergebnisse pro Host für den Circuit Breaker
+        self._paused_until: dict = {}
+        self._trips: dict = {}
+        self._crawl_delay: dict = {}  # Mindestabstand pro Host aus robots.txt
+        self._log: dict = {}          # Ausgabe pro Host (Batch-Modus: die des jeweiligen Crawls)
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Reserviert einen Request-Slot für den Host der URL"""
+        host = urlparse(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+            self._locks[host] = asyncio.Lock()
+
+        async with self._semaphores[host]:
+            # Abstand zum letzten Request-Start bzw. -Ende desselben Hosts einhalten
+            async with self._locks[host]:
+                pause = self._paused_until.get(host, 0) - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                interval = max(self._interval.get(host, self.delay), self._crawl_delay.get(host, 0))
+                if interval > 0 and host in self._last_activity:
+                    wait = self._last_activity[host] + interval - time.monotonic()
+                    if wait > 0:
+                        self._log.get(host, self.log)(f"⏱️  Warte {wait:.1f}s ({host})...")
+                        await asyncio.sleep(wait)
+                self._last_activity[host] = time.monotonic()
+            try:
+                yield
+            finally:
+                self._last_activity[host] = time.monotonic()
+
+    def set_crawl_delay(self, host: str, seconds: float) -> None:
+        """Setzt den Mindestabstand für einen Host (Crawl-delay aus robots.txt)"""
+        self._crawl_delay[host] = max(0.0, seconds)
+
+    def set_log(self, host: str, log: Callable[..., None]) -> None:
+        """Leitet die Meldungen zu einem Host an die Ausgabe des Crawls weiter, dem er gehört"""
+        self._log[host] = log
+
+    def record(self, url: str, success: bool, status_code: Optional[int] = None,
+               latency: Optional[float] = None, retry_after: Optional[float] = None) -> None:
+        """Verbucht das Ergebnis eines Requests für Circuit Breaker und adaptive Rate"""
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        throttled = status_code in RetryPolicy.THROTTLE_STATUS
+
+        # Server verlangt eine Pause - den ganzen Host anhalten
+        if throttled and retry_after:
+            self._pause(host, min(retry_after, RetryPolicy.MAX_RETRY_AFTER),
+                        f"HTTP {status_code}, Retry-After {retry_after:.0f}s")
+
+        # Circuit Breaker: Fehlerrate im gleitenden Fenster
+        if self.breaker_threshold > 0:
+            outcomes = self._outcomes.setdefault(host, deque(maxlen=self.breaker_window))
+            # Dauerhafte Fehler (404 usw.) sagen nichts über die Last des Servers aus
+            if status_code not in RetryPolicy.PERMANENT_STATUS:
+                outcomes.append(success)
+            if success:
+                self._trips[host] = 0
+            elif len(outcomes) >= self.breaker_window // 2:
+                error_rate = outcomes.count(False) / len(outcomes)
+                if error_rate >= self.breaker_threshold and self._paused_until.get(host, 0) <= now:
+                    trips = self._trips.get(host, 0)
+                    self._trips[host] = trips + 1
+                    cooldown = min(self.breaker_cooldown * (2 ** trips), RetryPolicy.MAX_RETRY_AFTER)
+                    self._pause(host, cooldown, f"Fehlerrate {error_rate:.0%}")
+                    outcomes.clear()
+
+        if self.adaptive:
+            self._adapt(host, success, throttled, latency)
+
+    def _pause(self, host: str, seconds: float, reason: str) -> None:
+        """Pausiert alle Requests an einen Host"""
+        until = time.monotonic() + seconds
+        if until > self._paused_until.get(host, 0):
+            self._paused_until[host] = until
+            self._log.get(host, self.log)(f"🛑 Pausiere {host} für {seconds:.0f}s ({reason})")
+
+    def _adapt(self, host: str, success: bool, throttled: bool, latency: Optional[float]) -> None:
+        """AIMD-Anpassung des Request-Abstands an Latenz und Drosselung"""
+        congested = throttled
+        if success and latency is not None:
+            smoothed = latency if host not in self._latency else 0.8 * self._latency[host] + 0.2 * latency
+            self._latency[host] = smoothed
+            self._baseline[host] = min(self._baseline.get(host, smoothed), smoothed)
+            congested = congested or smoothed > 2 * self._baseline[host]
+
+        interval = self._interval.get(host, self.delay)
+        if congested:
+            interval = min(self.max_interval, max(interval * 2, 0.25))
+        elif success:
+            interval = interval * 0.9
+            if interval < 0.01:
+                interval = 0.0
+        self._interval[host] = max(self.delay, interval)
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                            RESPONSE CACHE                                  │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+class FetchResult:
+    """Einheitliches Ergebnis eines Seitenabrufs (kompatibel zu crawl4ai-Ergebnissen)"""
+
+    def __init__(self, html: str, status_code: int = 200, response_headers: Optional[dict] = None,
+                 success: bool = True, error_message: str = "", from_cache: bool = False):
+        self.html = html
+        self.status_code = status_code
+        self.response_headers = response_headers or {}
+        self.success = success
+        self.error_message = error_message
+        self.from_cache = from_cache
+
+
+def get_header(headers, name: str) -> Optional[str]:
+    """Liest einen HTTP-Header ohne Rücksicht auf Groß-/Kleinschreibung"""
+    if not headers:
+        return None
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ResponseCache:
+    """Persistenter Antwort-Cache mit ETag/Last-Modified, TTL und größenbegrenzter LRU-Verdrängung"""
+
+    INDEX_FILE = "cache_index.json"
+
+    def __init__(self, cache_dir: str, ttl: float = 3600, max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Reihenfolge = Zugriffsreihenfolge (ältester Zugriff zuerst)
+        self._entries: OrderedDict = OrderedDict()
+        self._total_bytes = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Lädt den Cache-Index von der Platte"""
+        index_path = self.cache_dir / self.INDEX_FILE
+        if not index_path.exists():
+            return
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Cache-Index nicht lesbar, starte leer: {e}")
+            return
+        for entry in entries:
+            if (self.cache_dir / entry["key"]).exists():
+                self._entries[entry["id"]] = entry
+                self._total_bytes += entry["size"]
+
+    def save(self) -> None:
+        """Schreibt den Cache-Index atomar auf die Platte"""
+        with self._lock:
+            entries = list(self._entries.values())
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp_path = index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+
+    @staticmethod
+    def entry_id(url: str, variant: str = "") -> str:
+        """Schlüssel eines Eintrags; die Variante trennt z.B. Roh-HTML von gerendertem HTML"""
+        return f"{variant}:{url}" if variant else url
+
+    @staticmethod
+    def key_for(entry_id: str) -> str:
+        """Dateiname des Cache-Eintrags"""
+        return hashlib.sha256(entry_id.encode('utf-8')).hexdigest() + '.body'
+
+    def lookup(self, url: str, variant: str = "") -> Optional[dict]:
+        """Liefert die Metadaten eines Eintrags oder None"""
+        with self._lock:
+            return self._entries.get(self.entry_id(url, variant))
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Prüft, ob ein Eintrag noch innerhalb der TTL liegt"""
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        """Baut If-None-Match/If-Modified-Since-Header aus den gespeicherten Validatoren"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read(self, url: str, variant: str = "") -> Optional[bytes]:
+        """Liest den Body eines Eintrags und markiert ihn als zuletzt benutzt"""
+        entry_id = self.entry_id(url, variant)
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return None
+            self._entries.move_to_end(entry_id)
+            entry["accessed_at"] = time.time()
+        try:
+            return (self.cache_dir / entry["key"]).read_bytes()
+        except OSError:
+            self._remove(entry_id)
+            return None
+
+    def refresh(self, url: str, headers, variant: str = "") -> None:
+        """Setzt nach einer 304-Antwort Abrufzeit und ggf. neue Validatoren"""
+        with self._lock:
+            entry = self._entries.get(self.entry_id(url, variant))
+            if entry is None:
+                return
+            entry["fetched_at"] = time.time()
+            entry["etag"] = get_header(headers, 'ETag') or entry.get("etag")
+            entry["last_modified"] = get_header(headers, 'Last-Modified') or entry.get("last_modified")
+
+    def store(self, url: str, body: bytes, headers, variant: str = "") -> None:
+        """Speichert Body und Validatoren und verdrängt bei Bedarf alte Einträge"""
+        entry_id = self.entry_id(url, variant)
+        key = self.key_for(entry_id)
+        body_path = self.cache_dir / key
+        tmp_path = body_path.with_suffix(f'.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, body_path)
+
+        now = time.time()
+        with self._lock:
+            old = self._entries.pop(entry_id, None)
+            if old is not None:
+                self._total_bytes -= old["size"]
+            self._entries[entry_id] = {
+                "id": entry_id,
+                "url": url,
+                "key": key,
+                "etag": get_header(headers, 'ETag'),
+                "last_modified": get_header(headers, 'Last-Modified'),
+                "fetched_at": now,
+                "accessed_at": now,
+                "size": len(body),
+            }
+            self._total_bytes += len(body)
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, entry = self._entries.popitem(last=False)
+                self._total_bytes -= entry["size"]
+                evicted.append(entry["key"])
+        for evicted_key in evicted:
+            try:
+                (self.cache_dir / evicted_key).unlink()
+            except OSError:
+                pass
+
+    def _remove(self, entry_id: str) -> None:
+        """Entfernt einen Eintrag, dessen Body fehlt"""
+        with self._lock:
+            entry = self._entries.pop(entry_id, None)
+            if entry is not None:
+                self._total_bytes -= entry["size"]
+
+    def fetch(self, url: str, timeout: float = 10) -> Tuple[Optional[bytes], int]:
+        """Lädt eine URL per HTTP und nutzt frische bzw. revalidierte Einträge (blockierend)"""
+        entry = self.lookup(url)
+        if entry is not None and self.is_fresh(entry):
+            body = self.read(url)
+            if body is not None:
+                self.hits += 1
+                return body, 200
+
+        import requests
+        headers = self.conditional_headers(entry) if entry else {}
+        response = requests.get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            body = self.read(url)
+            if body is not None:
+                self.refresh(url, response.headers)
+                self.revalidated += 1
+                return body, 200
+            # Body fehlt trotz Index-Eintrag - unbedingt neu laden
+            response = requests.get(url, timeout=timeout)
+
+        self.misses += 1
+        if response.status_code == 200:
+            self.store(url, response.content, response.headers)
+        return response.content, response.status_code
+
+    def revalidate(self, url: str, timeout: float = 10, variant: str = "") -> Optional[bytes]:
+        """Liefert den gecachten Body, wenn er frisch ist oder der Server 304 meldet (blockierend)
+
+        Der Body einer 200-Antwort wird dabei nicht heruntergeladen, damit die Seite
+        anschließend regulär (z.B. im Browser) geladen werden kann.
+        """
+        entry = self.lookup(url, variant)
+        if entry is None:
+            return None
+        if self.is_fresh(entry):
+            body = self.read(url, variant)
+            if body is not None:
+                self.hits += 1
+            return body
+
+        headers = self.conditional_headers(entry)
+        if not headers:
+            return None
+        import requests
+        try:
+            with requests.get(url, timeout=timeout, headers=headers, stream=True) as response:
+                if response.status_code != 304:
+                    return None
+                body = self.read(url, variant)
+                if body is not None:
+                    self.refresh(url, response.headers, variant)
+                    self.revalidated += 1
+                return body
+        except requests.RequestException:
+            return None
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                             HTTP CLIENT                                    │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+class HttpClient:
+    """Gepoolter asynchroner HTTP-Client für statische Seiten (ohne Browser)"""
+
+    def __init__(self, limit: int = 1, timeout: int = 30):
+        self.limit = max(1, limit)
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Legt die Session erst im laufenden Event-Loop an"""
+        import aiohttp
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def fetch(self, url: str, headers: Optional[dict] = None) -> FetchResult:
+        """Lädt eine URL und liefert ein FetchResult (auch bei Fehlern)"""
+        import aiohttp
+        session = self._get_session()
+        try:
+            async with session.get(url, headers=headers) as response:
+                html = await response.text(errors='replace') if response.status == 200 else ""
+                return FetchResult(
+                    html,
+                    status_code=response.status,
+                    response_headers=dict(response.headers),
+                    success=response.status == 200,
+                    error_message="" if response.status == 200 else f"HTTP {response.status}"
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return FetchResult("", status_code=0, success=False, error_message=str(e) or type(e).__name__)
+
+    async def fetch_bytes(self, url: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Lädt eine Binärdatei; liefert (Inhalt, Content-Type) oder (None, None) bei Fehlern"""
+        import aiohttp
+        session = self._get_session()
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return None, None
+                return await response.read(), response.headers.get('Content-Type')
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None, None
+
+    async def close(self) -> None:
+        """Schließt die Session und alle gepoolten Verbindungen"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                            BROWSER POOL                                    │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+class BrowserPool:
+    """Hält langlebige AsyncWebCrawler-Sessions für die Dauer eines Crawls offen"""
+
+    def __init__(self, size: int = 1, timeout: int = 30, recycle_after: int = 100,
+                 log: Callable[..., None] = print):
+        self.log = log
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.recycle_after = recycle_after
+        self._idle: List[AsyncWebCrawler] = []
+        self._uses: dict = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _acquire(self) -> AsyncWebCrawler:
+        """Liefert eine freie Session oder startet eine neue"""
+        if self._idle:
+            return self._idle.pop()
+        from crawl4ai import AsyncWebCrawler
+        crawler = AsyncWebCrawler(verbose=False, timeout=self.timeout)
+        await crawler.start()
+        self._uses[id(crawler)] = 0
+        return crawler
+
+    async def _release(self, crawler: AsyncWebCrawler, failed: bool) -> None:
+        """Gibt eine Session zurück oder schließt sie nach Fehlern bzw. zu vielen Seiten"""
+        self._uses[id(crawler)] += 1
+        if failed or (self.recycle_after and self._uses[id(crawler)] >= self.recycle_after):
+            await self._close_crawler(crawler)
+        else:
+            self._idle.append(crawler)
+
+    async def _close_crawler(self, crawler: AsyncWebCrawler) -> None:
+        """Schließt eine einzelne Session"""
+        self._uses.pop(id(crawler), None)
+        try:
+            await crawler.close()
+        except Exception as e:
+            self.log(f"⚠️  Fehler beim Schließen des Browsers: {e}")
+
+    async def fetch(self, url: str):
+        """Lädt eine URL über eine Session aus dem Pool"""
+        # Semaphore erst im laufenden Event-Loop anlegen
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._slots:
+            crawler = await self._acquire()
+            failed = True
+            try:
+                result = await crawler.arun(url=url)
+                failed = not (hasattr(result, 'success') and result.success)
+                return result
+            finally:
+                await self._release(crawler, failed)
+
+    async def close(self) -> None:
+        """Schließt alle offenen Sessions"""
+        while self._idle:
+            await self._close_crawler(self._idle.pop())
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                             PAGE SELECTION                                 │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+CHAPTER_RANGE_PATTERN = re.compile(r'^(\d+(?:\.\d+)*)(?:\s*-\s*(\d+(?:\.\d+)*))?$')
+
+
+def chapter_key(chapter_num: str) -> Tuple[int, ...]:
+    """Kapitelnummer als vergleichbares Tupel ('3.10' -> (3, 10))"""
+    return tuple(int(part) for part in chapter_num.split('.'))
+
+
+class PathPrefixTrie:
+    """Zeichen-Trie über URL-Pfad-Präfixe: ein Durchlauf pro Pfad, unabhängig von der Anzahl Präfixe"""
+
+    END = None  # Markierung für das Ende eines Präfixes
+
+    def __init__(self, prefixes: List[str]):
+        self.root: dict = {}
+        for prefix in prefixes:
+            node = self.root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[self.END] = True
+
+    def __bool__(self) -> bool:
+        return bool(self.root)
+
+    def match(self, path: str) -> bool:
+        """True, wenn path mit einem der Präfixe beginnt"""
+        node = self.root
+        if self.END in node:
+            return True
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                return False
+            if self.END in node:
+                return True
+        return False
+
+
+class RuleSet:
+    """Kompilierte Auswahlregeln: Regex, Kapitelbereich oder URL-Pfad-Präfix
+
+    Regeln der Form '3.1-3.9' bzw. '4' sind Kapitelbereiche (inklusive Unterkapitel des
+    Endes), Regeln mit führendem '/' Pfad-Präfixe, alle übrigen Regexe über Titel und URL
+    ('re:' erzwingt einen Regex). Die Regexe werden nach Möglichkeit zu einer Alternation
+    zusammengefasst.
+    """
+
+    def __init__(self, rules: List[str]):
+        self.rules = list(rules)
+        patterns = []
+        prefixes = []
+        self.ranges: List[Tuple[Tuple[int, ...], Tuple[int, ...]]] = []
+        for rule in self.rules:
+            range_match = CHAPTER_RANGE_PATTERN.match(rule.strip())
+            if rule.startswith('re:'):
+                patterns.append(rule[3:])
+            elif range_match:
+                low = chapter_key(range_match.group(1))
+                self.ranges.append((low, chapter_key(range_match.group(2) or range_match.group(1))))
+            elif rule.startswith('/'):
+                prefixes.append(rule)
+            else:
+                patterns.append(rule)
+        compiled = []
+        for pattern in patterns:
+            try:
+                compiled.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as e:
+                raise ValueError(f"Ungültiger Regex {pattern!r}: {e}") from None
+        # Einzeln gültige Regexe lassen sich nicht immer verbinden (doppelte Gruppennamen,
+        # Inline-Flags) - dann bleiben sie getrennt
+        self.patterns = compiled
+        if len(compiled) > 1:
+            try:
+                self.patterns = [re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)]
+            except re.error:
+                pass
+        self.prefixes = PathPrefixTrie(prefixes)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def __str__(self) -> str:
+        return ', '.join(self.rules)
+
+    def matches(self, url: str, chapter_num: str, title: str) -> bool:
+        """True, wenn mindestens eine Regel auf das Kapitel passt"""
+        if any(pattern.search(title) or pattern.search(url) for pattern in self.patterns):
+            return True
+        if self.prefixes and self.prefixes.match(urlparse(url).path):
+            return True
+        if self.ranges and chapter_num:
+            key = chapter_key(chapter_num)
+            return any(low <= key and key[:len(high)] <= high for low, high in self.ranges)
+        return False
+
+
+class PageSelector:
+    """Auswahl der Kapitel während der Suche: Filter, Einschlüsse, Ausschlüsse und Seitenlimit
+
+    Ein Kapitel wird gewählt, wenn der Filter-Regex auf Titel oder URL passt (--filter),
+    eine Einschluss-Regel passt (ohne Einschlüsse: jedes) und keine Ausschluss-Regel.
+    Ist limit erreicht, beenden die Suchen vorzeitig.
+    """
+
+    def __init__(self, include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 limit: Optional[int] = None, filter_pattern: Optional[str] = None):
+        self.include = RuleSet(include or [])
+        self.exclude = RuleSet(exclude or [])
+        try:
+            self.filter = re.compile(filter_pattern, re.IGNORECASE) if filter_pattern else None
+        except re.error as e:
+            raise ValueError(f"Ungültiger Regex {filter_pattern!r}: {e}") from None
+        self.limit = limit if limit and limit > 0 else None
+        self.checked = 0
+        self.accepted = 0
+
+    def accept(self, url: str, chapter_num: str, title: str) -> bool:
+        """Prüft ein Kapitel und zählt es bei Auswahl; nach Erreichen des Limits immer False"""
+        if self.satisfied:
+            return False
+        self.checked += 1
+        if self.filter is not None and not (self.filter.search(title) or self.filter.search(url)):
+            return False
+        if self.include and not self.include.matches(url, chapter_num, title):
+            return False
+        if self.exclude and self.exclude.matches(url, chapter_num, title):
+            return False
+        self.accepted += 1
+        return True
+
+    @property
+    def satisfied(self) -> bool:
+        """True, sobald das Seitenlimit erreicht ist - weitere Suche ist überflüssig"""
+        return self.limit is not None and self.accepted >= self.limit
+
+    def describe(self) -> str:
+        """Kurzbeschreibung der Regeln für die Ausgabe"""
+        parts = []
+        if self.filter is not None:
+            parts.append(f"Filter {self.filter.pattern}")
+        if self.include:
+            parts.append(f"nur {self.include}")
+        if self.exclude:
+            parts.append(f"ohne {self.exclude}")
+        return '; '.join(parts)
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                           SITEMAP DISCOVERY                                │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+DISCOVERY_SOURCES = ['nav', 'sitemap', 'auto']
+MAX_SITEMAPS = 1000  # Obergrenze für verschachtelte Sitemap-Indizes
+# Sitemap-Einträge mit anderen Endungen (PDFs, Bilder, ...) sind keine Kapitel
+SITEMAP_PAGE_SUFFIXES = ('', '.html', '.htm', '.xhtml', '.php', '.asp', '.aspx')
+
+
+def open_sitemap_stream(raw) -> io.BufferedIOBase:
+    """Liefert einen lesbaren Strom, bei gzip-Daten (.xml.gz) transparent entpackt"""
+    import gzip
+    stream = io.BufferedReader(raw)
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def iter_sitemap_entries(stream) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """Liest eine Sitemap bzw. einen Sitemap-Index inkrementell
+
+    Liefert (Art, URL, lastmod) mit Art 'url' oder 'sitemap'. Bearbeitete Einträge werden
+    sofort aus dem Baum entfernt, der Speicherbedarf hängt nicht von der Sitemap-Größe ab.
+    """
+    from xml.etree.ElementTree import iterparse
+    events = iterparse(stream, events=('start', 'end'))
+    _, root = next(events)
+    loc = lastmod = None
+    for event, element in events:
+        if event != 'end':
+            continue
+        tag = element.tag.rsplit('}', 1)[-1]
+        if tag == 'loc':
+            loc = (element.text or '').strip()
+        elif tag == 'lastmod':
+            lastmod = (element.text or '').strip() or None
+        elif tag in ('url', 'sitemap'):
+            if loc:
+                yield tag, loc, lastmod
+            loc = lastmod = None
+            root.clear()
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """W3C-Datum aus lastmod; reine Datumsangaben gelten bis zum Ende des Tages"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if 'T' not in value:
+        parsed += timedelta(days=1)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def sitemap_chapter(url: str) -> Tuple[str, str]:
+    """Kapitelnummer und Titel aus dem letzten Pfadsegment einer Sitemap-URL"""
+    segments = [segment for segment in urlparse(url).path.split('/') if segment]
+    stem = PurePosixPath(unquote(segments[-1])).stem if segments else ''
+    text = re.sub(r'[-_]+', ' ', stem).strip() or 'index'
+    chapter_match = CHAPTER_NUMBER_PATTERN.search(text)
+    chapter_number = chapter_match.group(1) if chapter_match else ""
+    return chapter_number, LEADING_CHAPTER_NUMBER_PATTERN.sub('', text).strip() or text
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                              LINK INDEX                                    │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+class LinkIndex:
+    """Unveränderlicher Index von Original-Links zu neuen Dateinamen, einmal pro Crawl erstellt"""
+
+    def __init__(self, chapter_order: List[Tuple[str, str, str]], format_type: str, generate_filename):
+        by_filename = {}
+        by_title = {}
+        by_number = {}
+        total = len(chapter_order)
+        for url, chapter_num, title in chapter_order:
+            new_filename = generate_filename(chapter_num, title, format_type, total)
+            # Wie bisher: spätere Einträge überschreiben den Original-Dateinamen,
+            # bei Titel und Nummer gewinnt das erste Kapitel in Reihenfolge
+            by_filename[url.split('/')[-1]] = new_filename
+            by_title.setdefault(self.normalize_title(title), new_filename)
+            if chapter_num:
+                by_number.setdefault(chapter_num, new_filename)
+        self.chapter_order = chapter_order
+        self.format_type = format_type
+        self.by_filename = MappingProxyType(by_filename)
+        self.by_title = MappingProxyType(by_title)
+        self.by_number = MappingProxyType(by_number)
+
+    def __getstate__(self) -> dict:
+        # MappingProxyType ist nicht picklebar - für Worker-Prozesse als dict übertragen
+        return {"chapter_order": self.chapter_order, "format_type": self.format_type,
+                "by_filename": dict(self.by_filename), "by_title": dict(self.by_title),
+                "by_number": dict(self.by_number)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.chapter_order = state["chapter_order"]
+        self.format_type = state["format_type"]
+        self.by_filename = MappingProxyType(state["by_filename"])
+        self.by_title = MappingProxyType(state["by_title"])
+        self.by_number = MappingProxyType(state["by_number"])
+
+    @staticmethod
+    def normalize_title(text: str) -> str:
+        """Normalisiert Titel bzw. Dateinamen-Stämme für den Titel-Lookup"""
+        return re.sub(r'\s+', ' ', text.replace('_', ' ')).strip().lower()
+
+    def resolve_md(self, filename: str) -> Optional[str]:
+        """Findet den neuen Dateinamen für einen bereits vorhandenen .md-Link"""
+        stem = filename[:-3] if filename.endswith('.md') else filename
+        new_filename = self.by_title.get(self.normalize_title(stem))
+        if new_filename:
+            return new_filename
+        # Fallback: Nummer am Anfang des Dateinamens
+        number_match = re.match(r'^(\d+)', filename)
+        if number_match:
+            return self.by_number.get(number_match.group(1).lstrip('0') or '0')
+        return None
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                      BOILERPLATE & DUPLICATES                              │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+# Elemente, die als Block einen Fingerabdruck erhalten (main/article/body werden nur durchlaufen)
+BLOCK_TAGS = frozenset({'header', 'footer', 'nav', 'aside', 'div', 'section', 'p', 'ul', 'ol', 'dl',
+                        'table', 'pre', 'blockquote', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+MIN_BLOCK_CHARS = 20
+MIN_SIMHASH_WORDS = 24
+WORD_PATTERN = re.compile(r'\w+')
+# Pro Bit (höchstes zuerst) eine Tabelle Byte -> 1, wenn das Bit gesetzt ist
+SIMHASH_BIT_TABLES = [bytes((byte >> bit) & 1 for byte in range(256)) for bit in range(7, -1, -1)]
+
+
+def block_fingerprint(text: str) -> Optional[str]:
+    """Prozessunabhängiger Fingerabdruck eines Textblocks (None für zu kurze Blöcke)"""
+    normalized = ' '.join(text.split())
+    if len(normalized) < MIN_BLOCK_CHARS:
+        return None
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def strip_boilerplate(soup: BeautifulSoup, boilerplate: frozenset, seen: Optional[list] = None) -> None:
+    """Entfernt bekannte Boilerplate-Blöcke und sammelt die Fingerabdrücke der übrigen"""
+    from bs4 import Tag
+    stack = [soup]
+    while stack:
+        node = stack.pop()
+        for child in list(node.contents):
+            if not isinstance(child, Tag):
+                continue
+            if child.name in BLOCK_TAGS:
+                fingerprint = block_fingerprint(child.get_text(' '))
+                if fingerprint is not None:
+                    if fingerprint in boilerplate:
+                        child.decompose()
+                        continue
+                    if seen is not None:
+                        seen.append(fingerprint)
+            stack.append(child)
+
+
+def strip_boilerplate_selectolax(root, boilerplate: frozenset, seen: Optional[list] = None) -> None:
+    """Wie strip_boilerplate, für einen selectolax-Baum"""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for child in list(node.iter(include_text=False)):
+            if child.tag in BLOCK_TAGS:
+                fingerprint = block_fingerprint(child.text(deep=True, separator=' '))
+                if fingerprint is not None:
+                    if fingerprint in boilerplate:
+                        child.decompose()
+                        continue
+                    if seen is not None:
+                        seen.append(fingerprint)
+            stack.append(child)
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-Bit-Simhash über Wort-Trigramme (None für zu kurze Texte)"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < MIN_SIMHASH_WORDS:
+        return None
+    shingles = set(map(' '.join, zip(words, words[1:], words[2:])))
+    digests = b''.join(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles)
+    # Spaltenweise zählen: ein Bit ist gesetzt, wenn es in mehr als der Hälfte der Trigramme gesetzt ist.
+    # Pro Byte-Position ein Schnitt über alle Hashes, pro Bit zählt translate/count in C
+    threshold = len(shingles) / 2
+    value = 0
+    for position in range(8):
+        column = digests[position::8]
+        for table in SIMHASH_BIT_TABLES:
+            value = (value << 1) | (column.translate(table).count(1) > threshold)
+    return value
+
+
+class BoilerplateModel:
+    """Lernt aus den ersten Seiten, welche Blöcke auf (fast) allen Seiten wiederkehren"""
+
+    def __init__(self, learn_pages: int = 5, min_share: float = 0.8):
+        self.learn_pages = max(2, learn_pages)
+        self.min_share = min_share
+        self.pages = 0
+        self.blocks: frozenset = frozenset()
+        self._counts: dict = {}
+
+    def observe(self, fingerprints) -> None:
+        """Zählt die Blöcke einer Seite"""
+        for fingerprint in set(fingerprints):
+            self._counts[fingerprint] = self._counts.get(fingerprint, 0) + 1
+        self.pages += 1
+
+    def finish(self) -> frozenset:
+        """Legt die Boilerplate fest: Blöcke auf mindestens min_share der Seiten (und mindestens zwei)"""
+        needed = max(2, math.ceil(self.min_share * self.pages))
+        self.blocks = frozenset(fingerprint for fingerprint, count in self._counts.items() if count >= needed)
+        self._counts = {}
+        return self.blocks
+
+
+class DuplicateIndex:
+    """Findet exakte und beinahe gleiche Seiten über ihren Simhash
+
+    Der Hash wird in max_distance + 1 Bänder geteilt: Zwei Hashes mit höchstens
+    max_distance abweichenden Bits stimmen in mindestens einem Band überein
+    (Schubfachprinzip), verglichen werden also nur Seiten aus denselben Buckets.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        bounds = [64 * i // bands for i in range(bands + 1)]
+        self.bands = [(low, (1 << (high - low)) - 1) for low, high in zip(bounds, bounds[1:])]
+        self.buckets: List[dict] = [{} for _ in self.bands]
+
+    def find_or_add(self, fingerprint: int, key):
+        """Liefert den Schlüssel einer ähnlichen bekannten Seite oder merkt sich diese Seite"""
+        for (shift, mask), bucket in zip(self.bands, self.buckets):
+            for other, other_key in bucket.get((fingerprint >> shift) & mask, ()):
+                if (fingerprint ^ other).bit_count() <= self.max_distance:
+                    return other_key
+        for (shift, mask), bucket in zip(self.bands, self.buckets):
+            bucket.setdefault((fingerprint >> shift) & mask, []).append((fingerprint, key))
+        return None
+
+
+class ChapterTurns:
+    """Lässt parallel verarbeitete Seiten einen Schritt in Kapitel-Reihenfolge ausführen
+
+    Seite i ist an der Reihe, sobald alle Seiten davor ihren Zug beendet haben (done),
+    auch wenn sie den Schritt gar nicht brauchten.
+    """
+
+    def __init__(self):
+        self.next = 0
+        self._done: set = set()
+        self._waiting: dict = {}  # Kapitel-Position -> Future
+
+    async def wait(self, index: int) -> None:
+        """Wartet, bis alle Seiten vor index fertig sind"""
+        if index > self.next:
+            future = asyncio.get_running_loop().create_future()
+            self._waiting[index] = future
+            try:
+                await future
+            finally:
+                self._waiting.pop(index, None)
+
+    def done(self, index: int) -> None:
+        """Beendet den Zug einer Seite (mehrfacher Aufruf ist unschädlich)"""
+        if index < self.next:
+            return
+        self._done.add(index)
+        while self.next in self._done:
+            self._done.discard(self.next)
+            self.next += 1
+        future = self._waiting.get(self.next)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+
+def duplicate_stub(url: str, title: str, format_type: str, canonical_filename: str) -> str:
+    """Platzhalter für ein doppeltes Kapitel: verweist auf das früheste gleiche Kapitel, Links bleiben gültig"""
+    if format_type == 'html':
+        target = html_escape(canonical_filename, quote=True)
+        return (f"<!-- Original URL: {url} -->\n"
+                f'<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="0; url={target}">'
+                f"<title>{html_escape(title)}</title></head>"
+                f'<body><p>Same content as <a href="{target}">{target}</a>.</p></body></html>')
+    return (f"<!-- Original URL: {url} -->\n\n# {title}\n\n"
+            f"Same content as [{canonical_filename}]({canonical_filename}).\n")
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                             ASSET MIRROR                                   │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+# Attribute, deren Ziele für eine Offline-Kopie lokal vorliegen müssen (link nur als Stylesheet)
+ASSET_ATTRIBUTES = {
+    'img': ('src', 'srcset'),
+    'source': ('src', 'srcset'),
+    'video': ('src', 'poster'),
+    'audio': ('src',),
+    'track': ('src',),
+    'embed': ('src',),
+    'object': ('data',),
+    'input': ('src',),
+    'script': ('src',),
+    'link': ('href',),
+}
+ASSET_SELECTOR = ', '.join(ASSET_ATTRIBUTES)
+ASSET_MARKER_PATTERN = re.compile(r'__asset_([0-9a-f]{16})__')
+ASSET_SUFFIX_PATTERN = re.compile(r'\.[a-z0-9]{1,5}')
+# Verweise in Stylesheets: url(...) sowie @import "..." ohne url()
+CSS_URL_PATTERN = re.compile(r'url\(\s*([\'"]?)([^\'")]*?)\1\s*\)', re.IGNORECASE)
+CSS_IMPORT_PATTERN = re.compile(r'@import\s+([\'"])([^\'"]+)\1', re.IGNORECASE)
+
+
+def asset_attributes(name: str, rel) -> tuple:
+    """Zu spiegelnde Attribute eines Elements; link zählt nur mit rel="stylesheet"
+
+    rel ist je nach Parser eine Liste (BeautifulSoup) oder ein String.
+    """
+    if name == 'link':
+        if isinstance(rel, str):
+            rel = rel.split()
+        if not rel or 'stylesheet' not in (token.lower() for token in rel):
+            return ()
+    return ASSET_ATTRIBUTES.get(name, ())
+
+
+def asset_url(src: str, base_url: str) -> Optional[str]:
+    """Absolute http(s)-URL einer Asset-Referenz ohne Anker; None für data:, Anker und andere Schemata"""
+    src = src.strip()
+    if not src or src.startswith(('data:', '#')):
+        return None
+    url = urljoin(base_url, src).split('#', 1)[0]
+    if urlparse(url).scheme not in ('http', 'https'):
+        return None
+    return url
+
+
+def asset_marker(src: str, page_url: str, assets: dict) -> str:
+    """Ersetzt eine Asset-Referenz durch einen Platzhalter und merkt sich die absolute URL"""
+    url = asset_url(src, page_url)
+    if url is None:
+        return src.strip()
+    key = hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()
+    assets[key] = url
+    return f"__asset_{key}__"
+
+
+def mark_asset_attribute(attr: str, value: str, page_url: str, assets: dict) -> str:
+    """Setzt Platzhalter in ein Attribut ein; bei srcset für jede Bildquelle"""
+    if attr != 'srcset':
+        return asset_marker(value, page_url, assets)
+    candidates = []
+    for candidate in value.split(','):
+        parts = candidate.split()
+        if parts:
+            parts[0] = asset_marker(parts[0], page_url, assets)
+            candidates.append(' '.join(parts))
+    return ', '.join(candidates)
+
+
+def css_references(css: str) -> List[str]:
+    """Alle Verweise eines Stylesheets (url(...) und @import "...") in Dokumentreihenfolge"""
+    matches = list(CSS_URL_PATTERN.finditer(css)) + list(CSS_IMPORT_PATTERN.finditer(css))
+    return [match.group(2) for match in sorted(matches, key=lambda match: match.start())]
+
+
+def rewrite_css_references(css: str, replace) -> str:
+    """Setzt neue Verweisziele in ein Stylesheet ein; replace(Verweis) liefert das Ziel oder None"""
+    def replace_url(match):
+        target = replace(match.group(2))
+        return match.group(0) if target is None else f'url("{target}")'
+
+    def replace_import(match):
+        target = replace(match.group(2))
+        return match.group(0) if target is None else f'@import "{target}"'
+
+    return CSS_URL_PATTERN.sub(replace_url, CSS_IMPORT_PATTERN.sub(replace_import, css))
+
+
+def is_stylesheet(url: str, content_type: Optional[str]) -> bool:
+    """Stylesheet laut Content-Type, ohne Content-Type laut Dateiendung"""
+    if content_type:
+        return content_type.split(';', 1)[0].strip().lower() == 'text/css'
+    return urlparse(url).path.lower().endswith('.css')
+
+
+def asset_extension(url: str, content_type: Optional[str]) -> str:
+    """Dateiendung aus dem URL-Pfad, sonst aus dem Content-Type"""
+    suffix = PurePosixPath(urlparse(url).path).suffix.lower()
+    if ASSET_SUFFIX_PATTERN.fullmatch(suffix):
+        return suffix
+    if content_type:
+        return mimetypes.guess_extension(content_type.split(';', 1)[0].strip()) or ''
+    return ''
+
+
+class AssetMirror:
+    """Lädt jede Asset-URL genau einmal und legt den Inhalt inhaltsadressiert unter assets/ ab
+
+    Gleiche Dateien unter verschiedenen URLs landen nur einmal auf der Platte. Seiten, die
+    gleichzeitig dasselbe Asset brauchen, warten auf denselben Download. In Stylesheets
+    werden die Ziele von url(...) und @import ebenfalls gespiegelt und lokal verlinkt.
+    """
+
+    DIRECTORY = "assets"
+
+    def __init__(self, output_dir: Path, write, limiter, concurrency: int = 8, timeout: int = 30,
+                 log: Callable[..., None] = print):
+        self.output_dir = output_dir
+        self.log = log
+        self.write = write  # async (Pfad, Bytes), z. B. SmartCrawler.write_output
+        self.limiter = limiter  # HostLimiter oder CrawlScheduler (beide mit slot(url))
+        self.client = HttpClient(concurrency, timeout)
+        self.downloaded = 0
+        self.deduplicated = 0
+        self.failed = 0
+        self.bytes = 0
+        self._tasks: dict = {}   # URL -> Task mit lokalem Pfad (None bei Fehlern)
+        self._stored: dict = {}  # SHA-256 -> lokaler Pfad
+        self._waiting: dict = {}  # Stylesheet-URL -> URLs, auf deren Download es wartet
+        (output_dir / self.DIRECTORY).mkdir(parents=True, exist_ok=True)
+
+    def fetch(self, url: str) -> asyncio.Future:
+        """Liefert den (gemeinsamen) Download-Task einer URL"""
+        task = self._tasks.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download(url))
+            self._tasks[url] = task
+        return task
+
+    async def _download(self, url: str) -> Optional[str]:
+        try:
+            async with self.limiter.slot(url):
+                body, content_type = await self.client.fetch_bytes(url)
+            if body is None:
+                self.failed += 1
+                return None
+            if is_stylesheet(url, content_type):
+                body = await self._localize_stylesheet(url, body)
+            digest = hashlib.sha256(body).hexdigest()
+            local_path = self._stored.get(digest)
+            if local_path is not None:
+                self.deduplicated += 1
+                return local_path
+            local_path = f"{self.DIRECTORY}/{digest[:32]}{asset_extension(url, content_type)}"
+            self._stored[digest] = local_path
+            await self.write(self.output_dir / local_path, body)
+            self.downloaded += 1
+            self.bytes += len(body)
+            return local_path
+        except Exception as e:
+            self.log(f"⚠️  Asset nicht gespeichert: {url} ({e})")
+            self.failed += 1
+            return None
+
+    async def _localize_stylesheet(self, url: str, body: bytes) -> bytes:
+        """Lädt die Verweisziele eines Stylesheets und setzt ihre lokalen Dateinamen ein
+
+        Alle Assets liegen im selben Verzeichnis, der relative Verweis ist also der Dateiname.
+        Nicht ladbare Ziele behalten ihre absolute URL. Fremde Kodierungen bleiben byteweise erhalten.
+        """
+        css = body.decode('utf-8', errors='surrogateescape')
+        targets = {}
+        for reference in css_references(css):
+            target = asset_url(reference, url)
+            if target is not None:
+                targets[reference] = target
+        unique = list(dict.fromkeys(targets.values()))
+        paths = await asyncio.gather(*(self._fetch_reference(target, url) for target in unique))
+        names = {target: PurePosixPath(path).name for target, path in zip(unique, paths) if path}
+
+        def replace(reference: str) -> Optional[str]:
+            target = targets.get(reference)
+            if target is None:
+                return None
+            name = names.get(target)
+            if name is None:
+                return target
+            anchor = reference.partition('#')[2]
+            return f"{name}#{anchor}" if anchor else name
+
+        return rewrite_css_references(css, replace).encode('utf-8', errors='surrogateescape')
+
+    async def _fetch_reference(self, url: str, stylesheet: str) -> Optional[str]:
+        """Wie fetch für Verweise aus Stylesheets; Kreise (@import im Kreis) bleiben absolut"""
+        pending = [url]
+        seen = set()
+        while pending:
+            current = pending.pop()
+            if current == stylesheet:
+                return None
+            if current not in seen:
+                seen.add(current)
+                pending.extend(self._waiting.get(current, ()))
+        waiting = self._waiting.setdefault(stylesheet, set())
+        waiting.add(url)
+        try:
+            return await self.fetch(url)
+        finally:
+            waiting.discard(url)
+
+    async def localize(self, content: str, assets: dict, format_type: str) -> str:
+        """Lädt die Assets eines Dokuments und ersetzt die Platzhalter durch lokale Pfade
+
+        Fehlgeschlagene Assets behalten ihre absolute URL.
+        """
+        keys = [key for key in set(ASSET_MARKER_PATTERN.findall(content)) if key in assets]
+        mapping = await self._resolve(keys, assets, format_type)
+        return ASSET_MARKER_PATTERN.sub(lambda m: mapping.get(m.group(1), m.group(0)), content)
+
+    async def localize_file(self, path: Path, assets: dict, format_type: str) -> Tuple[int, str]:
+        """Wie localize für ein gespooltes Dokument (speicherarmer Modus); liefert (Bytes, SHA-256)"""
+        mapping = await self._resolve(list(assets), assets, format_type)
+        return await asyncio.to_thread(replace_asset_markers_file, path, mapping)
+
+    async def _resolve(self, keys: List[str], assets: dict, format_type: str) -> dict:
+        """Platzhalter -> lokaler Pfad bzw. absolute URL, falls der Download fehlschlägt"""
+        paths = await asyncio.gather(*(self.fetch(assets[key]) for key in keys))
+        mapping = {}
+        for key, local_path in zip(keys, paths):
+            if local_path is None:
+                local_path = html_escape(assets[key], quote=True) if format_type == 'html' else assets[key]
+            mapping[key] = local_path
+        return mapping
+
+    async def close(self) -> None:
+        """Bricht offene Downloads ab und schließt den HTTP-Client"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        await self.client.close()
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                           PAGE PROCESSING                                  │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+COPY_BUTTON_SELECTOR = '.copy, .copy-button, .btn-copy, .fa-copy, button[title="Copy"]'
+NAVIGATION_SELECTOR = 'nav, .navigation, .nav, .sidebar, .toc, aside'
+CLEAN_SELECTORS = {
+    'html': 'script, style, meta, link[rel="stylesheet"]',
+    'md': 'script, style, meta, link',
+}
+SIMPLE_SELECTOR_PATTERN = re.compile(r'(?P<tag>[a-z][a-z0-9]*)?(?:\.(?P<cls>[\w-]+))?'
+                                     r'(?:\[(?P<attr>[\w-]+)="(?P<value>[^"]*)"\])?')
+PARSER_BACKENDS = ['html.parser', 'lxml', 'selectolax']
+
+
+def resolve_parser(name: str) -> str:
+    """Wählt das Parser-Backend; 'auto' nimmt das schnellste installierte"""
+    if name == 'auto':
+        for candidate in ('selectolax', 'lxml'):
+            if importlib.util.find_spec(candidate) is not None:
+                return candidate
+        return 'html.parser'
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unbekanntes Parser-Backend: {name}")
+    if name != 'html.parser' and importlib.util.find_spec(name) is None:
+        raise ValueError(f"Parser-Backend '{name}' ist nicht installiert (pip install {name})")
+    return name
+
+
+def cleanup_selectors(format_type: str, include_nav: bool, clean_output: bool) -> str:
+    """Kombiniert alle zu entfernenden Selektoren für die gegebenen Einstellungen"""
+    selectors = [COPY_BUTTON_SELECTOR]
+    if not include_nav:
+        selectors.append(NAVIGATION_SELECTOR)
+    if clean_output:
+        selectors.append(CLEAN_SELECTORS[format_type])
+    return ', '.join(selectors)
+
+
+class SelectorMatcher:
+    """Vorkompilierte einfache CSS-Selektoren (tag, .klasse, tag[attr="wert"]) für einen DOM-Durchlauf"""
+
+    def __init__(self, selectors: str):
+        self.selectors = selectors
+        self.tags = set()
+        self.classes = set()
+        self.rules = []  # (tag, klasse, attribut, wert) für zusammengesetzte Selektoren
+        for selector in selectors.split(','):
+            match = SIMPLE_SELECTOR_PATTERN.fullmatch(selector.strip())
+            if not match or not any(match.group('tag', 'cls', 'attr')):
+                raise ValueError(f"Selektor wird nicht unterstützt: {selector.strip()}")
+            tag, cls, attr, value = match.group('tag', 'cls', 'attr', 'value')
+            if tag and not cls and not attr:
+                self.tags.add(tag)
+            elif cls and not tag and not attr:
+                self.classes.add(cls)
+            else:
+                self.rules.append((tag, cls, attr, value))
+
+    def matches(self, tag: Tag) -> bool:
+        """Prüft, ob ein Element auf einen der Selektoren passt"""
+        if tag.name in self.tags:
+            return True
+        classes = tag.get('class') or ()
+        if self.classes and any(cls in self.classes for cls in classes):
+            return True
+        for rule_tag, rule_cls, attr, value in self.rules:
+            if rule_tag and tag.name != rule_tag:
+                continue
+            if rule_cls and rule_cls not in classes:
+                continue
+            if attr:
+                actual = tag.get(attr)
+                if isinstance(actual, list):
+                    actual = ' '.join(actual)
+                if actual != value:
+                    continue
+            return True
+        return False
+
+
+@lru_cache(maxsize=None)
+def compile_cleanup(format_type: str, include_nav: bool, clean_output: bool) -> SelectorMatcher:
+    """Liefert den (gecachten) Matcher für die gegebenen Einstellungen"""
+    return SelectorMatcher(cleanup_selectors(format_type, include_nav, clean_output))
+
+
+def resolve_html_href(href: str, filename_mapping) -> Optional[str]:
+    """Liefert das neue Linkziel für einen lokalen .html-Link oder None"""
+    # Extrahiere Dateiname und Anker
+    if '#' in href:
+        filename, anchor = href.split('#', 1)
+        anchor = '#' + anchor
+    else:
+        filename = href
+        anchor = ''
+
+    # Wenn es ein lokaler Link ist, entsprechenden neuen Dateinamen finden
+    if filename.endswith('.html') and not filename.startswith('http') and filename in filename_mapping:
+        return filename_mapping[filename] + anchor
+    return None
+
+
+def clean_soup(soup: BeautifulSoup, matcher: SelectorMatcher, link_index: Optional[LinkIndex] = None,
+               page_url: str = '', assets: Optional[dict] = None) -> None:
+    """Entfernt alle passenden Elemente und korrigiert Links in einem einzigen Baumdurchlauf
+
+    Ist assets gesetzt, werden Asset-Referenzen durch Platzhalter ersetzt (siehe AssetMirror).
+    """
+    from bs4 import Tag
+    filename_mapping = link_index.by_filename if link_index is not None else None
+    stack = [soup]
+    while stack:
+        node = stack.pop()
+        for child in list(node.contents):
+            if not isinstance(child, Tag):
+                continue
+            if matcher.matches(child):
+                child.decompose()
+                continue
+            if filename_mapping is not None and child.name == 'a':
+                href = child.get('href')
+                if href and isinstance(href, str):
+                    new_href = resolve_html_href(href, filename_mapping)
+                    if new_href is not None:
+                        child['href'] = new_href
+            if assets is not None and child.name in ASSET_ATTRIBUTES:
+                for attr in asset_attributes(child.name, child.get('rel')):
+                    value = child.get(attr)
+                    if value and isinstance(value, str):
+                        child[attr] = mark_asset_attribute(attr, value, page_url, assets)
+            stack.append(child)
+
+
+def rewrite_links_html(soup: BeautifulSoup, link_index: LinkIndex) -> BeautifulSoup:
+    """Konvertiert interne Links in HTML-Dokumenten zu den neuen Dateinamen"""
+    filename_mapping = link_index.by_filename
+    for link in soup.find_all('a', href=True):
+        href = link.get('href')
+        if href and isinstance(href, str):
+            new_href = resolve_html_href(href, filename_mapping)
+            if new_href is not None:
+                link['href'] = new_href
+    return soup
+
+
+def rewrite_links_markdown(content: str, link_index: LinkIndex) -> str:
+    """Konvertiert interne Links von .html zu .md Dateinamen"""
+    filename_mapping = link_index.by_filename
+
+    def replace_link(match):
+        full_match = match.group(0)
+        text = match.group(1)
+        link = match.group(2)
+
+        # Extrahiere Dateiname und Anker
+        if '#' in link:
+            filename, anchor = link.split('#', 1)
+            anchor = '#' + anchor
+        else:
+            filename = link
+            anchor = ''
+
+        # Wenn es ein interner Link ist (endet mit .html oder .md)
+        if filename.endswith('.html'):
+            # Finde entsprechenden MD-Dateinamen
+            if filename in filename_mapping:
+                new_filename = filename_mapping[filename]
+                return f'[{text}]({new_filename}{anchor})'
+        elif filename.endswith('.md'):
+            # Über normalisierten Titel bzw. Kapitelnummer im Index auflösen
+            new_filename = link_index.resolve_md(filename)
+            if new_filename:
+                return f'[{text}]({new_filename}{anchor})'
+
+        return full_match
+
+    # Ersetze Links in Markdown-Format: [Text](link)
+    content = MD_LINK_PATTERN.sub(replace_link, content)
+
+    # Ersetze auch direkte Links in Klammern: (link)
+    content = MD_HTML_PAREN_PATTERN.sub(
+        lambda m: '(' + filename_mapping.get(m.group(1).split('#')[0], m.group(1)) +
+        (('#' + m.group(1).split('#')[1]) if '#' in m.group(1) else '') + ')',
+        content)
+
+    # Spezialfall: Links die mit ./ beginnen (relative Links zum Root)
+    content = MD_ROOT_LINK_PATTERN.sub(r'[\1](index.md)', content)
+
+    return content
+
+
+def clean_html_selectolax(html: str, selectors: str, link_index: Optional[LinkIndex],
+                          boilerplate: Optional[frozenset] = None, seen: Optional[list] = None,
+                          page_url: str = '', assets: Optional[dict] = None) -> str:
+    """Bereinigung mit selectolax (lexbor) in zwei CSS-Abfragen
+
+    Die erste findet alle zu entfernenden Elemente (ein kombinierter Selektor), die zweite
+    Links und Asset-Referenzen gemeinsam, unterschieden nach Tag. Beide Suchen laufen in
+    lexbor selbst; ein Python-Durchlauf über jedes Element wie in clean_soup ist hier langsamer.
+    """
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+
+    tree = HTMLParser(html)
+    # Verschachtelte Treffer überspringen - sie verschwinden mit ihrem Vorfahren
+    removed = set()
+    to_remove = []
+    for node in tree.css(selectors):
+        parent = node.parent
+        while parent is not None and parent.mem_id not in removed:
+            parent = parent.parent
+        if parent is None:
+            removed.add(node.mem_id)
+            to_remove.append(node)
+    for node in to_remove:
+        node.decompose()
+
+    if boilerplate or seen is not None:
+        strip_boilerplate_selectolax(tree.body or tree.root, boilerplate or frozenset(), seen)
+
+    rewrite = []
+    if link_index is not None:
+        rewrite.append('a[href]')
+    if assets is not None:
+        rewrite.append(ASSET_SELECTOR)
+    if rewrite:
+        filename_mapping = link_index.by_filename if link_index is not None else None
+        for node in tree.css(', '.join(rewrite)):
+            if node.tag == 'a':
+                href = node.attributes.get('href')
+                if href:
+                    new_href = resolve_html_href(href, filename_mapping)
+                    if new_href is not None:
+                        node.attrs['href'] = new_href
+                continue
+            for attr in asset_attributes(node.tag, node.attributes.get('rel')):
+                value = node.attributes.get(attr)
+                if value:
+                    node.attrs[attr] = mark_asset_attribute(attr, value, page_url, assets)
+    return tree.html or ""
+
+
+def markdown_converter():
+    """html2text mit den Einstellungen des Crawlers (eine Instanz pro Dokument)"""
+    import html2text
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    h.ignore_images = False
+    h.body_width = 0
+    h.unicode_snob = True
+    return h
+
+
+def render_page(html: str, url: str, format_type: str, include_nav: bool, clean_output: bool,
+                link_index: LinkIndex, parser: str = 'html.parser', timings: Optional[dict] = None,
+                boilerplate: Optional[frozenset] = None, fingerprints: Optional[dict] = None,
+                assets: Optional[dict] = None) -> str:
+    """Wandelt rohes HTML in das fertige Ausgabedokument um (reine CPU-Arbeit, ohne I/O)
+
+    Ist timings gesetzt, werden dort die Sekunden pro Stufe eingetragen. Bei HTML-Ausgabe
+    und bei selectolax sind Link-Korrektur bzw. Parsen Teil der Stufe 'cleanup', ebenso
+    das Entfernen der Boilerplate.
+    Blöcke aus boilerplate werden vor html2text entfernt; ist fingerprints gesetzt, landet
+    dort der Simhash des fertigen Dokuments ('simhash').
+    Ist assets gesetzt, stehen im Dokument Platzhalter statt Asset-URLs; assets bildet sie
+    auf die absoluten URLs ab (AssetMirror.localize setzt die lokalen Pfade ein).
+    """
+    mark = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal mark
+        now = time.perf_counter()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + now - mark
+        mark = now
+
+    # Links im HTML nur für HTML-Ausgabe korrigieren, Markdown wird nach html2text korrigiert
+    html_link_index = link_index if format_type == 'html' else None
+    if parser == 'selectolax':
+        cleaned = clean_html_selectolax(html, cleanup_selectors(format_type, include_nav, clean_output),
+                                        html_link_index, boilerplate, page_url=url, assets=assets)
+        lap('cleanup')
+    else:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, parser)
+        lap('parse')
+        clean_soup(soup, compile_cleanup(format_type, include_nav, clean_output), html_link_index, url, assets)
+        if boilerplate:
+            strip_boilerplate(soup, boilerplate)
+        cleaned = str(soup)
+        lap('cleanup')
+
+    if format_type == 'html':
+        if fingerprints is not None:
+            fingerprints["simhash"] = simhash(TAG_PATTERN.sub(' ', cleaned))
+            lap('fingerprint')
+        return f"<!-- Original URL: {url} -->\n{cleaned}"
+
+    markdown_content = markdown_converter().handle(cleaned)
+    lap('html2text')
+
+    # Links korrigieren - NACH der Konvertierung zu Markdown
+    markdown_content = rewrite_links_markdown(markdown_content, link_index)
+    lap('link_rewrite')
+
+    if fingerprints is not None:
+        fingerprints["simhash"] = simhash(markdown_content)
+        lap('fingerprint')
+
+    return f"<!-- Original URL: {url} -->\n\n{markdown_content}"
+
+
+def page_blocks(html: str, format_type: str, include_nav: bool, clean_output: bool,
+                parser: str = 'html.parser') -> List[str]:
+    """Fingerabdrücke der Blöcke einer bereinigten Seite (Grundlage für das Boilerplate-Lernen)"""
+    blocks: List[str] = []
+    if parser == 'selectolax':
+        clean_html_selectolax(html, cleanup_selectors(format_type, include_nav, clean_output), None, seen=blocks)
+    else:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, parser)
+        clean_soup(soup, compile_cleanup(format_type, include_nav, clean_output), None)
+        strip_boilerplate(soup, frozenset(), blocks)
+    return blocks
+
+
+# Zustand eines Worker-Prozesses, gesetzt durch init_render_worker
+_worker_settings: dict = {}
+
+
+def init_render_worker(format_type: str, include_nav: bool, clean_output: bool, link_index: LinkIndex,
+                       parser: str = 'html.parser') -> None:
+    """Initialisiert einen Worker-Prozess einmalig mit Crawl-Einstellungen und Link-Index"""
+    _worker_settings.update(format_type=format_type, include_nav=include_nav,
+                            clean_output=clean_output, link_index=link_index, parser=parser)
+
+
+def render_page_in_worker(html: str, url: str, boilerplate: Optional[frozenset] = None, analyze: bool = False,
+                          mirror: bool = False, measure: bool = False
+                          ) -> Tuple[str, dict, Optional[dict], Optional[dict], Optional[int]]:
+    """Einstiegspunkt für den Process-Pool; liefert Dokument, Stufen-Zeiten, Fingerabdrücke, Assets
+    und (mit measure) den Speicher-Peak in Bytes"""
+    timings: dict = {}
+    fingerprints = {} if analyze else None
+    assets = {} if mirror else None
+    with peak_memory(measure) as memory:
+        content = render_page(html, url, timings=timings, boilerplate=boilerplate, fingerprints=fingerprints,
+                              assets=assets, **_worker_settings)
+    return content, timings, fingerprints, assets, memory.get("peak")
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                        LOW-MEMORY RENDERING                                │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+STREAM_CHUNK_CHARS = 1 << 20  # Zeichen pro Parser-Happen und Schreibblock
+VOID_ELEMENTS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                           'param', 'source', 'track', 'wbr'})
+ASSET_MARKER_LENGTH = len('__asset_') + 16 + len('__')
+
+
+class StreamTag:
+    """Element-Ansicht für SelectorMatcher ohne Dokumentbaum (Name und Attribute)"""
+
+    __slots__ = ('name', 'attrs')
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def get(self, key: str, default=None):
+        value = self.attrs.get(key, default)
+        # Wie BeautifulSoup: class als Liste
+        if key == 'class' and isinstance(value, str):
+            return value.split()
+        return value
+
+
+class SpoolFile:
+    """Schreibt Text stückweise UTF-8-kodiert in eine Datei und führt Größe und SHA-256 mit
+
+    Ist markers gesetzt, sammelt es die Schlüssel der geschriebenen Asset-Platzhalter
+    (ein Platzhalter muss dazu in einem Stück geschrieben werden).
+    """
+
+    def __init__(self, path: Path, markers: Optional[set] = None):
+        self.path = path
+        self.size = 0
+        self.markers = markers
+        self._hash = hashlib.sha256()
+        self._file = open(path, 'wb')
+
+    def write(self, text: str) -> None:
+        if self.markers is not None:
+            self.markers.update(ASSET_MARKER_PATTERN.findall(text))
+        data = text.encode('utf-8')
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    def close(self) -> Tuple[int, str]:
+        """Schließt die Datei; liefert (Bytes, SHA-256)"""
+        self._file.close()
+        return self.size, self._hash.hexdigest()
+
+
+class StreamingCleaner(HTMLParser):
+    """SAX-artige Bereinigung: entfernt passende Elemente samt Inhalt, korrigiert Links und
+    markiert Assets, ohne einen Dokumentbaum aufzubauen
+
+    Das Ergebnis geht stückweise an write. Ein entferntes Element endet mit dem passenden
+    End-Tag gleichen Namens; nicht geschlossene Kindelemente stören dabei nicht.
+    """
+
+    def __init__(self, write, matcher: SelectorMatcher, link_index: Optional[LinkIndex] = None,
+                 page_url: str = '', assets: Optional[dict] = None):
+        super().__init__(convert_charrefs=False)
+        self.write = write
+        self.matcher = matcher
+        self.filename_mapping = link_index.by_filename if link_index is not None else None
+        self.page_url = page_url
+        self.assets = assets
+        self.skip_tag: Optional[str] = None
+        self.skip_depth = 0
+
+    def _start(self, tag: str, attrs: list, closed: bool) -> None:
+        if self.skip_tag is not None:
+            if tag == self.skip_tag and not closed:
+                self.skip_depth += 1
+            return
+        element = StreamTag(tag, dict(attrs))
+        if self.matcher.matches(element):
+            if not closed and tag not in VOID_ELEMENTS:
+                self.skip_tag, self.skip_depth = tag, 1
+            return
+        changed = False
+        if self.filename_mapping is not None and tag == 'a':
+            href = element.attrs.get('href')
+            new_href = resolve_html_href(href, self.filename_mapping) if href else None
+            if new_href is not None:
+                element.attrs['href'] = new_href
+                changed = True
+        if self.assets is not None and tag in ASSET_ATTRIBUTES:
+            for attr in asset_attributes(tag, element.attrs.get('rel')):
+                value = element.attrs.get(attr)
+                if value:
+                    element.attrs[attr] = mark_asset_attribute(attr, value, self.page_url, self.assets)
+                    changed = True
+        if not changed:
+            self.write(self.get_starttag_text())
+            return
+        parts = [tag] + [key if value is None else f'{key}="{html_escape(value, quote=True)}"'
+                         for key, value in element.attrs.items()]
+        self.write(f"<{' '.join(parts)}{' /' if closed else ''}>")
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+                if self.skip_depth == 0:
+                    self.skip_tag = None
+            return
+        self.write(f"</{tag}>")
+
+    def handle_data(self, data):
+        if self.skip_tag is None:
+            self.write(data)
+
+    # Zeichenreferenzen wie BeautifulSoup ausgeben: dekodiert, nur &, < und > maskiert
+    def handle_entityref(self, name):
+        if self.skip_tag is None:
+            self.write(html_escape(html_unescape(f"&{name};"), quote=False))
+
+    def handle_charref(self, name):
+        if self.skip_tag is None:
+            self.write(html_escape(html_unescape(f"&#{name};"), quote=False))
+
+    def handle_comment(self, data):
+        if self.skip_tag is None:
+            self.write(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        self.write(f"<!{decl}>")
+
+    def handle_pi(self, data):
+        if self.skip_tag is None:
+            self.write(f"<?{data}>")
+
+    def unknown_decl(self, data):
+        if self.skip_tag is None:
+            self.write(f"<![{data}]>")
+
+
+class MarkdownStream:
+    """html2text schrittweise: nimmt HTML in Happen an und gibt fertiges Markdown sofort weiter
+
+    html2text bietet dafür keine öffentliche Schnittstelle - gelesen wird die schon erzeugte
+    Ausgabe aus HTML2Text.outtextlist. Die Version ist deshalb in pyproject.toml festgelegt,
+    tests/test_streaming.py vergleicht das Ergebnis mit render_page. Fehlt das Feld (andere
+    Version), wird das Dokument am Ende wie gewohnt mit handle() am Stück konvertiert.
+    """
+
+    def __init__(self):
+        self.converter = markdown_converter()
+        self.incremental = isinstance(getattr(self.converter, 'outtextlist', None), list)
+        self._html: List[str] = []
+
+    def feed(self, html: str) -> str:
+        """Verarbeitet einen Happen HTML; liefert das bereits fertige Markdown"""
+        if not self.incremental:
+            self._html.append(html)
+            return ''
+        self.converter.feed(html)
+        # Das letzte Stück braucht html2text noch (z.B. für Überschriften in Links)
+        output = self.converter.outtextlist
+        if len(output) < 2:
+            return ''
+        text = ''.join(output[:-1])
+        del output[:-1]
+        # Wie HTML2Text.finish mit unicode_snob
+        return text.replace("&nbsp_place_holder;", "\xa0")
+
+    def finish(self) -> str:
+        """Restliches Markdown nach dem letzten Happen"""
+        if not self.incremental:
+            return self.converter.handle(''.join(self._html))
+        self.converter.feed("")
+        return self.converter.finish()
+
+
+def render_page_streaming(html: str, url: str, format_type: str, include_nav: bool, clean_output: bool,
+                          link_index: LinkIndex, path: Path, timings: Optional[dict] = None,
+                          assets: Optional[dict] = None) -> Tuple[int, str]:
+    """Wie render_page, aber für sehr große Seiten: schreibt das Dokument stückweise nach path
+
+    Das HTML wird in Happen durch StreamingCleaner und (bei Markdown) html2text geschoben;
+    Markdown-Links werden absatzweise korrigiert. Neben dem Eingabetext liegen nur wenige
+    Happen gleichzeitig im Speicher. Boilerplate und Simhash entfallen in diesem Modus.
+    Liefert (Bytes, SHA-256) der geschriebenen Datei; die Zeit zählt als Stufe 'stream'.
+    """
+    start = time.perf_counter()
+    # Nur Platzhalter, die in der Ausgabe ankommen, sollen geladen werden (html2text verwirft z.B. Skripte)
+    emitted = set() if assets is not None else None
+    spool = SpoolFile(path, emitted)
+    try:
+        pieces: List[str] = []
+        html_link_index = link_index if format_type == 'html' else None
+        cleaner = StreamingCleaner(pieces.append, compile_cleanup(format_type, include_nav, clean_output),
+                                   html_link_index, url, assets)
+
+        if format_type == 'html':
+            spool.write(f"<!-- Original URL: {url} -->\n")
+
+            def emit_cleaned() -> None:
+                spool.write(''.join(pieces))
+                pieces.clear()
+        else:
+            converter = MarkdownStream()
+            spool.write(f"<!-- Original URL: {url} -->\n\n")
+            pending = ''
+
+            def emit_markdown(text: str, final: bool = False) -> None:
+                nonlocal pending
+                pending += text
+                if final:
+                    cut = len(pending)
+                elif len(pending) < STREAM_CHUNK_CHARS:
+                    return
+                else:
+                    # Nur vollständige Absätze korrigieren - Links überspannen keine Leerzeile
+                    cut = pending.rfind('\n\n') + 1
+                    if cut == 0 and len(pending) > 4 * STREAM_CHUNK_CHARS:
+                        # Riesiger Block ohne Leerzeile (z.B. Tabelle): notfalls am Zeilenende
+                        cut = pending.rfind('\n') + 1
+                if cut:
+                    spool.write(rewrite_links_markdown(pending[:cut], link_index))
+                    pending = pending[cut:]
+
+            def emit_cleaned() -> None:
+                emit_markdown(converter.feed(''.join(pieces)))
+                pieces.clear()
+
+        for offset in range(0, len(html), STREAM_CHUNK_CHARS):
+            cleaner.feed(html[offset:offset + STREAM_CHUNK_CHARS])
+            emit_cleaned()
+        cleaner.close()
+        emit_cleaned()
+        if format_type != 'html':
+            emit_markdown(converter.finish(), final=True)
+    except BaseException:
+        spool.close()
+        raise
+    result = spool.close()
+    if assets is not None:
+        for key in set(assets) - emitted:
+            del assets[key]
+    if timings is not None:
+        timings['stream'] = timings.get('stream', 0.0) + time.perf_counter() - start
+    return result
+
+
+def stream_page_in_worker(html: str, url: str, path: Path, mirror: bool = False,
+                          measure: bool = False) -> Tuple[int, str, dict, Optional[dict], Optional[int]]:
+    """Einstiegspunkt für den Process-Pool im speicherarmen Modus"""
+    timings: dict = {}
+    assets = {} if mirror else None
+    settings = {key: value for key, value in _worker_settings.items() if key != 'parser'}
+    with peak_memory(measure) as memory:
+        size, digest = render_page_streaming(html, url, path=path, timings=timings, assets=assets, **settings)
+    return size, digest, timings, assets, memory.get("peak")
+
+
+def replace_asset_markers_file(path: Path, mapping: dict) -> Tuple[int, str]:
+    """Ersetzt Asset-Platzhalter in einer gespoolten Datei blockweise; liefert (Bytes, SHA-256)"""
+    tmp_path = path.with_name(f"{path.name}.assets")
+    spool = SpoolFile(tmp_path)
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as source:
+            carry = ''
+            for chunk in iter(lambda: source.read(STREAM_CHUNK_CHARS), ''):
+                buffer = carry + chunk
+                # Ein Platzhalter am Blockende kann angeschnitten sein - er wandert in den nächsten Block
+                cut = max(0, len(buffer) - (ASSET_MARKER_LENGTH - 1))
+                straddling = ASSET_MARKER_PATTERN.search(buffer, max(0, cut - ASSET_MARKER_LENGTH + 1))
+                if straddling is not None and straddling.start() < cut:
+                    cut = straddling.start()
+                spool.write(ASSET_MARKER_PATTERN.sub(lambda m: mapping.get(m.group(1), m.group(0)), buffer[:cut]))
+                carry = buffer[cut:]
+            spool.write(ASSET_MARKER_PATTERN.sub(lambda m: mapping.get(m.group(1), m.group(0)), carry))
+    except BaseException:
+        spool.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    result = spool.close()
+    os.replace(tmp_path, path)
+    return result
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                             FILE WRITER                                    │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+def create_temp_file(directory: Optional[Path], prefix: str, suffix: str = '.tmp') -> Tuple[Path, int]:
+    """Legt eine neue Datei mit eindeutigem Namen an; liefert (Pfad, Dateideskriptor)
+
+    Anders als bei mkstemp (immer 0600) wendet der Kernel die umask an, die Datei hat also
+    nach dem Umbenennen dieselben Rechte wie eine mit open() geschriebene.
+    """
+    directory = Path(directory) if directory is not None else Path(tempfile.gettempdir())
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    for _ in range(tempfile.TMP_MAX):
+        path = directory / f"{prefix}{secrets.token_hex(6)}{suffix}"
+        try:
+            return path, os.open(path, flags, 0o666)
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Keine freie temporäre Datei in {directory}")
+
+
+def open_temp_file(path: Path) -> Tuple[Path, io.BufferedWriter]:
+    """Öffnet eine eindeutige temporäre Datei neben path zum atomaren Ersetzen; liefert (Pfad, Datei)
+
+    Mehrere Schreibvorgänge auf dasselbe Ziel kommen sich so nicht in die Quere.
+    """
+    tmp_path, fd = create_temp_file(path.parent, f".{path.name}.")
+    try:
+        return tmp_path, os.fdopen(fd, 'wb')
+    except BaseException:
+        os.close(fd)
+        tmp_path.unlink()
+        raise
+
+
+def write_file_atomic(path: Path, data: bytes, fsync: bool = False) -> bool:
+    """Schreibt über eine temporäre Datei und atomares Umbenennen; überspringt identische Inhalte
+
+    Gibt zurück, ob die Datei geschrieben wurde.
+    """
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp_path, f = open_temp_file(path)
+    try:
+        with f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return True
+
+
+class FileWriter:
+    """Asynchrone Schreibstufe: Begrenzte Queue, atomare Dateien und gebündelte fsyncs in einem Thread"""
+
+    def __init__(self, queue_size: int = 64, batch_size: int = 32, fsync: bool = True,
+                 log: Callable[..., None] = print):
+        self.log = log  # wird aus dem Schreib-Thread aufgerufen
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.written = 0
+        self.unchanged = 0
+        self.errors: List[str] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Startet die Schreibstufe im laufenden Event-Loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, path: Path, data: Union[bytes, Path]) -> asyncio.Future:
+        """Reiht eine Datei ein; wartet nur, wenn die Queue voll ist (Backpressure)
+
+        data ist der Inhalt oder eine fertig geschriebene temporäre Datei im selben
+        Verzeichnis (speicherarmer Modus), die nur noch umbenannt wird. Das gelieferte
+        Future ergibt (Erfolg, Sekunden), sobald die Datei umbenannt ist (oder identisch
+        vorlag) bzw. das Schreiben fehlschlug; die Sekunden reichen vom Öffnen bis zum Umbenennen.
+        """
+        written = asyncio.get_running_loop().create_future()
+        await self._queue.put((path, data, written))
+        return written
+
+    async def _run(self) -> None:
+        """Nimmt Dateien aus der Queue und schreibt sie blockweise"""
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            done = False
+            # Bereits wartende Dateien gemeinsam schreiben - ein fsync-Durchgang pro Block
+            while len(batch) < self.batch_size and not self._queue.empty():
+                next_item = self._queue.get_nowait()
+                if next_item is None:
+                    done = True
+                    break
+                batch.append(next_item)
+            results = await asyncio.to_thread(self._write_batch, [(path, data) for path, data, _ in batch])
+            for (_, _, written), result in zip(batch, results):
+                written.set_result(result)
+            for _ in range(len(batch) + (1 if done else 0)):
+                self._queue.task_done()
+            if done:
+                return
+
+    def _write_batch(self, batch: List[Tuple[Path, Union[bytes, Path]]]) -> List[Tuple[bool, float]]:
+        """Schreibt einen Block: temporäre Dateien, gemeinsamer fsync, dann atomares Umbenennen
+
+        Liefert pro Datei, ob sie danach mit dem neuen Inhalt vorliegt, und die darauf
+        verwendeten Sekunden (ohne den gemeinsamen fsync der Verzeichnisse).
+        """
+        results = [False] * len(batch)
+        seconds = [0.0] * len(batch)
+        pending = []
+        for position, (path, data) in enumerate(batch):
+            start = time.perf_counter()
+            try:
+                if isinstance(data, Path):
+                    try:
+                        pending.append((position, path, data, open(data, 'rb')))
+                    except OSError as e:
+                        self.errors.append(path.name)
+                        self.log(f"❌ Schreibfehler bei {path.name}: {e}")
+                    continue
+                try:
+                    if path.stat().st_size == len(data) and path.read_bytes() == data:
+                        self.unchanged += 1
+                        results[position] = True
+                        continue
+                except OSError:
+                    pass
+                try:
+                    tmp_path, f = open_temp_file(path)
+                except OSError as e:
+                    self.errors.append(path.name)
+                    self.log(f"❌ Schreibfehler bei {path.name}: {e}")
+                    continue
+                try:
+                    f.write(data)
+                    pending.append((position, path, tmp_path, f))
+                except OSError as e:
+                    f.close()
+                    tmp_path.unlink(missing_ok=True)
+                    self.errors.append(path.name)
+                    self.log(f"❌ Schreibfehler bei {path.name}: {e}")
+            finally:
+                seconds[position] += time.perf_counter() - start
+
+        for position, path, tmp_path, f in pending:
+            start = time.perf_counter()
+            try:
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+                f.close()
+                os.replace(tmp_path, path)
+                self.written += 1
+                results[position] = True
+            except OSError as e:
+                f.close()
+                tmp_path.unlink(missing_ok=True)
+                self.errors.append(path.name)
+                self.log(f"❌ Schreibfehler bei {path.name}: {e}")
+            seconds[position] += time.perf_counter() - start
+
+        # Verzeichniseinträge der Umbenennungen einmal pro Block sichern
+        if self.fsync and pending and hasattr(os, 'O_DIRECTORY'):
+            for directory in {path.parent for _, path, _, _ in pending}:
+                try:
+                    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
+        return list(zip(results, seconds))
+
+    async def close(self) -> None:
+        """Schreibt alle ausstehenden Dateien und beendet die Schreibstufe"""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                            BUNDLE OUTPUT                                   │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+BUNDLE_FORMATS = ['jsonl', 'tar.gz', 'tar.zst', 'zip']
+
+
+def open_zstd_writer(raw):
+    """Öffnet einen zstd-Kompressionsstrom (stdlib ab Python 3.14, sonst zstandard)"""
+    if importlib.util.find_spec('compression') is not None:
+        from compression import zstd
+        return zstd.ZstdFile(raw, 'w')
+    if importlib.util.find_spec('zstandard') is None:
+        raise ValueError("Format 'tar.zst' benötigt Python 3.14 oder das Paket zstandard (pip install zstandard)")
+    import zstandard
+    return zstandard.ZstdCompressor().stream_writer(raw)
+
+
+def bundle_path(output_dir: str, bundle_format: str) -> Path:
+    """Zieldatei des Bundles: -o direkt, wenn es auf die Endung passt, sonst crawl.<endung> darin"""
+    path = Path(output_dir)
+    if path.name.endswith('.' + bundle_format):
+        return path
+    return path / f"crawl.{bundle_format}"
+
+
+class BundleWriter:
+    """Schreibt alle Seiten inkrementell in eine Datei (JSONL, tar.gz, tar.zst oder zip)
+
+    Seiten werden in Kapitel-Reihenfolge ausgegeben: Fertige Seiten warten, bis alle
+    vorherigen Kapitel erledigt (gespeichert oder fehlgeschlagen) sind.
+    """
+
+    def __init__(self, path: Path, bundle_format: str, chapter_urls: List[str]):
+        if bundle_format not in BUNDLE_FORMATS:
+            raise ValueError(f"Unbekanntes Bundle-Format: {bundle_format}")
+        self.path = path
+        self.bundle_format = bundle_format
+        self.positions = {url: position for position, url in enumerate(chapter_urls)}
+        self.records = 0
+        self._pending: dict = {}
+        self._done: set = set()
+        self._next = 0
+        self._lock = asyncio.Lock()
+        self._tmp_path: Optional[Path] = None
+        self._raw = None
+        self._stream = None
+        self._archive = None
+        self._open()
+
+    def _open(self) -> None:
+        """Öffnet die temporäre Zieldatei und das passende Container-Format"""
+        self._tmp_path, self._raw = open_temp_file(self.path)
+        if self.bundle_format == 'jsonl':
+            self._stream = self._raw
+        elif self.bundle_format == 'zip':
+            self._archive = zipfile.ZipFile(self._raw, 'w', compression=zipfile.ZIP_DEFLATED)
+        elif self.bundle_format == 'tar.gz':
+            self._archive = tarfile.open(fileobj=self._raw, mode='w|gz')
+        else:
+            self._stream = open_zstd_writer(self._raw)
+            self._archive = tarfile.open(fileobj=self._stream, mode='w|')
+
+    def put(self, url: str, record: dict) -> None:
+        """Hinterlegt den Datensatz einer Seite; geschrieben wird er mit done()"""
+        position = self.positions.get(url)
+        if position is not None:
+            self._pending[position] = record
+
+    async def done(self, url: str) -> None:
+        """Markiert eine Seite als erledigt und schreibt alle Seiten, die jetzt an der Reihe sind"""
+        position = self.positions.get(url)
+        if position is None:
+            return
+        self._done.add(position)
+        async with self._lock:
+            ready = []
+            while self._next in self._done:
+                self._done.discard(self._next)
+                record = self._pending.pop(self._next, None)
+                if record is not None:
+                    ready.append(record)
+                self._next += 1
+            if ready:
+                await asyncio.to_thread(self._emit, ready)
+
+    def _emit(self, records: List[dict]) -> None:
+        """Hängt Datensätze an das Bundle an (blockierend)"""
+        for record in records:
+            if self.bundle_format == 'jsonl':
+                line = json.dumps(record, ensure_ascii=False) + "\n"
+                self._stream.write(line.encode('utf-8'))
+            else:
+                self._add_member(record["filename"], record["content"].encode('utf-8'))
+            self.records += 1
+
+    def _add_member(self, name: str, data: bytes) -> None:
+        """Fügt eine Datei zum tar- oder zip-Archiv hinzu"""
+        if isinstance(self._archive, zipfile.ZipFile):
+            self._archive.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._archive.addfile(info, io.BytesIO(data))
+
+    async def close(self, index_data: Optional[dict] = None) -> None:
+        """Schließt das Bundle, legt index.json bei (nur Archive) und ersetzt die Zieldatei atomar"""
+        async with self._lock:
+            await asyncio.to_thread(self._close, index_data)
+
+    def _close(self, index_data: Optional[dict]) -> None:
+        if self._raw is None:
+            return
+        if self._archive is not None:
+            if index_data is not None:
+                self._add_member("index.json", json.dumps(index_data, ensure_ascii=False, indent=2).encode('utf-8'))
+            self._archive.close()
+        if self._stream is not None and self._stream is not self._raw:
+            self._stream.close()
+        if not self._raw.closed:
+            self._raw.close()
+        os.replace(self._tmp_path, self.path)
+        self._raw = None
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                               CHUNK EXPORT                                 │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+CHUNKS_FORMAT = "smart-crawler-chunks/1"
+# Token-Schätzung ohne Tokenizer: Wörter und einzelne Satzzeichen
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+MARKDOWN_HEADING = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+MARKDOWN_FENCE = re.compile(r'^\s*(`{3,}|~{3,})')
+MARKDOWN_COMMENT = re.compile(r'^\s*<!--.*-->\s*$', re.DOTALL)
+
+
+def count_tokens(text: str) -> int:
+    """Geschätzte Token-Anzahl eines Textes"""
+    return sum(1 for _ in TOKEN_PATTERN.finditer(text))
+
+
+def token_starts(text: str) -> List[int]:
+    """Zeichenpositionen, an denen die geschätzten Tokens beginnen"""
+    return [match.start() for match in TOKEN_PATTERN.finditer(text)]
+
+
+def iter_markdown_blocks(lines) -> Iterator[Tuple[int, str]]:
+    """Zerlegt Markdown-Zeilen in Überschriften (Ebene, Zeile) und Absätze (0, Text)
+
+    Code-Blöcke bleiben ein Absatz, auch über Leerzeilen hinweg; '#' darin ist keine Überschrift.
+    Reine HTML-Kommentare (z.B. der Original-URL-Vermerk) werden übersprungen.
+    """
+    block: List[str] = []
+    fence = None
+
+    def flush():
+        text = "\n".join(block).strip("\n")
+        block.clear()
+        if text.strip() and not MARKDOWN_COMMENT.match(text):
+            return text
+        return None
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if fence is not None:
+            block.append(line)
+            if line.strip().startswith(fence) and not line.strip().strip(fence[0]):
+                fence = None
+            continue
+        opening = MARKDOWN_FENCE.match(line)
+        if opening:
+            fence = opening.group(1)
+            block.append(line)
+            continue
+        heading = MARKDOWN_HEADING.match(line)
+        if heading or not line.strip():
+            text = flush()
+            if text:
+                yield 0, text
+            if heading:
+                yield len(heading.group(1)), line.strip()
+            continue
+        block.append(line)
+    text = flush()
+    if text:
+        yield 0, text
+
+
+def split_block(text: str, limit: int) -> Iterator[Tuple[str, str, int]]:
+    """Teilt einen zu langen Absatz in (Trenner, Stück, Tokens) mit höchstens limit Tokens
+
+    Geteilt wird an Zeilenumbrüchen, eine einzelne zu lange Zeile an Token-Grenzen. Der Trenner
+    verbindet das Stück mit seinem Vorgänger, damit ein Chunk den Originaltext wiedergibt.
+    """
+    separator = "\n\n"
+    piece: List[str] = []
+    piece_tokens = 0
+    for line in text.split("\n"):
+        line_tokens = count_tokens(line)
+        if piece and piece_tokens + line_tokens > limit:
+            yield separator, "\n".join(piece), piece_tokens
+            separator, piece, piece_tokens = "\n", [], 0
+        if line_tokens > limit:
+            starts = token_starts(line)
+            for i in range(0, len(starts), limit):
+                end = starts[i + limit] if i + limit < len(starts) else len(line)
+                yield separator, line[starts[i] if i else 0:end].rstrip(), min(limit, len(starts) - i)
+                separator = " "
+            separator = "\n"
+            continue
+        piece.append(line)
+        piece_tokens += line_tokens
+    if piece:
+        yield separator, "\n".join(piece), piece_tokens
+
+
+def chunk_markdown(lines, max_tokens: int = 512, overlap: int = 64) -> Iterator[Tuple[str, Tuple[str, ...], int]]:
+    """Teilt ein Markdown-Kapitel in Chunks (Text, Überschriften-Pfad, Tokens)
+
+    Chunks enden an Überschriften und sonst an Absatzgrenzen, sobald max_tokens erreicht wären.
+    Innerhalb eines Abschnitts beginnt jeder Folge-Chunk mit den letzten overlap Tokens seines
+    Vorgängers; zu lange Absätze werden an Zeilen, notfalls an Token-Grenzen geteilt.
+    Überschriften ohne eigenen Text werden dem nächsten Chunk vorangestellt.
+    """
+    step = max(1, max_tokens - overlap)
+    path: List[Tuple[int, str]] = []
+    headings: List[str] = []  # Noch nicht ausgegebene Überschriften-Zeilen
+    tail = ""                 # Überlappung aus dem vorherigen Chunk desselben Abschnitts
+    body: List[Tuple[str, str]] = []  # (Trenner, Stück)
+    tokens = 0
+
+    def emit():
+        nonlocal tail, tokens
+        text = "\n\n".join(headings + ([tail] if tail else []))
+        for separator, piece in body:
+            text = text + separator + piece if text else piece
+        chunk = (text, tuple(title for _, title in path), tokens)
+        headings.clear()
+        body.clear()
+        tail = ""
+        if overlap:
+            starts = token_starts(text)
+            tail = text[starts[-overlap]:] if len(starts) > overlap else text
+        tokens = count_tokens(tail)
+        return chunk
+
+    for level, text in iter_markdown_blocks(lines):
+        if level:
+            # Neuer Abschnitt: offenen Chunk abschließen, Überlappung verwerfen
+            if body:
+                yield emit()
+            tail = ""
+            title = MARKDOWN_HEADING.match(text).group(2)
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, title))
+            headings.append(text)
+            tokens = sum(count_tokens(line) for line in headings)
+            continue
+
+        block_tokens = count_tokens(text)
+        pieces = [("\n\n", text, block_tokens)] if block_tokens <= step else split_block(text, step)
+        for separator, piece, piece_tokens in pieces:
+            if body and tokens + piece_tokens > max_tokens:
+                yield emit()
+            body.append((separator, piece))
+            tokens += piece_tokens
+    if body:
+        yield emit()
+
+
+def write_npy(path: Path, values: array, shape: Tuple[int, ...]) -> None:
+    """Schreibt ein array im .npy-Format (Version 1.0), lesbar mit numpy.load(..., mmap_mode='r')"""
+    descr = {'i': '<i4', 'q': '<i8'}[values.typecode]
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': {shape!r}, }}"
+    # Kopf samt Magic auf 64 Byte auffüllen, damit die Daten ausgerichtet beginnen
+    header += " " * (-(len(header) + 11) % 64) + "\n"
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    with open(path, 'wb') as f:
+        f.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin-1'))
+        values.tofile(f)
+
+
+class ChunkWriter:
+    """Exportiert die Kapitel inkrementell als Chunks in ein spaltenorientiertes Verzeichnis
+
+    Die Texte aller Chunks liegen hintereinander in text.bin (UTF-8), die Überschriften-Pfade
+    (Ebenen durch Zeilenumbruch getrennt) in headings.bin. Je Chunk gibt es Byte-Offsets,
+    Kapitel-Position und Tokens als .npy-Spalten; Kapitelnummer, Titel, URL und Dateiname
+    stehen einmal pro Kapitel in chunks.json. Die Texte werden angehängt, sobald ein Kapitel
+    fertig ist; order.npy liefert beim Abschluss die Zeilen in Kapitel-Reihenfolge.
+    """
+
+    COLUMNS = {
+        "offsets": "int64[n+1], Byte-Offsets der Chunks in text.bin",
+        "heading_offsets": "int64[n+1], Byte-Offsets der Überschriften-Pfade in headings.bin",
+        "chapter": "int32[n], Position des Kapitels in chapters",
+        "tokens": "int32[n], geschätzte Tokens",
+        "order": "int64[n], Zeilen in Kapitel-Reihenfolge",
+    }
+
+    def __init__(self, directory: Path, chapters: List[dict], max_tokens: int = 512, overlap: int = 64):
+        if max_tokens < 1 or not 0 <= overlap < max_tokens:
+            raise ValueError("Chunks brauchen mindestens 1 Token und eine Überlappung kleiner als die Chunk-Größe")
+        self.directory = directory
+        self.chapters = chapters
+        self.positions = {chapter["url"]: chapter["index"] for chapter in chapters}
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self.offsets = array('q', [0])
+        self.heading_offsets = array('q', [0])
+        self.chapter = array('i')
+        self.tokens = array('i')
+        self.exported = 0  # Kapitel mit mindestens einem Chunk
+        self._lock = asyncio.Lock()
+        directory.mkdir(parents=True, exist_ok=True)
+        self._text = open(directory / ".text.bin.tmp", 'wb')
+        self._headings = open(directory / ".headings.bin.tmp", 'wb')
+
+    @property
+    def count(self) -> int:
+        return len(self.chapter)
+
+    async def add(self, url: str, source: Union[str, Path]) -> int:
+        """Zerlegt ein Kapitel (Markdown-Text oder -Datei) und hängt seine Chunks an"""
+        position = self.positions.get(url)
+        if position is None:
+            return 0
+        async with self._lock:
+            return await asyncio.to_thread(self._add, position, source)
+
+    def _add(self, position: int, source: Union[str, Path]) -> int:
+        if isinstance(source, Path):
+            with open(source, 'r', encoding='utf-8') as lines:
+                return self._append(position, chunk_markdown(lines, self.max_tokens, self.overlap))
+        return self._append(position, chunk_markdown(source.splitlines(), self.max_tokens, self.overlap))
+
+    def _append(self, position: int, chunks) -> int:
+        added = 0
+        for text, heading_path, tokens in chunks:
+            data = text.encode('utf-8')
+            self._text.write(data)
+            self.offsets.append(self.offsets[-1] + len(data))
+            heading = "\n".join(heading_path).encode('utf-8')
+            self._headings.write(heading)
+            self.heading_offsets.append(self.heading_offsets[-1] + len(heading))
+            self.chapter.append(position)
+            self.tokens.append(tokens)
+            added += 1
+        if added:
+            self.exported += 1
+        return added
+
+    async def close(self) -> None:
+        """Schreibt Spalten und chunks.json und ersetzt die vorherigen Dateien"""
+        async with self._lock:
+            await asyncio.to_thread(self._close)
+
+    def _close(self) -> None:
+        if self._text.closed:
+            return
+        self._text.close()
+        self._headings.close()
+        count = self.count
+        order = array('q', sorted(range(count), key=self.chapter.__getitem__))
+        columns = {"offsets": (self.offsets, (count + 1,)),
+                   "heading_offsets": (self.heading_offsets, (count + 1,)),
+                   "chapter": (self.chapter, (count,)),
+                   "tokens": (self.tokens, (count,)),
+                   "order": (order, (count,))}
+        for name, (values, shape) in columns.items():
+            write_npy(self.directory / f".{name}.npy.tmp", values, shape)
+        meta = {
+            "format": CHUNKS_FORMAT,
+            "count": count,
+            "max_tokens": self.max_tokens,
+            "overlap": self.overlap,
+            "tokenizer": TOKEN_PATTERN.pattern,
+            "columns": self.COLUMNS,
+            "chapters": self.chapters,
+        }
+        for name in ["text.bin", "headings.bin"] + [f"{name}.npy" for name in columns]:
+            os.replace(self.directory / f".{name}.tmp", self.directory / name)
+        # chunks.json zuletzt: Wer es liest, findet alle Spalten vollständig vor
+        write_file_atomic(self.directory / "chunks.json",
+                          json.dumps(meta, ensure_ascii=False, indent=2).encode('utf-8'))
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                               SEARCH INDEX                                 │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+SEARCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_pages (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    url TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    chapter_number TEXT,
+    title TEXT,
+    position INTEGER,
+    format TEXT,
+    content_hash TEXT,
+    indexed_at TEXT,
+    UNIQUE (site, url)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(title, body, tokenize='unicode61 remove_diacritics 2');
+INSERT INTO search_fts (search_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)');
+"""
+# Seiten werden in Abschnitte dieser Größe indiziert; rowid = Seiten-ID << SEGMENT_BITS | Abschnitt.
+# So bleiben Rangfolge und Textausschnitte auch bei sehr großen Seiten schnell.
+SEARCH_SEGMENT_CHARS = 4096
+SEGMENT_BITS = 20
+MARKDOWN_LINK_TARGET = re.compile(r'\]\([^)]*\)')
+HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+
+
+class HtmlTextExtractor(HTMLParser):
+    """Sammelt den sichtbaren Text eines HTML-Dokuments (ohne Skripte und Styles)"""
+
+    SKIP = frozenset(['script', 'style', 'noscript', 'template'])
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+
+def search_text(content: str, format_type: str) -> str:
+    """Durchsuchbarer Text einer Seite: Markdown ohne Linkziele, HTML ohne Tags"""
+    if format_type == 'html':
+        extractor = HtmlTextExtractor()
+        extractor.feed(content)
+        extractor.close()
+        return re.sub(r'\s*\n\s*', '\n', " ".join(extractor.parts)).strip()
+    return MARKDOWN_LINK_TARGET.sub(']', HTML_COMMENT.sub('', content)).strip()
+
+
+def search_segments(text: str, size: int = SEARCH_SEGMENT_CHARS) -> Iterator[str]:
+    """Teilt Text an Absatz-, Zeilen- oder Wortgrenzen in Abschnitte von höchstens size Zeichen"""
+    start = 0
+    while start < len(text):
+        end = start + size
+        if end < len(text):
+            for separator in ("\n\n", "\n", " "):
+                cut = text.rfind(separator, start, end)
+                if cut > start:
+                    end = cut
+                    break
+        yield text[start:end]
+        start = end
+
+
+def fts_query(query: str) -> str:
+    """Macht aus freier Eingabe eine gültige FTS5-Abfrage: jeder Begriff als Phrase, alle müssen vorkommen"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+class SearchIndex:
+    """Volltextindex (SQLite FTS5) über die Seiten eines oder mehrerer Crawls
+
+    Seiten sind nach Site (Ausgabeverzeichnis oder Bundle) und URL verschlüsselt, wie in
+    index.json. Eine Seite wird nur neu indiziert, wenn sich ihr Inhalts-Hash ändert.
+    Rangfolge nach BM25 (Titel zehnfach gewichtet) über den besten Abschnitt jeder Seite.
+    Die Datenbank läuft im WAL-Modus, Suchen funktionieren also auch während eines Crawls.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.updated = 0
+        self.unchanged = 0
+        self._pending = 0
+        self._lock = asyncio.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SEARCH_SCHEMA)
+        except sqlite3.OperationalError as e:
+            self._db.close()
+            raise ValueError(f"Suchindex {path} nicht nutzbar (SQLite mit FTS5 erforderlich): {e}") from e
+
+    def indexed_hash(self, site: str, url: str) -> Optional[str]:
+        row = self._db.execute("SELECT content_hash FROM search_pages WHERE site = ? AND url = ?",
+                               (site, url)).fetchone()
+        return row[0] if row else None
+
+    def update(self, site: str, entry: dict, source: Union[str, Path], format_type: str,
+               content_hash: Optional[str] = None) -> bool:
+        """Indiziert eine Seite (Text oder Datei) neu, falls ihr Inhalt sich geändert hat (blockierend)
+
+        entry enthält url, filename, chapter_number, title und index wie in index.json.
+        """
+        if isinstance(source, Path):
+            if content_hash is not None and content_hash == self.indexed_hash(site, entry["url"]):
+                return self._skip(site, entry)
+            source = source.read_text(encoding='utf-8')
+        if content_hash is None:
+            content_hash = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        row = self._db.execute("SELECT id, content_hash FROM search_pages WHERE site = ? AND url = ?",
+                               (site, entry["url"])).fetchone()
+        if row and row[1] == content_hash:
+            return self._skip(site, entry)
+
+        values = (entry["filename"], entry["chapter_number"], entry["title"], entry["index"], format_type,
+                  content_hash, datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        if row:
+            page_id = row[0]
+            self._db.execute("UPDATE search_pages SET filename = ?, chapter_number = ?, title = ?, position = ?, "
+                             "format = ?, content_hash = ?, indexed_at = ? WHERE id = ?", values + (page_id,))
+            self._delete_segments(page_id)
+        else:
+            page_id = self._db.execute(
+                "INSERT INTO search_pages (site, url, filename, chapter_number, title, position, format, "
+                "content_hash, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (site, entry["url"]) + values
+            ).lastrowid
+        self._db.executemany("INSERT INTO search_fts (rowid, title, body) VALUES (?, ?, ?)",
+                             (((page_id << SEGMENT_BITS) | number, entry["title"], segment)
+                              for number, segment in enumerate(search_segments(search_text(source, format_type)))))
+        self.updated += 1
+        self._count()
+        return True
+
+    def _delete_segments(self, page_id: int) -> None:
+        self._db.execute("DELETE FROM search_fts WHERE rowid BETWEEN ? AND ?",
+                         (page_id << SEGMENT_BITS, ((page_id + 1) << SEGMENT_BITS) - 1))
+
+    def _skip(self, site: str, entry: dict) -> bool:
+        """Unveränderter Inhalt: nur Dateiname und Position nachziehen"""
+        self._db.execute("UPDATE search_pages SET filename = ?, chapter_number = ?, title = ?, position = ? "
+                         "WHERE site = ? AND url = ?",
+                         (entry["filename"], entry["chapter_number"], entry["title"], entry["index"],
+                          site, entry["url"]))
+        self.unchanged += 1
+        self._count()
+        return False
+
+    def _count(self) -> None:
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.commit()
+
+    def prune(self, site: str, urls) -> int:
+        """Entfernt Seiten einer Site, die nicht mehr zum Crawl gehören (blockierend)"""
+        keep = set(urls)
+        stale = [rowid for rowid, url in self._db.execute("SELECT id, url FROM search_pages WHERE site = ?", (site,))
+                 if url not in keep]
+        for page_id in stale:
+            self._delete_segments(page_id)
+            self._db.execute("DELETE FROM search_pages WHERE id = ?", (page_id,))
+        self.commit()
+        return len(stale)
+
+    def commit(self) -> None:
+        self._db.commit()
+        self._pending = 0
+
+    async def add(self, site: str, entry: dict, source: Union[str, Path], format_type: str,
+                  content_hash: Optional[str] = None) -> bool:
+        """update() im Thread; mehrere Crawls teilen sich die Verbindung nacheinander"""
+        async with self._lock:
+            return await asyncio.to_thread(self.update, site, entry, source, format_type, content_hash)
+
+    async def finish(self, site: str, urls) -> int:
+        """prune() im Thread und Commit am Ende eines Crawls"""
+        async with self._lock:
+            return await asyncio.to_thread(self.prune, site, urls)
+
+    def add_directory(self, output_dir: str) -> Tuple[int, int]:
+        """Indiziert ein vorhandenes Ausgabeverzeichnis anhand seiner index.json
+
+        Liefert (neu indiziert, entfernt).
+        """
+        output_path = Path(output_dir).resolve()
+        with open(output_path / "index.json", 'r', encoding='utf-8') as f:
+            index_data = json.load(f)
+        site = str(output_path)
+        format_type = index_data.get("format", "md")
+        updated = self.updated
+        urls = []
+        for entry in index_data.get("files", []):
+            path = output_path / entry["filename"]
+            if not path.exists():
+                continue
+            urls.append(entry["url"])
+            self.update(site, entry, path, format_type, entry.get("content_hash"))
+        return self.updated - updated, self.prune(site, urls)
+
+    def search(self, query: str, limit: int = 10, site: Optional[str] = None) -> List[dict]:
+        """Rangfolge der Seiten mit Kapitelnummer, Titel, Datei und Textausschnitt
+
+        query ist FTS5-Syntax (z.B. 'daten NOT csv', '"data frame"', 'einles*'); ist sie ungültig,
+        wird jeder Begriff als Phrase gesucht. site filtert auf Sites, die den Text enthalten.
+        """
+        sql = ("SELECT search_fts.rowid >> ? AS page_id, search_fts.rowid, min(search_fts.rank) AS score "
+               "FROM search_fts JOIN search_pages p ON p.id = search_fts.rowid >> ? "
+               "WHERE search_fts MATCH ?" + (" AND instr(p.site, ?) > 0" if site else "") +
+               " GROUP BY page_id ORDER BY score LIMIT ?")
+
+        def run(match: str):
+            parameters = (SEGMENT_BITS, SEGMENT_BITS, match) + ((site,) if site else ()) + (limit,)
+            return match, self._db.execute(sql, parameters).fetchall()
+        try:
+            match, best = run(query)
+        except sqlite3.OperationalError:
+            match, best = run(fts_query(query))
+
+        # Textausschnitte nur für die besten Abschnitte der gefundenen Seiten
+        hits = []
+        for page_id, segment, score in best:
+            row = self._db.execute(
+                "SELECT p.site, p.url, p.filename, p.chapter_number, p.title, p.position, "
+                "snippet(search_fts, 1, '»', '«', ' … ', 16) "
+                "FROM search_fts JOIN search_pages p ON p.id = ? WHERE search_fts MATCH ? AND search_fts.rowid = ?",
+                (page_id, match, segment)).fetchone()
+            if row:
+                columns = ("site", "url", "filename", "chapter_number", "title", "position", "snippet")
+                hits.append({**dict(zip(columns, row)), "score": score})
+        return hits
+
+    def close(self) -> None:
+        self.commit()
+        self._db.close()
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                               METRICS                                      │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+STAGES = ['navigation', 'fetch_http', 'fetch_browser', 'parse', 'cleanup', 'html2text', 'link_rewrite',
+          'stream', 'fingerprint', 'assets', 'chunk', 'index', 'write']
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@contextmanager
+def peak_memory(enabled: bool):
+    """Misst per tracemalloc den zusätzlichen Spitzenbedarf des Python-Heaps im Block
+
+    Liefert ein Dict, in dem nach dem Block 'peak' (Bytes) steht; ohne enabled bleibt es leer.
+    """
+    result: dict = {}
+    if not enabled:
+        yield result
+        return
+    import tracemalloc
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        yield result
+    finally:
+        result["peak"] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        if started:
+            tracemalloc.stop()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Perzentil nach dem Nearest-Rank-Verfahren (0 bei leerer Liste)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[rank - 1]
+
+
+class CrawlMetrics:
+    """Sammelt Zeiten pro Seite und Stufe, Wiederholungen, Bytes und Abruf-Latenzen"""
+
+    def __init__(self):
+        self.pages: dict = {}
+        self.global_stages: dict = {}
+        self.fetch_latencies: List[float] = []
+
+    def page(self, url: str) -> dict:
+        """Liefert den Messdatensatz einer Seite (legt ihn bei Bedarf an)"""
+        record = self.pages.get(url)
+        if record is None:
+            record = {"url": url, "filename": None, "status": "pending", "retries": 0,
+                      "bytes_in": 0, "bytes_out": 0, "total": 0.0, "stages": {}}
+            self.pages[url] = record
+        return record
+
+    def add_stage(self, url: Optional[str], stage: str, seconds: float) -> None:
+        """Addiert Zeit auf eine Stufe; ohne URL zählt sie für den gesamten Crawl"""
+        stages = self.global_stages if url is None else self.page(url)["stages"]
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def add_stages(self, url: str, timings: dict) -> None:
+        for stage, seconds in timings.items():
+            self.add_stage(url, stage, seconds)
+
+    @contextmanager
+    def stage(self, url: Optional[str], name: str):
+        """Misst die Dauer eines Blocks als Stufe"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(url, name, time.perf_counter() - start)
+
+    def finish(self, url: str, filename: str, status: str, retries: int, total: float) -> None:
+        """Schließt den Datensatz einer Seite ab"""
+        record = self.page(url)
+        record.update(filename=filename, status=status, retries=retries, total=total)
+
+    def summary(self) -> dict:
+        """Aggregierte Kennzahlen über alle Seiten"""
+        stages = {}
+        for name in STAGES:
+            values = [record["stages"][name] for record in self.pages.values() if name in record["stages"]]
+            if name in self.global_stages:
+                values.append(self.global_stages[name])
+            if values:
+                stages[name] = self._distribution(values)
+        statuses: dict = {}
+        for record in self.pages.values():
+            statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+        summary = {
+            "pages": statuses,
+            "retries": sum(record["retries"] for record in self.pages.values()),
+            "bytes_in": sum(record["bytes_in"] for record in self.pages.values()),
+            "bytes_out": sum(record["bytes_out"] for record in self.pages.values()),
+            "fetch_latency": self._distribution(self.fetch_latencies),
+            "page_time": self._distribution([record["total"] for record in self.pages.values()
+                                             if record["status"] != "pending"]),
+            "stages": stages,
+        }
+        # Nur mit --memory-stats gemessen; große Seiten zählen auch ohne Messung
+        peaks = [record["peak_memory"] for record in self.pages.values() if "peak_memory" in record]
+        if peaks:
+            summary["peak_memory"] = self._distribution(peaks)
+            summary["peak_memory"]["max"] = max(peaks)
+        streamed = sum(1 for record in self.pages.values() if record.get("streamed"))
+        if streamed:
+            summary["streamed_pages"] = streamed
+        return summary
+
+    @staticmethod
+    def _distribution(values: List[float]) -> dict:
+        return {"count": len(values), "sum": round(sum(values), 6),
+                "p50": round(percentile(values, 0.5), 6),
+                "p95": round(percentile(values, 0.95), 6),
+                "p99": round(percentile(values, 0.99), 6)}
+
+    def to_json(self, elapsed: float) -> dict:
+        """Vollständiger Bericht für --metrics-out"""
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "elapsed": round(elapsed, 6),
+            "summary": self.summary(),
+            "global_stages": {name: round(value, 6) for name, value in self.global_stages.items()},
+            "pages": [dict(record, total=round(record["total"], 6),
+                           stages={name: round(value, 6) for name, value in record["stages"].items()})
+                      for record in self.pages.values()],
+        }
+
+    def to_prometheus(self, elapsed: float) -> str:
+        """Kennzahlen im Prometheus-Textformat"""
+        summary = self.summary()
+        lines = [
+            "# HELP smart_crawler_elapsed_seconds Gesamtdauer des Crawls",
+            "# TYPE smart_crawler_elapsed_seconds gauge",
+            f"smart_crawler_elapsed_seconds {elapsed:.6f}",
+            "# HELP smart_crawler_pages_total Seiten nach Status",
+            "# TYPE smart_crawler_pages_total counter",
+        ]
+        lines += [f'smart_crawler_pages_total{{status="{status}"}} {count}'
+                  for status, count in sorted(summary["pages"].items())]
+        lines += [
+            "# HELP smart_crawler_retries_total Wiederholte Abrufe",
+            "# TYPE smart_crawler_retries_total counter",
+            f"smart_crawler_retries_total {summary['retries']}",
+            "# HELP smart_crawler_bytes_total Gelesene und geschriebene Bytes",
+            "# TYPE smart_crawler_bytes_total counter",
+            f'smart_crawler_bytes_total{{direction="in"}} {summary["bytes_in"]}',
+            f'smart_crawler_bytes_total{{direction="out"}} {summary["bytes_out"]}',
+            "# HELP smart_crawler_fetch_latency_seconds Latenz der Seitenabrufe",
+            "# TYPE smart_crawler_fetch_latency_seconds summary",
+        ]
+        lines += self._prometheus_summary("smart_crawler_fetch_latency_seconds", "", summary["fetch_latency"])
+        lines += [
+            "# HELP smart_crawler_stage_seconds Zeit pro Seite und Stufe",
+            "# TYPE smart_crawler_stage_seconds summary",
+        ]
+        for name, distribution in summary["stages"].items():
+            lines += self._prometheus_summary("smart_crawler_stage_seconds", f'stage="{name}"', distribution)
+        if "peak_memory" in summary:
+            lines += [
+                "# HELP smart_crawler_page_peak_memory_bytes Spitzen-Speicherbedarf pro Seite (tracemalloc)",
+                "# TYPE smart_crawler_page_peak_memory_bytes summary",
+            ]
+            lines += self._prometheus_summary("smart_crawler_page_peak_memory_bytes", "", summary["peak_memory"])
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _prometheus_summary(metric: str, labels: str, distribution: dict) -> List[str]:
+        separator = "," if labels else ""
+        lines = [f'{metric}{{{labels}{separator}quantile="{q}"}} {distribution[key]}'
+                 for q, key in zip(QUANTILES, ("p50", "p95", "p99"))]
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{metric}_sum{suffix} {distribution['sum']}")
+        lines.append(f"{metric}_count{suffix} {distribution['count']}")
+        return lines
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                             PAGE RECORD                                    │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+class PageRecord:
+    """Eine verarbeitete Seite aus SmartCrawler.iter_pages
+
+    status ist 'success' (content enthält das fertige Dokument), 'failed', 'resumed'
+    (laut Journal erledigt), 'skipped' (Datei existiert), 'unchanged' (304) oder 'dry_run'.
+    Große Seiten im speicherarmen Modus liegen stattdessen in der temporären Datei
+    content_file (content bleibt leer); wer sie nicht über crawl_website speichert, löscht sie.
+    """
+
+    def __init__(self, index: int, url: str, chapter_number: str, title: str, filename: str,
+                 format_type: str):
+        self.index = index
+        self.url = url
+        self.chapter_number = chapter_number
+        self.title = title
+        self.filename = filename
+        self.format = format_type
+        self.status = "pending"
+        self.content: Optional[str] = None
+        self.content_file: Optional[Path] = None
+        self.content_size = 0
+        self.content_hash: Optional[str] = None
+        self.response_headers = None
+        self.duplicate_of: Optional[Tuple[str, str]] = None  # (URL, Dateiname) des frühesten gleichen Kapitels
+        self.written: Optional[asyncio.Future] = None  # Schreibstufe: (Erfolg, Sekunden) nach dem Umbenennen
+        self.retries = 0
+        self.timings: dict = {}
+        self.error_message: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.status not in ("failed", "pending")
+
+    def __repr__(self) -> str:
+        return f"PageRecord({self.index}, {self.url!r}, status={self.status!r})"
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                            CRAWL JOURNAL                                   │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+class CrawlJournal:
+    """Append-only Journal der Seitenergebnisse plus gespeicherte Kapitel-Reihenfolge für --resume"""
+
+    STATE_FILE = ".crawl_state.json"
+    JOURNAL_FILE = ".crawl_journal.jsonl"
+
+    def __init__(self, output_dir: Path, log: Callable[..., None] = print):
+        self.log = log
+        self.state_path = output_dir / self.STATE_FILE
+        self.journal_path = output_dir / self.JOURNAL_FILE
+        self._file = None
+
+    def load_state(self) -> Optional[dict]:
+        """Liest Start-URL, Format und Kapitel-Reihenfolge des letzten Crawls"""
+        if not self.state_path.exists():
+            return None
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️  Crawl-Status nicht lesbar: {e}")
+            return None
+        state["chapter_order"] = [tuple(item) for item in state.get("chapter_order", [])]
+        return state
+
+    def start(self, start_url: str, format_type: str, chapter_order: List[Tuple[str, str, str]]) -> None:
+        """Speichert die Kapitel-Reihenfolge und beginnt ein neues, leeres Journal"""
+        state = {"start_url": start_url, "format": format_type, "chapter_order": chapter_order}
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+        self._file = open(self.journal_path, 'w', encoding='utf-8')
+
+    def resume(self) -> dict:
+        """Liest das Journal einmalig ein und öffnet es zum Anhängen; liefert den letzten Eintrag pro URL"""
+        entries = {}
+        if self.journal_path.exists():
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Abgebrochene letzte Zeile nach einem Absturz ignorieren
+                        continue
+                    entries[entry["url"]] = entry
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        return entries
+
+    def record(self, url: str, filename: str, success: bool, meta: Optional[dict] = None) -> None:
+        """Hängt das Ergebnis einer Seite an und schreibt es sofort durch"""
+        if self._file is None:
+            return
+        entry = {"url": url, "filename": filename, "status": "done" if success else "failed"}
+        if meta:
+            entry["meta"] = meta
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """Schließt das Journal"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 
 # ╭─────────────────────────────────────────────────────────────────────────────╮
@@ -27,327 +3102,784 @@ from typing import List, Tuple, Optional
 # ╰─────────────────────────────────────────────────────────────────────────────╯
 
 class SmartCrawler:
-    def __init__(self, delay: float = 0, timeout: int = 30, max_retries: int = 3):
+    def __init__(self, delay: float = 0, timeout: int = 30, max_retries: int = 3,
+                 concurrency: int = 1, per_host_limit: Optional[int] = None,
+                 recycle_after: int = 100, cache: Optional[ResponseCache] = None,
+                 engine: str = 'browser', workers: int = 0, parser: str = 'html.parser',
+                 retry_policy: Optional[RetryPolicy] = None, adaptive: bool = False,
+                 breaker_threshold: float = 0.5, breaker_cooldown: float = 30, fsync: bool = True,
+                 bundle_content: str = 'md', log: Callable[..., None] = print,
+                 dedup: bool = False, dedup_distance: int = 3,
+                 mirror_assets: bool = False, asset_concurrency: int = 8,
+                 large_page_mb: float = 16, memory_stats: bool = False,
+                 export_chunks: bool = False, chunk_tokens: int = 512, chunk_overlap: int = 64,
+                 search_index: Optional[SearchIndex] = None,
+                 scheduler: Optional[CrawlScheduler] = None):
+        self.log = log  # Fortschrittsausgabe; für die Einbettung z. B. logging.getLogger(...).info
         self.chapter_order: List[Tuple[str, str, str]] = []
         self.filename_mapping: dict = {}  # Mapping von URLs zu Dateinamen
+        self.link_index: Optional[LinkIndex] = None
         self.delay = delay
         self.timeout = timeout
         self.max_retries = max_retries
+        self.concurrency = max(1, concurrency)
+        self.host_limiter = HostLimiter(delay, per_host_limit or self.concurrency, adaptive=adaptive,
+                                        breaker_threshold=breaker_threshold, breaker_cooldown=breaker_cooldown,
+                                        log=log)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries)
+        self.fsync = fsync
+        self.bundle_content = bundle_content
+        self.last_failure: dict = {}  # URL -> (Statuscode, Retry-After) des letzten fehlgeschlagenen Abrufs
+        self.recycle_after = recycle_after
+        self.browser_pool: Optional[BrowserPool] = None
+        self.http_client: Optional[HttpClient] = None
+        self.cache = cache
+        self.engine = engine  # 'browser', 'http' oder 'auto'
+        self.workers = workers  # 0 = Verarbeitung im Event-Loop
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.parser = resolve_parser(parser)
         self.skip_existing = False
         self.dry_run = False
         self.include_nav = True
         self.clean_output = False
+        self.incremental = False
+        self.max_age: Optional[float] = None
+        self.manifest: dict = {}   # Einträge aus einem vorhandenen index.json, nach URL
+        self.page_meta: dict = {}  # Hash, Abrufzeit und Validatoren der aktuellen Seiten
+        self.journal: Optional[CrawlJournal] = None
+        self.writer: Optional[FileWriter] = None
+        self.bundle: Optional[BundleWriter] = None
+        self.metrics = CrawlMetrics()
+        self.completed: dict = {}  # Im Journal als erledigt markierte Seiten (--resume)
+        self.dedup = dedup
+        self.dedup_distance = dedup_distance
+        self.boilerplate_model: Optional[BoilerplateModel] = None
+        self.duplicates: Optional[DuplicateIndex] = None
+        self.duplicate_turns: Optional[ChapterTurns] = None
+        self.fingerprints: dict = {}  # URL -> Simhash der zuletzt verarbeiteten Fassung
+        self.prefetched: dict = {}  # URL -> beim Boilerplate-Lernen geladenes Abrufergebnis
+        self.mirror_assets = mirror_assets
+        self.asset_concurrency = max(1, asset_concurrency)
+        self.assets: Optional[AssetMirror] = None
+        self.page_assets: dict = {}  # URL -> Platzhalter der zuletzt verarbeiteten Fassung
+        self.lastmod: dict = {}  # URL -> lastmod aus der Sitemap
+        # Seiten ab dieser Größe (Zeichen HTML) speicherarm verarbeiten, 0 = nie
+        self.large_page_bytes = int(large_page_mb * 1024 * 1024) if large_page_mb and large_page_mb > 0 else 0
+        self.memory_stats = memory_stats  # Speicher-Peak pro Seite messen (tracemalloc)
+        self.spooled: dict = {}  # URL -> (temporäre Datei, Bytes, SHA-256) speicherarm verarbeiteter Seiten
+        self.spool_dir: Optional[Path] = None
+        self.export_chunks = export_chunks
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap = chunk_overlap
+        self.chunks: Optional[ChunkWriter] = None
+        self.search_index = search_index  # Volltextindex, kann mehreren Crawls gehören
+        self.search_site: Optional[str] = None
+        self.search_indexed = 0
+        
+        # Batch-Modus: Host-Limits, Pools und Cache gehören dem gemeinsamen Scheduler
+        self.scheduler = scheduler
+        if scheduler is not None:
+            self.host_limiter = scheduler.limiter
+            self.http_client = scheduler.http_client
+            self.browser_pool = scheduler.browser_pool
+            self.cache = scheduler.cache
     
     # ╭─────────────────────────────────────────────────────────────────────────────╮
     # │                         NAVIGATION ANALYSIS                                │
     # ╰─────────────────────────────────────────────────────────────────────────────╯
     
-    def extract_navigation_order(self, start_url: str) -> List[Tuple[str, str, str]]:
-        """Extrahiert die korrekte Kapitel-Reihenfolge aus der Navigation"""
-        print(f"🔍 Analysiere Navigation von {start_url}")
+    def extract_navigation_order(self, start_url: str,
+                                 selector: Optional[PageSelector] = None) -> List[Tuple[str, str, str]]:
+        """Extrahiert die korrekte Kapitel-Reihenfolge aus der Navigation, ggf. nur die Auswahl"""
+        self.log(f"🔍 Analysiere Navigation von {start_url}")
         
         try:
-            response = requests.get(start_url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # URL-Basis für Filterung
-            parsed = urlparse(start_url)
-            base_domain = parsed.netloc
-            base_path = '/'.join(parsed.path.split('/')[:-1]) + '/' if parsed.path else '/'
-            
+            content = self.fetch_navigation_page(start_url)
             chapter_order = []
+            seen = set()
+            for clean_url, chapter_number, clean_title in self.parse_navigation_links(content, start_url, start_url):
+                key = normalize_url(clean_url)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if selector is None or selector.accept(clean_url, chapter_number, clean_title):
+                    chapter_order.append((clean_url, chapter_number, clean_title))
+                if selector is not None and selector.satisfied:
+                    break
             
-            # Navigation finden - alle Links die zu HTML-Seiten führen
-            nav_links = soup.find_all('a', href=True)
+            return self.sort_chapter_order(chapter_order)
             
-            for link in nav_links:
-                href = link.get('href')
-                if not href or not isinstance(href, str):
-                    continue
-                    
-                # Nur .html Links berücksichtigen
-                if not href.endswith('.html'):
-                    continue
-                    
-                # Vollständige URL erstellen
-                if href.startswith('/'):
-                    full_url = f"https://{base_domain}{href}"
-                elif href.startswith('http'):
-                    full_url = href
-                else:
-                    full_url = urljoin(start_url, href)
-                
-                # Nur Links aus derselben Domain und Pfad
-                if not (base_domain in full_url and base_path in full_url):
-                    continue
-                    
-                # Fragment entfernen
-                clean_url = full_url.split('#')[0]
-                
-                # Text des Links extrahieren
-                link_text = link.get_text(strip=True)
+        except Exception as e:
+            self.log(f"❌ Fehler beim Extrahieren der Navigation: {e}")
+            return []
+    
+    async def discover_navigation(self, start_url: str, depth: int,
+                                  selector: Optional[PageSelector] = None) -> List[Tuple[str, str, str]]:
+        """Breitensuche über Abschnitts-Indexseiten bis zur Tiefe depth
+
+        Eine asynchrone Frontier-Queue verteilt die Seiten auf bis zu self.concurrency
+        Worker; normalisierte URLs in einem Set verhindern doppelte Besuche und Einträge.
+        Abschnittsseiten werden auch besucht, wenn sie selbst nicht ausgewählt sind;
+        ist das Limit des selectors erreicht, endet die Suche sofort.
+        """
+        self.log(f"🔍 Analysiere Navigation von {start_url} (Tiefe {depth})")
+        
+        chapters: dict = {}  # normalisierte URL -> (url, kapitelnummer, titel), in Fundreihenfolge
+        seen = set()
+        visited = {normalize_url(start_url)}
+        frontier: asyncio.Queue = asyncio.Queue()
+        frontier.put_nowait((start_url, 0))
+        satisfied = asyncio.Event()
+        
+        async def worker():
+            while True:
+                page_url, level = await frontier.get()
+                try:
+                    async with self.request_slot(page_url):
+                        content = await asyncio.to_thread(self.fetch_navigation_page, page_url)
+                    for clean_url, chapter_number, clean_title in self.parse_navigation_links(content, page_url, start_url):
+                        key = normalize_url(clean_url)
+                        if key not in seen:
+                            seen.add(key)
+                            if selector is None or selector.accept(clean_url, chapter_number, clean_title):
+                                chapters[key] = (clean_url, chapter_number, clean_title)
+                            if selector is not None and selector.satisfied:
+                                satisfied.set()
+                                return
+                        if level < depth and key not in visited:
+                            visited.add(key)
+                            frontier.put_nowait((clean_url, level + 1))
+                except Exception as e:
+                    self.log(f"⚠️  Navigation von {page_url} nicht lesbar: {e}")
+                finally:
+                    frontier.task_done()
+        
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        waiters = [asyncio.create_task(frontier.join()), asyncio.create_task(satisfied.wait())]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in waiters:
+                task.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, *waiters, return_exceptions=True)
+        
+        self.log(f"🧭 {len(visited)} Seiten analysiert, {len(chapters)} Kapitel gefunden")
+        return self.sort_chapter_order(list(chapters.values()))
+    
+    def discover_sitemap(self, start_url: str,
+                         selector: Optional[PageSelector] = None) -> List[Tuple[str, str, str]]:
+        """Ermittelt die Kapitel aus robots.txt und den Sitemaps der Website (blockierend)
+
+        Sitemap-Indizes werden verfolgt, gzip-Sitemaps entpackt und alle Sitemaps gestreamt.
+        Crawl-delay aus robots.txt gilt danach für den Host, gesperrte URLs entfallen.
+        lastmod landet in self.lastmod und erspart bei --incremental den Abruf.
+        Mit erreichtem Limit des selectors werden keine weiteren Sitemaps gelesen.
+        """
+        parsed = urlparse(start_url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        base_path = '/'.join(parsed.path.split('/')[:-1]) + '/' if parsed.path else '/'
+        self.log(f"🗺️  Lese Sitemaps von {root}")
+        
+        robots = self.read_robots(f"{root}/robots.txt")
+        if robots is not None:
+            crawl_delay = robots.crawl_delay('*')
+            if crawl_delay:
+                self.host_limiter.set_crawl_delay(parsed.netloc, float(crawl_delay))
+                self.log(f"⏱️  robots.txt: Crawl-delay {crawl_delay}s für {parsed.netloc}")
+        sitemaps = deque((robots.site_maps() if robots is not None else None) or [f"{root}/sitemap.xml"])
+        
+        chapter_order = []
+        seen = set()
+        visited = set()
+        disallowed = 0
+        while sitemaps and len(visited) < MAX_SITEMAPS and not (selector is not None and selector.satisfied):
+            sitemap_url = sitemaps.popleft()
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            try:
+                for kind, loc, lastmod in self.fetch_sitemap(sitemap_url):
+                    if kind == 'sitemap':
+                        sitemaps.append(urljoin(sitemap_url, loc))
+                        continue
+                    url = loc.split('#')[0]
+                    target = urlparse(url)
+                    if target.netloc != parsed.netloc or not target.path.startswith(base_path):
+                        continue
+                    if PurePosixPath(target.path).suffix.lower() not in SITEMAP_PAGE_SUFFIXES:
+                        continue
+                    if robots is not None and not robots.can_fetch('*', url):
+                        disallowed += 1
+                        continue
+                    key = normalize_url(url)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    chapter = (url, *sitemap_chapter(url))
+                    if selector is None or selector.accept(*chapter):
+                        chapter_order.append(chapter)
+                        if lastmod:
+                            self.lastmod[url] = lastmod
+                    if selector is not None and selector.satisfied:
+                        break
+            except Exception as e:
+                self.log(f"⚠️  Sitemap {sitemap_url} nicht lesbar: {e}")
+        
+        self.log(f"🗺️  {len(chapter_order)} Seiten aus {len(visited)} Sitemaps"
+                 + (f", {disallowed} durch robots.txt gesperrt" if disallowed else ""))
+        return self.sort_chapter_order(chapter_order)
+    
+    def read_robots(self, robots_url: str):
+        """Lädt robots.txt; liefert einen RobotFileParser oder None, wenn keine vorhanden ist"""
+        import requests
+        from urllib.robotparser import RobotFileParser
+        try:
+            response = requests.get(robots_url, timeout=10)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        robots = RobotFileParser(robots_url)
+        robots.parse(response.text.splitlines())
+        return robots
+    
+    def fetch_sitemap(self, url: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """Streamt die Einträge einer Sitemap, ohne das Dokument ganz zu laden"""
+        import requests
+        with requests.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            # Sonst schließt urllib3 den Strom am Ende, bevor der Puffer fertig gelesen hat
+            response.raw.auto_close = False
+            yield from iter_sitemap_entries(open_sitemap_stream(response.raw))
+    
+    def fetch_navigation_page(self, url: str) -> bytes:
+        """Lädt eine Navigationsseite per HTTP, über den Cache falls aktiviert (blockierend)"""
+        if self.cache is not None:
+            content, _ = self.cache.fetch(url, timeout=10)
+            return content
+        import requests
+        return requests.get(url, timeout=10).content
+    
+    def parse_navigation_links(self, content: bytes, page_url: str, start_url: str) -> List[Tuple[str, str, str]]:
+        """Liefert (URL, Kapitelnummer, Titel) aller Kapitel-Links einer Seite im Bereich der Start-URL"""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # URL-Basis für Filterung
+        parsed = urlparse(start_url)
+        base_domain = parsed.netloc
+        base_path = '/'.join(parsed.path.split('/')[:-1]) + '/' if parsed.path else '/'
+        
+        links = []
+        
+        # Navigation finden - alle Links die zu HTML-Seiten führen
+        for link in soup.find_all('a', href=True):
+            href = link.get('href')
+            if not href or not isinstance(href, str):
+                continue
                 
-                # Kapitelnummer extrahieren falls vorhanden
-                chapter_match = re.search(r'(\d+(?:\.\d+)*)', link_text)
-                chapter_number = chapter_match.group(1) if chapter_match else ""
+            # Nur .html Links berücksichtigen
+            if not href.endswith('.html'):
+                continue
                 
-                # Titel bereinigen (Kapitelnummer entfernen)
-                clean_title = re.sub(r'^\d+(?:\.\d+)*\s*', '', link_text).strip()
+            # Vollständige URL erstellen
+            if href.startswith('/'):
+                full_url = f"https://{base_domain}{href}"
+            elif href.startswith('http'):
+                full_url = href
+            else:
+                full_url = urljoin(page_url, href)
+            
+            # Nur Links aus derselben Domain und Pfad
+            if not (base_domain in full_url and base_path in full_url):
+                continue
                 
-                if clean_url not in [item[0] for item in chapter_order]:
-                    chapter_order.append((clean_url, chapter_number, clean_title))
+            # Fragment entfernen
+            clean_url = full_url.split('#')[0]
             
-            # Nach Kapitelnummer sortieren
-            def sort_key(item):
-                url, chapter_num, title = item
-                if chapter_num:
-                    # Kapitelnummer in sortierbare Form umwandeln
-                    parts = [int(x) for x in chapter_num.split('.')]
-                    while len(parts) < 5:
-                        parts.append(0)
-                    return parts
-                else:
-                    # Seiten ohne Kapitelnummer kommen zuerst
-                    return [-1, 0, 0, 0, 0]
+            # Text des Links extrahieren
+            link_text = link.get_text(strip=True)
             
-            chapter_order.sort(key=sort_key)
+            # Kapitelnummer extrahieren falls vorhanden
+            chapter_match = CHAPTER_NUMBER_PATTERN.search(link_text)
+            chapter_number = chapter_match.group(1) if chapter_match else ""
             
-            print(f"📄 Gefundene Kapitel-Reihenfolge:")
-            for i, (url, chapter_num, title) in enumerate(chapter_order):
-                # Anzeige: 0 für unnummerierte Seiten, echte Kapitelnummer für nummerierte
-                display_index = int(chapter_num) if chapter_num else 0
-                print(f"  {display_index:2d}. {chapter_num:>4s} - {title}")
+            # Titel bereinigen (Kapitelnummer entfernen)
+            clean_title = LEADING_CHAPTER_NUMBER_PATTERN.sub('', link_text).strip()
             
-            return chapter_order
+            links.append((clean_url, chapter_number, clean_title))
+        
+        return links
+    
+    def sort_chapter_order(self, chapter_order: List[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+        """Sortiert nach Kapitelnummer und gibt die gefundene Reihenfolge aus"""
+        def sort_key(item):
+            url, chapter_num, title = item
+            if chapter_num:
+                # Kapitelnummer in sortierbare Form umwandeln
+                parts = [int(x) for x in chapter_num.split('.')]
+                while len(parts) < 5:
+                    parts.append(0)
+                return parts
+            else:
+                # Seiten ohne Kapitelnummer kommen zuerst
+                return [-1, 0, 0, 0, 0]
+        
+        chapter_order.sort(key=sort_key)
+        
+        self.log("📄 Gefundene Kapitel-Reihenfolge:")
+        for i, (url, chapter_num, title) in enumerate(chapter_order):
+            # Anzeige: 0 für unnummerierte Seiten, Hauptkapitelnummer für nummerierte
+            display_index = int(chapter_num.split('.')[0]) if chapter_num else 0
+            self.log(f"  {display_index:2d}. {chapter_num:>4s} - {title}")
+        
+        return chapter_order
+    
+    
+    # ╭─────────────────────────────────────────────────────────────────────────────╮
+    # │                            FILE OPERATIONS                                 │
+    # ╰─────────────────────────────────────────────────────────────────────────────╯
+    
+    def request_slot(self, url: str):
+        """Request-Slot für eine URL: Host-Limit, im Batch-Modus zusätzlich das globale Limit"""
+        if self.scheduler is not None:
+            return self.scheduler.slot(url)
+        return self.host_limiter.slot(url)
+    
+    async def fetch_page(self, url: str):
+        """Lädt eine Seite und verbucht Latenz und Status für Retry-Policy und Host-Limiter"""
+        start = time.monotonic()
+        self.metrics.page(url)
+        try:
+            result = await self.fetch_with_engine(url)
+        except Exception:
+            self.last_failure[url] = (None, None)
+            self.host_limiter.record(url, False)
+            raise
+        
+        success = hasattr(result, 'success') and result.success
+        status_code = getattr(result, 'status_code', None)
+        retry_after = parse_retry_after(get_header(getattr(result, 'response_headers', None), 'Retry-After'))
+        if not success:
+            self.last_failure[url] = (status_code, retry_after)
+        else:
+            self.metrics.page(url)["bytes_in"] += len((getattr(result, 'html', '') or '').encode('utf-8'))
+        if not getattr(result, 'from_cache', False):
+            latency = time.monotonic() - start
+            self.metrics.fetch_latencies.append(latency)
+            self.host_limiter.record(url, success, status_code, latency, retry_after)
+        return result
+    
+    async def fetch_with_engine(self, url: str):
+        """Lädt eine Seite mit der gewählten Engine; 'auto' nutzt den Browser nur für JS-Seiten"""
+        if self.engine in ('http', 'auto'):
+            with self.metrics.stage(url, 'fetch_http'):
+                result = await self.fetch_http(url)
+            if self.engine == 'http' or not (result.success and looks_js_rendered(result.html)):
+                return result
+            self.log(f"🌐 JavaScript-Seite erkannt, lade im Browser: {url}")
+        with self.metrics.stage(url, 'fetch_browser'):
+            return await self.fetch_browser(url)
+    
+    async def fetch_http(self, url: str) -> FetchResult:
+        """Lädt eine Seite per HTTP, mit Cache und bedingter Revalidierung
+
+        Cache-Dateien werden in Threads gelesen und geschrieben, der Event-Loop wartet nicht auf die Platte.
+        """
+        if self.http_client is None:
+            self.http_client = HttpClient(self.concurrency, self.timeout)
+        
+        entry = self.cache.lookup(url) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            body = await asyncio.to_thread(self.cache.read, url)
+            if body is not None:
+                self.cache.hits += 1
+                return FetchResult(body.decode('utf-8', errors='replace'), from_cache=True)
+        
+        headers = ResponseCache.conditional_headers(entry) if entry is not None else None
+        result = await self.http_client.fetch(url, headers=headers)
+        
+        if self.cache is not None:
+            if result.status_code == 304:
+                body = await asyncio.to_thread(self.cache.read, url)
+                if body is not None:
+                    self.cache.refresh(url, result.response_headers)
+                    self.cache.revalidated += 1
+                    return FetchResult(body.decode('utf-8', errors='replace'), from_cache=True)
+                # Body fehlt trotz Index-Eintrag - unbedingt neu laden
+                result = await self.http_client.fetch(url)
+            if result.success:
+                self.cache.misses += 1
+                await asyncio.to_thread(self.cache.store, url, result.html.encode('utf-8'), result.response_headers)
+        return result
+    
+    async def fetch_browser(self, url: str):
+        """Lädt eine Seite aus dem Cache oder über den Browser-Pool (wird bei Bedarf angelegt)"""
+        if self.cache is not None:
+            body = await asyncio.to_thread(self.cache.revalidate, url, self.timeout, 'browser')
+            if body is not None:
+                return FetchResult(body.decode('utf-8', errors='replace'), from_cache=True)
+        
+        if self.browser_pool is None:
+            self.browser_pool = BrowserPool(self.concurrency, self.timeout, self.recycle_after, self.log)
+        result = await self.browser_pool.fetch(url)
+        
+        if self.cache is not None and hasattr(result, 'success') and result.success:
+            self.cache.misses += 1
+            await asyncio.to_thread(self.cache.store, url, result.html.encode('utf-8'),
+                                    getattr(result, 'response_headers', None), 'browser')
+        return result
+    
+    async def close(self) -> None:
+        """Schließt Schreibstufe, Browser-Pool, HTTP-Client und Process-Pool und speichert den Cache-Index"""
+        if self.writer is not None:
+            await self.writer.close()
+        if self.browser_pool is not None and self.scheduler is None:
+            await self.browser_pool.close()
+            self.browser_pool = None
+        if self.http_client is not None and self.scheduler is None:
+            await self.http_client.close()
+            self.http_client = None
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.assets is not None:
+            await self.assets.close()
+        if self.cache is not None:
+            self.cache.save()
+    
+    async def fetch_and_render(self, url: str, format_type: str):
+        """Lädt und verarbeitet eine Seite; liefert (Dokument, Abrufergebnis) oder None bei Fehlern"""
+        try:
+            # Beim Boilerplate-Lernen geladene Seiten nicht erneut abrufen
+            result = self.prefetched.pop(url, None) or await self.fetch_page(url)
             
+            if hasattr(result, 'success') and result.success:
+                return await self.render(result.html, url, format_type), result
+            else:
+                self.log(f"❌ Abruf-Fehler für {url}: {getattr(result, 'error_message', '') or 'unbekannt'}")
+                return None
+                
         except Exception as e:
-            print(f"❌ Fehler beim Extrahieren der Navigation: {e}")
-            return []
+            self.log(f"❌ Fehler beim Verarbeiten von {url}: {e}")
+            return None
     
+    def start_workers(self, format_type: str) -> None:
+        """Startet den Process-Pool für die Seitenverarbeitung (nur bei workers > 0)"""
+        if self.workers > 0 and self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_render_worker,
+                initargs=(format_type, self.include_nav, self.clean_output, self.get_link_index(format_type),
+                          self.parser)
+            )
     
-    # ╭─────────────────────────────────────────────────────────────────────────────╮
-    # │                            FILE OPERATIONS                                 │
-    # ╰─────────────────────────────────────────────────────────────────────────────╯
+    async def render(self, html: str, url: str, format_type: str) -> str:
+        """Bereinigt und konvertiert eine Seite - im Process-Pool, falls gestartet
+
+        Seiten ab large_page_bytes gehen an render_large (nicht bei Bundle-Formaten).
+        """
+        if self.large_page_bytes and len(html) >= self.large_page_bytes and self.bundle is None:
+            return await self.render_large(html, url, format_type)
+        boilerplate = self.boilerplate_model.blocks if self.boilerplate_model is not None else None
+        analyze = self.duplicates is not None
+        mirror = self.assets is not None
+        if self.executor is None:
+            timings: dict = {}
+            fingerprints = {} if analyze else None
+            assets = {} if mirror else None
+            with peak_memory(self.memory_stats) as memory:
+                content = render_page(html, url, format_type, self.include_nav, self.clean_output,
+                                      self.get_link_index(format_type), self.parser, timings,
+                                      boilerplate, fingerprints, assets)
+            peak = memory.get("peak")
+        else:
+            loop = asyncio.get_running_loop()
+            content, timings, fingerprints, assets, peak = await loop.run_in_executor(
+                self.executor, render_page_in_worker, html, url, boilerplate, analyze, mirror, self.memory_stats)
+        self.metrics.add_stages(url, timings)
+        if peak is not None:
+            self.metrics.page(url)["peak_memory"] = peak
+        if fingerprints is not None:
+            self.fingerprints[url] = fingerprints["simhash"]
+        if assets:
+            self.page_assets[url] = assets
+        return content
     
-    async def save_as_html(self, url: str, filename: str, output_dir: Path) -> bool:
-        """Speichert eine URL als HTML"""
-        # Skip if file exists and skip_existing is True
-        file_path = output_dir / filename
-        if self.skip_existing and file_path.exists():
-            print(f"⏭️  Überspringe existierende Datei: {filename}")
-            return True
-            
-        # Dry run mode
-        if self.dry_run:
-            print(f"🔍 [DRY RUN] Würde speichern: {filename}")
-            return True
-            
+    async def render_large(self, html: str, url: str, format_type: str) -> str:
+        """Verarbeitet eine sehr große Seite im Streaming-Modus direkt in eine temporäre Datei
+
+        Das Ergebnis steht danach in self.spooled; zurück kommt ein leeres Dokument.
+        Boilerplate-Entfernung und Duplikaterkennung entfallen für diese Seiten.
+        """
+        self.log(f"🐘 Große Seite ({len(html) / 1024 / 1024:.1f} MB), speicherarme Verarbeitung: {url}")
+        path, fd = create_temp_file(self.spool_dir, '.stream-')  # wird später zur Ausgabedatei umbenannt
+        os.close(fd)
+        mirror = self.assets is not None
         try:
-            async with AsyncWebCrawler(verbose=False, timeout=self.timeout) as crawler:
-                result = await crawler.arun(url=url)
-                
-                if hasattr(result, 'success') and result.success:
-                    soup = BeautifulSoup(result.html, 'html.parser')
-                    
-                    # Copy-Buttons entfernen
-                    for copy_btn in soup.select('.copy, .copy-button, .btn-copy, .fa-copy, button[title="Copy"]'):
-                        copy_btn.decompose()
-                    
-                    # Navigation entfernen wenn gewünscht
-                    if not self.include_nav:
-                        for nav in soup.select('nav, .navigation, .nav, .sidebar, .toc, aside'):
-                            nav.decompose()
-                    
-                    # Clean output - entferne Scripts, Styles, etc.
-                    if self.clean_output:
-                        for element in soup.select('script, style, meta, link[rel="stylesheet"]'):
-                            element.decompose()
-                    
-                    # Links korrigieren
-                    soup = self.fix_internal_links_html(soup)
-                    
-                    # HTML mit Kommentar speichern
-                    html_content = f"<!-- Original URL: {url} -->\n{str(soup)}"
-                    
-                    file_path = output_dir / filename
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(html_content)
-                    
-                    return True
-                else:
-                    print(f"❌ Crawl4ai Fehler für {url}")
-                    return False
-                    
-        except Exception as e:
-            print(f"❌ Fehler beim Speichern von {url}: {e}")
-            return False
+            if self.executor is None:
+                timings: dict = {}
+                assets = {} if mirror else None
+                with peak_memory(self.memory_stats) as memory:
+                    size, digest = render_page_streaming(html, url, format_type, self.include_nav,
+                                                         self.clean_output, self.get_link_index(format_type),
+                                                         path, timings, assets)
+                peak = memory.get("peak")
+            else:
+                loop = asyncio.get_running_loop()
+                size, digest, timings, assets, peak = await loop.run_in_executor(
+                    self.executor, stream_page_in_worker, html, url, path, mirror, self.memory_stats)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        self.metrics.add_stages(url, timings)
+        record = self.metrics.page(url)
+        record["streamed"] = True
+        if peak is not None:
+            record["peak_memory"] = peak
+        self.spooled[url] = (path, size, digest)
+        if assets:
+            self.page_assets[url] = assets
+        return ""
+    
+    async def learn_boilerplate(self, chapter_order: List[Tuple[str, str, str]], format_type: str) -> None:
+        """Lernt die Boilerplate aus den ersten Kapiteln, bevor die erste Seite konvertiert wird
+
+        So werden alle Seiten gleich bereinigt und ihre Simhashes sind vergleichbar. Die
+        geladenen Seiten werden für den eigentlichen Abruf zurückgelegt.
+        """
+        model = BoilerplateModel()
+        for url, _, _ in chapter_order[:model.learn_pages]:
+            try:
+                async with self.request_slot(url):
+                    result = await self.fetch_page(url)
+            except Exception as e:
+                self.log(f"⚠️  Boilerplate-Lernen: {url} nicht geladen ({e})")
+                continue
+            if not (hasattr(result, 'success') and result.success):
+                continue
+            self.prefetched[url] = result
+            with self.metrics.stage(url, 'fingerprint'):
+                model.observe(page_blocks(result.html, format_type, self.include_nav, self.clean_output,
+                                          self.parser))
+        model.finish()
+        self.boilerplate_model = model
+        self.log(f"🧹 Boilerplate gelernt: {len(model.blocks)} Blöcke aus {model.pages} Seiten")
+    
+    def get_link_index(self, format_type: str) -> LinkIndex:
+        """Liefert den Link-Index und baut ihn nur neu, wenn sich Reihenfolge oder Format geändert haben"""
+        index = self.link_index
+        if index is None or index.format_type != format_type or index.chapter_order is not self.chapter_order:
+            index = LinkIndex(self.chapter_order, format_type, self.generate_filename)
+            self.link_index = index
+            self.filename_mapping = index.by_filename
+        return index
     
     def fix_internal_links_html(self, soup: BeautifulSoup) -> BeautifulSoup:
         """Konvertiert interne Links in HTML-Dokumenten zu den neuen Dateinamen"""
-        # Erstelle Mapping von original HTML-Dateinamen zu neuen Dateinamen
-        for url, chapter_num, title in self.chapter_order:
-            # Extrahiere HTML-Dateiname aus URL
-            original_filename = url.split('/')[-1]
-            # Generiere neuen Dateinamen
-            new_filename = self.generate_filename(chapter_num, title, 'html', len(self.chapter_order))
-            self.filename_mapping[original_filename] = new_filename
-        
-        # Ersetze alle Links
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-            if href and isinstance(href, str):
-                # Extrahiere Dateiname und Anker
-                if '#' in href:
-                    filename, anchor = href.split('#', 1)
-                    anchor = '#' + anchor
-                else:
-                    filename = href
-                    anchor = ''
-                
-                # Wenn es ein lokaler Link ist
-                if filename.endswith('.html') and not filename.startswith('http'):
-                    # Finde entsprechenden neuen Dateinamen
-                    if filename in self.filename_mapping:
-                        link['href'] = self.filename_mapping[filename] + anchor
-        
-        return soup
+        return rewrite_links_html(soup, self.get_link_index('html'))
     
     def fix_internal_links(self, content: str, format_type: str) -> str:
         """Konvertiert interne Links von .html zu .md Dateinamen"""
         if format_type != 'md':
             return content
+        return rewrite_links_markdown(content, self.get_link_index('md'))
+    
+    async def save_page(self, page: 'PageRecord', output_dir: Path) -> bool:
+        """Schreibt eine fertig verarbeitete Seite als Datei oder ins Bundle"""
+        try:
+            # Create index.md for the root link (nicht im Bundle - dort nur Kapitel)
+            if (page.format == 'md' and self.bundle is None
+                    and page.filename == self.generate_filename("", "Über dieses Skript", 'md', len(self.chapter_order))):
+                index_content = f"<!-- Original URL: {page.url} -->\n\n# Index\n\nThis is the main index page. Start reading from [Über dieses Skript]({page.filename}).\n"
+                await self.write_output(output_dir / "index.md", index_content.encode('utf-8'))
             
-        # Erstelle Mapping von HTML-Dateinamen zu MD-Dateinamen
-        for url, chapter_num, title in self.chapter_order:
-            # Extrahiere HTML-Dateiname aus URL
-            html_filename = url.split('/')[-1]
-            # Generiere entsprechenden MD-Dateinamen
-            md_filename = self.generate_filename(chapter_num, title, 'md', len(self.chapter_order))
-            self.filename_mapping[html_filename] = md_filename
-        
-        # Ersetze alle Links
-        import re
-        
-        def replace_link(match):
-            full_match = match.group(0)
-            text = match.group(1)
-            link = match.group(2)
-            
-            # Extrahiere Dateiname und Anker
-            if '#' in link:
-                filename, anchor = link.split('#', 1)
-                anchor = '#' + anchor
+            if page.duplicate_of is not None:
+                canonical_filename = page.duplicate_of[1]
+                stub = duplicate_stub(page.url, page.title, page.format, canonical_filename)
+                page.written = await self.write_page(output_dir / page.filename, stub, page.url, page,
+                                                     extra_meta={"duplicate_of": canonical_filename})
             else:
-                filename = link
-                anchor = ''
-            
-            # Wenn es ein interner Link ist (endet mit .html oder .md)
-            if filename.endswith('.html'):
-                # Finde entsprechenden MD-Dateinamen
-                if filename in self.filename_mapping:
-                    new_filename = self.filename_mapping[filename]
-                    return f'[{text}]({new_filename}{anchor})'
-            elif filename.endswith('.md'):
-                # Finde den ursprünglichen HTML-Dateinamen für diesen MD-Link
-                # Suche in chapter_order nach einem passenden Titel
-                for url, chapter_num, chapter_title in self.chapter_order:
-                    # Generiere den erwarteten alten MD-Dateinamen basierend auf dem Titel
-                    # Dies ist eine Heuristik - wir versuchen den Titel aus dem Dateinamen zu extrahieren
-                    if filename.replace('.md', '').replace('_', ' ').lower() in chapter_title.lower():
-                        # Generiere neuen Dateinamen
-                        new_filename = self.generate_filename(chapter_num, chapter_title, 'md', len(self.chapter_order))
-                        return f'[{text}]({new_filename}{anchor})'
-                
-                # Wenn keine Übereinstimmung gefunden wurde, versuche über den Index
-                # Extrahiere Nummer aus dem Dateinamen wenn vorhanden
-                number_match = re.match(r'^(\d+)', filename)
-                if number_match:
-                    target_num = number_match.group(1).lstrip('0') or '0'
-                    for url, chapter_num, chapter_title in self.chapter_order:
-                        if chapter_num == target_num:
-                            new_filename = self.generate_filename(chapter_num, chapter_title, 'md', len(self.chapter_order))
-                            return f'[{text}]({new_filename}{anchor})'
-            
-            return full_match
-        
-        # Ersetze Links in Markdown-Format: [Text](link)
-        content = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', replace_link, content)
+                if self.chunks is not None:
+                    await self.add_chunks(page.url, page.content_file or page.content)
+                if self.search_index is not None:
+                    await self.index_page(page, page.content_file or page.content, page.content_hash)
+                page.written = await self.write_page(output_dir / page.filename, page.content, page.url, page)
+            return True
+        except Exception as e:
+            self.log(f"❌ Fehler beim Speichern von {page.url}: {e}")
+            if page.content_file is not None:
+                page.content_file.unlink(missing_ok=True)
+            return False
+    
+    async def add_chunks(self, url: str, source: Union[str, Path]) -> None:
+        """Exportiert ein Markdown-Kapitel (Text oder Datei) als Chunks"""
+        with self.metrics.stage(url, 'chunk'):
+            await self.chunks.add(url, source)
+    
+    async def index_page(self, page: 'PageRecord', source: Union[str, Path],
+                         content_hash: Optional[str] = None) -> None:
+        """Aktualisiert den Volltextindex für eine Seite (Text oder Datei)"""
+        if self.search_site is None:
+            return
+        entry = {"url": page.url, "filename": page.filename, "chapter_number": page.chapter_number,
+                 "title": page.title, "index": page.index}
+        with self.metrics.stage(page.url, 'index'):
+            if await self.search_index.add(self.search_site, entry, source, page.format, content_hash):
+                self.search_indexed += 1
+    
+    async def write_output(self, file_path: Path, data: Union[bytes, Path]) -> Optional[asyncio.Future]:
+        """Übergibt eine Datei an die Schreibstufe oder schreibt sie direkt atomar
+
+        data kann auch eine gespoolte temporäre Datei sein, die nur umbenannt wird.
+        Mit Schreibstufe kommt deren Future zurück (siehe FileWriter.submit), sonst None.
+        """
+        if self.writer is not None:
+            return await self.writer.submit(file_path, data)
+        if isinstance(data, Path):
+            await asyncio.to_thread(os.replace, data, file_path)
+        else:
+            await asyncio.to_thread(write_file_atomic, file_path, data)
+        return None
+    
+    async def write_page(self, file_path: Path, content: str, url: str, result=None,
+                         extra_meta: Optional[dict] = None) -> Optional[asyncio.Future]:
+        """Schreibt eine Seite und merkt sich Hash, Abrufzeit und Validatoren
+
+        Im inkrementellen Modus wird eine unveränderte Seite nicht erneut geschrieben.
+        Gibt das Future der Schreibstufe zurück, solange die Datei noch aussteht, sonst None.
+        Die Stufe 'write' misst das tatsächliche Schreiben bis zum Umbenennen, mit
+        Schreibstufe also erst, wenn diese die Datei abgearbeitet hat.
+        """
+        headers = getattr(result, 'response_headers', None)
+        # Speicherarmer Modus: Dokument liegt schon fertig in einer temporären Datei
+        content_file = getattr(result, 'content_file', None)
+        if content_file is not None:
+            data = content_file
+            size, content_hash = result.content_size, result.content_hash
+        else:
+            data = content.encode('utf-8')
+            size, content_hash = len(data), hashlib.sha256(data).hexdigest()
+        self.metrics.page(url)["bytes_out"] = size
+        self.page_meta[url] = {
+            "content_hash": content_hash,
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "etag": get_header(headers, 'ETag'),
+            "last_modified": get_header(headers, 'Last-Modified'),
+        }
+        if url in self.lastmod:
+            self.page_meta[url]["lastmod"] = self.lastmod[url]
+        if extra_meta:
+            self.page_meta[url].update(extra_meta)
         
-        # Ersetze auch direkte Links in Klammern: (link)
-        content = re.sub(r'\(([^)]+\.html(?:#[^)]+)?)\)', 
-                        lambda m: '(' + self.filename_mapping.get(m.group(1).split('#')[0], m.group(1)) + 
-                        (('#' + m.group(1).split('#')[1]) if '#' in m.group(1) else '') + ')', 
-                        content)
+        # Bundle-Ausgabe: Datensatz hinterlegen, das Bundle schreibt in Kapitel-Reihenfolge
+        if self.bundle is not None:
+            position = self.bundle.positions.get(url)
+            chapter_num, title = self.chapter_order[position][1:] if position is not None else ("", "")
+            self.bundle.put(url, {
+                "index": position,
+                "url": url,
+                "chapter_number": chapter_num,
+                "title": title,
+                "filename": file_path.name,
+                **self.page_meta[url],
+                "content": content,
+            })
+            return None
         
-        # Spezialfall: Links die mit ./ beginnen (relative Links zum Root)
-        content = re.sub(r'\[([^\]]+)\]\(\.\/\)', r'[\1](index.md)', content)
+        previous = self.manifest.get(url)
+        if (self.incremental and previous and previous.get("content_hash") == content_hash
+                and file_path.exists()):
+            self.log(f"⏭️  Inhalt unverändert: {file_path.name}")
+            if content_file is not None:
+                content_file.unlink(missing_ok=True)
+            return None
         
-        return content
+        start = time.perf_counter()
+        written = await self.write_output(file_path, data)
+        if written is None:
+            self.metrics.add_stage(url, 'write', time.perf_counter() - start)
+        else:
+            written.add_done_callback(partial(self.record_write_time, url))
+        return written
     
-    async def save_as_markdown(self, url: str, filename: str, output_dir: Path) -> bool:
-        """Speichert eine URL als Markdown"""
-        # Skip if file exists and skip_existing is True
-        file_path = output_dir / filename
-        if self.skip_existing and file_path.exists():
-            print(f"⏭️  Überspringe existierende Datei: {filename}")
-            return True
-            
-        # Dry run mode
-        if self.dry_run:
-            print(f"🔍 [DRY RUN] Würde speichern: {filename}")
+    def record_write_time(self, url: str, written: asyncio.Future) -> None:
+        """Übernimmt die von der Schreibstufe gemessene Schreibzeit einer Seite"""
+        if not written.cancelled():
+            self.metrics.add_stage(url, 'write', written.result()[1])
+    
+    def load_manifest(self, output_dir: Path, format_type: str) -> dict:
+        """Liest ein vorhandenes index.json und liefert die Einträge nach URL"""
+        index_path = output_dir / "index.json"
+        if not index_path.exists():
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index_data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️  index.json nicht lesbar, crawle vollständig: {e}")
+            return {}
+        if index_data.get("format") != format_type:
+            return {}
+        return {entry["url"]: entry for entry in index_data.get("files", [])}
+    
+    def expired(self, previous: dict) -> bool:
+        """Prüft, ob ein Manifest-Eintrag älter als --max-age ist (ohne Zeitstempel gilt er als abgelaufen)"""
+        if self.max_age is None:
+            return False
+        try:
+            fetched_at = datetime.fromisoformat(previous.get("fetched_at") or "")
+        except ValueError:
             return True
-            
+        return (datetime.now(timezone.utc) - fetched_at).total_seconds() > self.max_age
+    
+    def unchanged_since_lastmod(self, url: str, filename: str, output_dir: Path) -> bool:
+        """Prüft ohne Anfrage, ob die Sitemap seit dem letzten Abruf keine Änderung meldet"""
+        lastmod = parse_lastmod(self.lastmod.get(url))
+        previous = self.manifest.get(url)
+        if lastmod is None or not previous or previous.get("filename") != filename:
+            return False
         try:
-            async with AsyncWebCrawler(verbose=False, timeout=self.timeout) as crawler:
-                result = await crawler.arun(url=url)
-                
-                if hasattr(result, 'success') and result.success:
-                    h = html2text.HTML2Text()
-                    h.ignore_links = False
-                    h.ignore_images = False
-                    h.body_width = 0
-                    h.unicode_snob = True
-                    
-                    soup = BeautifulSoup(result.html, 'html.parser')
-                    
-                    # Copy-Buttons entfernen
-                    for copy_btn in soup.select('.copy, .copy-button, .btn-copy, .fa-copy, button[title="Copy"]'):
-                        copy_btn.decompose()
-                    
-                    # Navigation entfernen wenn gewünscht
-                    if not self.include_nav:
-                        for nav in soup.select('nav, .navigation, .nav, .sidebar, .toc, aside'):
-                            nav.decompose()
-                    
-                    # Clean output - entferne Scripts, Styles, etc.
-                    if self.clean_output:
-                        for element in soup.select('script, style, meta, link'):
-                            element.decompose()
-                    
-                    markdown_content = h.handle(str(soup))
-                    
-                    # Links korrigieren - NACH der Konvertierung zu Markdown
-                    markdown_content = self.fix_internal_links(markdown_content, 'md')
-                    
-                    content_with_meta = f"<!-- Original URL: {url} -->\n\n{markdown_content}"
-                    
-                    # Create index.md for the root link
-                    if filename == self.generate_filename("", "Über dieses Skript", 'md', len(self.chapter_order)):
-                        index_content = f"<!-- Original URL: {url} -->\n\n# Index\n\nThis is the main index page. Start reading from [Über dieses Skript]({filename}).\n"
-                        index_path = output_dir / "index.md"
-                        with open(index_path, 'w', encoding='utf-8') as f:
-                            f.write(index_content)
-                    
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content_with_meta)
-                    
-                    return True
-                else:
-                    print(f"❌ Crawl4ai Fehler für {url}")
+            fetched_at = datetime.fromisoformat(previous.get("fetched_at") or "")
+        except ValueError:
+            return False
+        # --max-age gilt auch hier: zu alte Einträge werden trotz Sitemap neu geladen
+        if fetched_at < lastmod or self.expired(previous) or not (output_dir / filename).exists():
+            return False
+        self.page_meta[url] = {key: previous.get(key)
+                               for key in ("content_hash", "fetched_at", "etag", "last_modified")}
+        self.page_meta[url]["lastmod"] = self.lastmod[url]
+        return True
+    
+    def is_unchanged(self, url: str, filename: str, output_dir: Path) -> bool:
+        """Prüft per bedingter Anfrage, ob eine bereits gespeicherte Seite unverändert ist (blockierend)"""
+        previous = self.manifest.get(url)
+        if not previous or previous.get("filename") != filename or not (output_dir / filename).exists():
+            return False
+        
+        # Zu alte Einträge werden unabhängig von den Validatoren neu geladen
+        if self.expired(previous):
+            return False
+        
+        headers = ResponseCache.conditional_headers(previous)
+        if not headers:
+            return False
+        import requests
+        try:
+            with requests.get(url, timeout=self.timeout, headers=headers, stream=True) as response:
+                if response.status_code != 304:
                     return False
-                    
-        except Exception as e:
-            print(f"❌ Fehler beim Speichern von {url}: {e}")
+                self.page_meta[url] = {
+                    "content_hash": previous.get("content_hash"),
+                    "fetched_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    "etag": get_header(response.headers, 'ETag') or previous.get("etag"),
+                    "last_modified": get_header(response.headers, 'Last-Modified') or previous.get("last_modified"),
+                }
+                return True
+        except requests.RequestException:
             return False
     
     def generate_filename(self, chapter_num: str, title: str, format_type: str, total_chapters: int) -> str:
@@ -382,8 +3914,8 @@ class SmartCrawler:
     # │                           UTILITY FUNCTIONS                                │
     # ╰─────────────────────────────────────────────────────────────────────────────╯
     
-    def create_index_file(self, chapter_order: List[Tuple[str, str, str]], format_type: str, output_dir: Path) -> None:
-        """Erstellt eine Index-Datei mit der Zuordnung von Dateinamen zu URLs"""
+    def build_index_data(self, chapter_order: List[Tuple[str, str, str]], format_type: str) -> dict:
+        """Baut die Index-Daten mit der Zuordnung von Dateinamen zu URLs"""
         index_data = {
             "format": format_type,
             "total_chapters": len(chapter_order),
@@ -393,20 +3925,33 @@ class SmartCrawler:
         # Für jedes Kapitel die Zuordnung erstellen
         for i, (url, chapter_num, title) in enumerate(chapter_order):
             filename = self.generate_filename(chapter_num, title, format_type, len(chapter_order))
-            index_data["files"].append({
+            entry = {
                 "filename": filename,
                 "url": url,
                 "chapter_number": chapter_num,
                 "title": title,
                 "index": i
-            })
+            }
+            
+            # Hash, Abrufzeit und Validatoren aus diesem oder dem vorherigen Lauf
+            meta = self.page_meta.get(url)
+            if meta is None and url in self.manifest and self.manifest[url].get("filename") == filename:
+                meta = {key: self.manifest[url].get(key)
+                        for key in ("content_hash", "fetched_at", "etag", "last_modified")}
+            if meta:
+                entry.update(meta)
+            index_data["files"].append(entry)
+        return index_data
+    
+    def create_index_file(self, chapter_order: List[Tuple[str, str, str]], format_type: str, output_dir: Path) -> None:
+        """Erstellt eine Index-Datei mit der Zuordnung von Dateinamen zu URLs"""
+        index_data = self.build_index_data(chapter_order, format_type)
         
-        # Index-Datei speichern
+        # Index-Datei atomar speichern - sie dient dem nächsten Lauf als Manifest
         index_path = output_dir / "index.json"
-        with open(index_path, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
+        write_file_atomic(index_path, json.dumps(index_data, ensure_ascii=False, indent=2).encode('utf-8'))
         
-        print(f"📋 Index-Datei erstellt: {index_path}")
+        self.log(f"📋 Index-Datei erstellt: {index_path}")
         
         # Zusätzlich eine lesbare Markdown-Übersicht erstellen
         readme_path = output_dir / "README.md"
@@ -422,102 +3967,591 @@ class SmartCrawler:
                 chapter = item["chapter_number"] or "0"
                 f.write(f"| {item['filename']} | {chapter} | {item['title']} | {item['url']} |\n")
         
-        print(f"📄 README erstellt: {readme_path}")
+        self.log(f"📄 README erstellt: {readme_path}")
     
     
     # ╭─────────────────────────────────────────────────────────────────────────────╮
     # │                           MAIN CRAWLING METHOD                             │
     # ╰─────────────────────────────────────────────────────────────────────────────╯
     
+    async def crawl_page(self, i: int, url: str, chapter_num: str, title: str,
+                         format_type: str, output_path: Optional[Path] = None) -> PageRecord:
+        """Lädt und verarbeitet eine einzelne Seite mit Retry-Logik (ohne zu schreiben)"""
+        filename = self.generate_filename(chapter_num, title, format_type, len(self.chapter_order))
+        self.log(f"[{i:2d}/{len(self.chapter_order)}] Crawle: {title}")
+        self.log(f"                     URL: {url}")
+        started = time.perf_counter()
+        page = PageRecord(i - 1, url, chapter_num, title, filename, format_type)
+        
+        def finish(status: str, retries: int = 0) -> PageRecord:
+            page.status = status
+            page.retries = retries
+            self.metrics.finish(url, filename, status, retries, time.perf_counter() - started)
+            page.timings = dict(self.metrics.page(url)["stages"])
+            if self.duplicate_turns is not None:
+                self.duplicate_turns.done(page.index)
+            return page
+        
+        if output_path is not None:
+            # Fortsetzen: bereits erledigte Seiten überspringen
+            if (url in self.completed and self.completed[url].get("filename") == filename
+                    and (output_path / filename).exists()):
+                self.log(f"⏭️  Bereits erledigt: {filename}")
+                return finish("resumed")
+            
+            # Skip if file exists and skip_existing is True
+            if self.skip_existing and (output_path / filename).exists():
+                self.log(f"⏭️  Überspringe existierende Datei: {filename}")
+                return finish("skipped")
+            
+            # Inkrementell: unveränderte Seiten ohne erneuten Abruf übernehmen
+            if self.incremental and not self.dry_run:
+                if self.unchanged_since_lastmod(url, filename, output_path):
+                    self.log(f"⏭️  Unverändert laut Sitemap: {filename}")
+                    return finish("unchanged")
+                async with self.request_slot(url):
+                    unchanged = await asyncio.to_thread(self.is_unchanged, url, filename, output_path)
+                if unchanged:
+                    self.log(f"⏭️  Unverändert (304): {filename}")
+                    return finish("unchanged")
+        
+        # Dry run mode
+        if self.dry_run:
+            self.log(f"🔍 [DRY RUN] Würde speichern: {filename}")
+            return finish("dry_run")
+        
+        # Retry logic
+        outcome = None
+        retries = 0
+        status_code = None
+        max_retries = self.retry_policy.max_retries
+        for retry in range(max_retries):
+            retries = retry
+            if retry > 0:
+                self.log(f"   🔄 Wiederholung {retry}/{max_retries - 1} ({filename})")
+            
+            async with self.request_slot(url):
+                outcome = await self.fetch_and_render(url, format_type)
+            
+            if outcome is not None:
+                break
+            
+            status_code, retry_after = self.last_failure.pop(url, (None, None))
+            if self.retry_policy.is_permanent(status_code):
+                self.log(f"   ⛔ Dauerhafter Fehler (HTTP {status_code}), keine Wiederholung")
+                break
+                
+            # Wait before retry
+            if self.retry_policy.should_retry(retry, status_code):
+                wait = self.retry_policy.backoff(retry, status_code, retry_after)
+                self.log(f"   ⏳ Warte {wait:.1f}s vor erneutem Versuch ({filename})")
+                await asyncio.sleep(wait)
+        
+        if outcome is None:
+            self.log(f"❌ Fehler bei: {filename}")
+            page.error_message = f"HTTP {status_code}" if status_code else "Abruf oder Verarbeitung fehlgeschlagen"
+            return finish("failed", retries)
+        
+        page.content, result = outcome
+        page.response_headers = getattr(result, 'response_headers', None)
+        spooled = self.spooled.pop(url, None)
+        if spooled is not None:
+            page.content_file, page.content_size, page.content_hash = spooled
+        
+        # Assets erst nach Freigabe des Host-Slots laden - sie teilen sich oft den Host der Seite
+        assets = self.page_assets.pop(url, None)
+        if assets:
+            with self.metrics.stage(url, 'assets'):
+                if page.content_file is not None:
+                    page.content_size, page.content_hash = await self.assets.localize_file(
+                        page.content_file, assets, format_type)
+                else:
+                    page.content = await self.assets.localize(page.content, assets, format_type)
+        
+        # Exakte und beinahe gleiche Kapitel auf die Fassung mit der kleinsten Kapitel-Position
+        # abbilden: in Kapitel-Reihenfolge vergleichen, damit das Ergebnis nicht von -j abhängt
+        fingerprint = self.fingerprints.pop(url, None)
+        if self.duplicates is not None and fingerprint is not None:
+            await self.duplicate_turns.wait(page.index)
+            page.duplicate_of = self.duplicates.find_or_add(fingerprint, (url, filename))
+            if page.duplicate_of is not None:
+                self.log(f"🪞 Duplikat von {page.duplicate_of[1]}: {filename}")
+        return finish("success", retries)
+    
+    def record_result(self, url: str, filename: str, success: bool) -> None:
+        """Schreibt das Ergebnis einer Seite ins Journal (nicht im Dry-Run)"""
+        if self.journal is not None and not self.dry_run:
+            self.journal.record(url, filename, success, self.page_meta.get(url))
+    
+    def record_written(self, url: str, filename: str, written: asyncio.Future) -> None:
+        """Journal-Eintrag, sobald die Schreibstufe eine Seite umbenannt hat oder gescheitert ist"""
+        self.record_result(url, filename, not written.cancelled() and written.result()[0])
+    
+    async def find_chapters(self, start_url: str, filter_pattern: Optional[str] = None,
+                            max_pages: Optional[int] = None, depth: int = 0,
+                            discovery: str = 'nav', include: Optional[List[str]] = None,
+                            exclude: Optional[List[str]] = None) -> List[Tuple[str, str, str]]:
+        """Ermittelt die Kapitel-Reihenfolge aus Navigation oder Sitemap, gefiltert und begrenzt
+
+        discovery: 'nav' (Navigation), 'sitemap' (robots.txt und sitemap.xml) oder 'auto'
+        (Sitemap, wenn die Navigation keine Kapitel liefert).
+        filter_pattern, include und exclude werden einmal zu einem PageSelector kompiliert und
+        schon während der Suche angewendet; max_pages beendet die Suche, sobald genug Kapitel
+        gefunden sind (die ersten in Fundreihenfolge).
+        """
+        # Einzelne Regeln (z.B. aus einem Batch-Manifest) als Liste behandeln
+        include = [include] if isinstance(include, str) else list(include or [])
+        exclude = [exclude] if isinstance(exclude, str) else list(exclude or [])
+        selector = PageSelector(include, exclude, max_pages, filter_pattern)
+        
+        self.lastmod = {}
+        with self.metrics.stage(None, 'navigation'):
+            if discovery == 'sitemap':
+                chapter_order = await asyncio.to_thread(self.discover_sitemap, start_url, selector)
+            elif depth > 0:
+                # Kapitel-Reihenfolge auch über Unterseiten extrahieren
+                chapter_order = await self.discover_navigation(start_url, depth, selector)
+            else:
+                async with self.request_slot(start_url):
+                    chapter_order = await asyncio.to_thread(self.extract_navigation_order, start_url, selector)
+            if not chapter_order and discovery == 'auto':
+                self.log("🔁 Navigation ohne Kapitel - versuche Sitemaps")
+                chapter_order = await asyncio.to_thread(self.discover_sitemap, start_url, selector)
+        
+        if selector.filter is not None or selector.include or selector.exclude:
+            self.log(f"🔍 Auswahl ({selector.describe()}): {selector.accepted}/{selector.checked} Seiten")
+        if selector.satisfied:
+            self.log(f"📄 Limitiert auf {max_pages} Seiten - Suche vorzeitig beendet")
+        
+        return chapter_order
+    
+    async def iter_pages(self, start_url: str, format_type: str = 'md',
+                         include_nav: bool = True, clean_output: bool = False,
+                         filter_pattern: Optional[str] = None, max_pages: Optional[int] = None,
+                         depth: int = 0, buffer: Optional[int] = None,
+                         chapter_order: Optional[List[Tuple[str, str, str]]] = None,
+                         output_dir: Optional[Path] = None, discovery: str = 'nav',
+                         include: Optional[List[str]] = None, exclude: Optional[List[str]] = None):
+        """Liefert die Seiten als asynchronen Stream von PageRecords, sobald sie fertig sind
+
+        Höchstens self.concurrency Seiten sind in Arbeit und höchstens buffer fertige Seiten
+        warten auf den Verbraucher; ist der Puffer voll, pausieren die Abrufe (Backpressure).
+        Die Reihenfolge entspricht der Fertigstellung, PageRecord.index ist die Kapitel-Position.
+        Ohne chapter_order wird die Navigation ermittelt und die Messung neu gestartet.
+        Bei vorzeitigem Abbruch den Stream mit contextlib.aclosing schließen.
+        """
+        self.include_nav = include_nav
+        self.clean_output = clean_output
+        self.spool_dir = Path(output_dir) if output_dir is not None else None
+        # Gemeinsamer Host-Limiter (Batch-Modus): Warte- und Pausenmeldungen dieser Site hier ausgeben
+        if self.scheduler is not None:
+            self.host_limiter.set_log(urlparse(start_url).netloc, self.log)
+        if chapter_order is None:
+            self.metrics = CrawlMetrics()
+            chapter_order = await self.find_chapters(start_url, filter_pattern, max_pages, depth, discovery,
+                                                     include, exclude)
+        
+        # Chapter order speichern und Link-Index einmalig aufbauen
+        self.chapter_order = chapter_order
+        if not chapter_order:
+            return
+        self.get_link_index(format_type)
+        if not self.dry_run:
+            self.start_workers(format_type)
+        if self.mirror_assets and output_dir is not None and not self.dry_run and self.bundle is None:
+            self.assets = AssetMirror(Path(output_dir), self.write_output, self.scheduler or self.host_limiter,
+                                      self.asset_concurrency, self.timeout, self.log)
+        if self.dedup and not self.dry_run:
+            await self.learn_boilerplate(chapter_order, format_type)
+            self.duplicates = DuplicateIndex(self.dedup_distance)
+            self.duplicate_turns = ChapterTurns()
+            self.fingerprints = {}
+        
+        # Bis zu self.concurrency Worker holen sich die nächsten Kapitel; jeder meldet sein Ende
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer or self.concurrency))
+        chapters = iter(enumerate(chapter_order, 1))
+        
+        async def worker():
+            try:
+                for i, (url, chapter_num, title) in chapters:
+                    await queue.put(await self.crawl_page(i, url, chapter_num, title, format_type, output_dir))
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(chapter_order)))]
+        try:
+            finished = 0
+            while finished < len(workers):
+                item = await queue.get()
+                if item is None:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.prefetched.clear()
+            self.page_assets.clear()
+            for path, _, _ in self.spooled.values():
+                path.unlink(missing_ok=True)
+            self.spooled.clear()
+            await self.close()
+    
     async def crawl_website(self, start_url: str, output_dir: str, format_type: str, 
                            skip_existing: bool = False, dry_run: bool = False,
                            include_nav: bool = True, clean_output: bool = False,
-                           filter_pattern: Optional[str] = None, max_pages: Optional[int] = None):
-        """Hauptfunktion zum intelligenten Crawlen"""
+                           filter_pattern: Optional[str] = None, max_pages: Optional[int] = None,
+                           incremental: bool = False, max_age: Optional[float] = None,
+                           resume: bool = False, depth: int = 0,
+                           metrics_out: Optional[str] = None, metrics_prom: Optional[str] = None,
+                           discovery: str = 'nav', include: Optional[List[str]] = None,
+                           exclude: Optional[List[str]] = None):
+        """Hauptfunktion zum intelligenten Crawlen: schreibt den Seiten-Stream von iter_pages"""
+        # Bundle-Formate: Seiten im Inhaltsformat rendern und in eine einzige Datei schreiben
+        bundle_format = format_type if format_type in BUNDLE_FORMATS else None
+        if bundle_format:
+            format_type = self.bundle_content
+            if skip_existing or incremental or resume:
+                self.log("⚠️  --skip-existing, --incremental und --resume gelten nicht für Bundle-Formate")
+                skip_existing = incremental = resume = False
+            if self.mirror_assets:
+                self.log("⚠️  --mirror-assets gilt nicht für Bundle-Formate")
+        
         self.skip_existing = skip_existing
         self.dry_run = dry_run
-        self.include_nav = include_nav
-        self.clean_output = clean_output
+        self.incremental = incremental
+        self.max_age = max_age
         
         output_path = Path(output_dir)
+        target_path = bundle_path(output_dir, bundle_format) if bundle_format else None
+        if target_path is not None:
+            output_path = target_path.parent
         if not self.dry_run:
             output_path.mkdir(parents=True, exist_ok=True)
+            # Vorhandenes Manifest lesen, bevor index.json neu geschrieben wird
+            if not bundle_format:
+                self.manifest = self.load_manifest(output_path, format_type)
+        self.page_meta = {}
+        self.completed = {}
+        self.metrics = CrawlMetrics()
+        self.search_site = None
         
-        # Kapitel-Reihenfolge extrahieren
-        chapter_order = self.extract_navigation_order(start_url)
-        
-        if not chapter_order:
-            print("❌ Keine Kapitel gefunden!")
-            return
-        
-        # Filter anwenden wenn gewünscht
-        if filter_pattern:
-            pattern = re.compile(filter_pattern, re.IGNORECASE)
-            filtered_order = [(url, num, title) for url, num, title in chapter_order 
-                             if pattern.search(title) or pattern.search(url)]
-            print(f"🔍 Filter '{filter_pattern}' angewendet: {len(filtered_order)}/{len(chapter_order)} Seiten")
-            chapter_order = filtered_order
+        # Fortsetzen: Kapitel-Reihenfolge und Journal des abgebrochenen Crawls laden
+        chapter_order = None
+        self.journal = CrawlJournal(output_path, self.log) if not self.dry_run and not bundle_format else None
+        if resume and self.journal is not None:
+            state = self.journal.load_state()
+            if state and state.get("start_url") == start_url and state.get("format") == format_type:
+                chapter_order = state["chapter_order"]
+                journal_entries = self.journal.resume()
+                self.completed = {url: entry for url, entry in journal_entries.items()
+                                  if entry.get("status") == "done"}
+                # Metadaten erledigter Seiten für index.json übernehmen
+                for url, entry in self.completed.items():
+                    if entry.get("meta"):
+                        self.page_meta[url] = entry["meta"]
+                self.log(f"♻️  Setze Crawl fort: {len(self.completed)}/{len(chapter_order)} Seiten bereits erledigt")
+            else:
+                self.log("⚠️  Kein passender Crawl-Status gefunden, starte neu")
         
-        # Begrenzen auf max_pages wenn gewünscht
-        if max_pages and max_pages > 0:
-            chapter_order = chapter_order[:max_pages]
-            print(f"📄 Limitiert auf {max_pages} Seiten")
+        if chapter_order is None:
+            chapter_order = await self.find_chapters(start_url, filter_pattern, max_pages, depth, discovery,
+                                                     include, exclude)
+            
+            if not chapter_order:
+                self.log("❌ Keine Kapitel gefunden!")
+                return
+            
+            if self.journal is not None:
+                self.journal.start(start_url, format_type, chapter_order)
         
-        # Chapter order speichern für Link-Konvertierung
         self.chapter_order = chapter_order
+        if not self.dry_run:
+            if bundle_format:
+                self.bundle = BundleWriter(target_path, bundle_format, [url for url, _, _ in chapter_order])
+            else:
+                self.writer = FileWriter(fsync=self.fsync, log=self.log)
+                self.writer.start()
+            if self.export_chunks and format_type != 'md':
+                self.log("⚠️  --chunks benötigt Markdown (-f md oder --bundle-content md)")
+            elif self.export_chunks:
+                chapters = [{"index": i, "url": url, "chapter_number": chapter_num, "title": title,
+                             "filename": self.generate_filename(chapter_num, title, format_type, len(chapter_order))}
+                            for i, (url, chapter_num, title) in enumerate(chapter_order)]
+                self.chunks = ChunkWriter(output_path / "chunks", chapters, self.chunk_tokens, self.chunk_overlap)
+            if self.search_index is not None:
+                self.search_site = str((target_path or output_path).resolve())
+                self.search_indexed = 0
         
         # Index-Datei erstellen BEVOR das Crawling beginnt
-        if not self.dry_run:
+        if not self.dry_run and not bundle_format:
             self.create_index_file(chapter_order, format_type, output_path)
         
-        # Jede URL crawlen
-        success_count = 0
+        # Seiten-Stream verbrauchen - bis zu self.concurrency Seiten gleichzeitig in Arbeit
         start_time = time.time()
+        results = []
+        duplicate_count = 0
+        try:
+            pages = self.iter_pages(start_url, format_type, include_nav, clean_output,
+                                    chapter_order=chapter_order, output_dir=output_path)
+            async with aclosing(pages):
+                async for page in pages:
+                    success = page.success
+                    if page.status == "success":
+                        success = await self.save_page(page, output_path)
+                        if success:
+                            self.log(f"✅ Gespeichert: {page.filename}")
+                        if page.duplicate_of is not None:
+                            duplicate_count += 1
+                    elif page.status in ("resumed", "skipped", "unchanged"):
+                        # Nicht neu verarbeitete Kapitel aus der vorhandenen Datei übernehmen
+                        if self.chunks is not None:
+                            await self.add_chunks(page.url, output_path / page.filename)
+                        if self.search_index is not None:
+                            await self.index_page(page, output_path / page.filename,
+                                                  self.page_meta.get(page.url, {}).get("content_hash"))
+                    if page.written is not None and success:
+                        # Erst nach dem Umbenennen als erledigt eintragen, sonst fehlt die Datei nach einem Absturz
+                        page.written.add_done_callback(
+                            partial(self.record_written, page.url, page.filename))
+                    elif page.status != "resumed":
+                        self.record_result(page.url, page.filename, success)
+                    if self.bundle is not None:
+                        await self.bundle.done(page.url)
+                    results.append((page.index, page.filename, success, page.written))
+        finally:
+            await self.close()
+            if self.journal is not None:
+                self.journal.close()
+        # Bundle erst nach vollständigem Lauf ersetzen - abgebrochene bleiben als temporäre Datei liegen
+        bundle, self.bundle = self.bundle, None
+        if bundle is not None:
+            await bundle.close(self.build_index_data(chapter_order, format_type))
+        chunks, self.chunks = self.chunks, None
+        if chunks is not None:
+            await chunks.close()
+        # Suchindex auf die Seiten dieses Crawls beschränken, wie index.json
+        search_removed = 0
+        if self.search_index is not None and self.search_site is not None:
+            search_removed = await self.search_index.finish(self.search_site, [url for url, _, _ in chapter_order])
         
-        for i, (url, chapter_num, title) in enumerate(chapter_order, 1):
-            filename = self.generate_filename(chapter_num, title, format_type, len(chapter_order))
-            print(f"[{i:2d}/{len(chapter_order)}] Crawle: {title}")
-            print(f"                     URL: {url}")
-            
-            # Retry logic
-            success = False
-            for retry in range(self.max_retries):
-                if retry > 0:
-                    print(f"   🔄 Wiederholung {retry}/{self.max_retries - 1}")
-                
-                if format_type == 'html':
-                    success = await self.save_as_html(url, filename, output_path)
-                else:
-                    success = await self.save_as_markdown(url, filename, output_path)
-                
-                if success:
-                    break
-                    
-                # Wait before retry
-                if retry < self.max_retries - 1:
-                    await asyncio.sleep(self.delay * 2)
-            
-            if success:
-                print(f"✅ Gespeichert: {filename}")
-                success_count += 1
-            else:
-                print(f"❌ Fehler bei: {filename}")
-            
-            # Delay zwischen Requests
-            if self.delay > 0 and i < len(chapter_order):
-                print(f"⏱️  Warte {self.delay}s...")
-                await asyncio.sleep(self.delay)
+        # Seiten mit Schreibfehlern zählen als fehlgeschlagen, Ausgabe in Kapitel-Reihenfolge
+        writer, self.writer = self.writer, None
+        # (die Schreibstufe ist geschlossen, alle Futures sind erledigt)
+        results = [(filename, success and (written is None or written.result()[0]))
+                   for _, filename, success, written in sorted(results, key=lambda result: result[0])]
+        success_count = sum(1 for _, success in results if success)
+        failed_files = [filename for filename, success in results if not success]
+        
+        # Index mit Hashes, Abrufzeiten und Validatoren aktualisieren
+        if not self.dry_run and bundle is None:
+            self.create_index_file(chapter_order, format_type, output_path)
         
         elapsed_time = time.time() - start_time
         
-        print("-" * 70)
-        print(f"🎉 Intelligentes Crawling abgeschlossen!")
-        print(f"   Erfolgreich: {success_count}/{len(chapter_order)} Seiten")
-        print(f"   Zeit: {elapsed_time:.1f}s")
-        if not self.dry_run:
-            print(f"   Gespeichert in: {output_path}")
-            print(f"   Index-Datei: {output_path / 'index.json'}")
-            print(f"   Übersicht: {output_path / 'README.md'}")
+        # Messwerte maschinenlesbar ablegen
+        if metrics_out:
+            write_file_atomic(Path(metrics_out), json.dumps(self.metrics.to_json(elapsed_time),
+                                                            ensure_ascii=False, indent=2).encode('utf-8'))
+        if metrics_prom:
+            write_file_atomic(Path(metrics_prom), self.metrics.to_prometheus(elapsed_time).encode('utf-8'))
+        
+        self.log("-" * 70)
+        self.log("🎉 Intelligentes Crawling abgeschlossen!")
+        self.log(f"   Erfolgreich: {success_count}/{len(chapter_order)} Seiten")
+        if failed_files:
+            self.log(f"   Fehlgeschlagen: {', '.join(failed_files)}")
+        if self.cache is not None:
+            self.log(f"   Cache: {self.cache.hits} frisch, {self.cache.revalidated} revalidiert (304), "
+                  f"{self.cache.misses} neu geladen")
+        if writer is not None:
+            self.log(f"   Geschrieben: {writer.written} Dateien, {writer.unchanged} identisch übersprungen")
+        if self.assets is not None:
+            self.log(f"   Assets: {self.assets.downloaded} geladen ({self.assets.bytes / 1024 / 1024:.1f} MB), "
+                     f"{self.assets.deduplicated} inhaltsgleich, {self.assets.failed} fehlgeschlagen")
+        if self.boilerplate_model is not None:
+            self.log(f"   Dedup: {duplicate_count} Duplikate, "
+                     f"{len(self.boilerplate_model.blocks)} Boilerplate-Blöcke entfernt")
+        self.log(f"   Zeit: {elapsed_time:.1f}s")
+        summary = self.metrics.summary()
+        stage_totals = {name: stats["sum"] for name, stats in summary["stages"].items()}
+        if stage_totals:
+            self.log("   Stufen: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in stage_totals.items()))
+        if "streamed_pages" in summary:
+            self.log(f"   Speicherarm: {summary['streamed_pages']} große Seiten gestreamt")
+        if "peak_memory" in summary:
+            peak = summary["peak_memory"]
+            largest = max((record for record in self.metrics.pages.values() if "peak_memory" in record),
+                          key=lambda record: record["peak_memory"])
+            self.log(f"   Speicher-Peak pro Seite: p50 {peak['p50'] / 1024 / 1024:.1f} MB, "
+                     f"p95 {peak['p95'] / 1024 / 1024:.1f} MB, max {peak['max'] / 1024 / 1024:.1f} MB "
+                     f"({largest['filename']})")
+        if chunks is not None:
+            self.log(f"   Chunks: {chunks.count} aus {chunks.exported} Kapiteln in {chunks.directory}")
+        if self.search_index is not None and self.search_site is not None:
+            self.log(f"   Suchindex: {self.search_indexed} Seiten aktualisiert, {search_removed} entfernt "
+                     f"({self.search_index.path})")
+        if metrics_out:
+            self.log(f"   Metriken: {metrics_out}")
+        if bundle is not None:
+            self.log(f"   Bundle: {bundle.path} ({bundle.records} Seiten)")
+        elif not self.dry_run:
+            self.log(f"   Gespeichert in: {output_path}")
+            self.log(f"   Index-Datei: {output_path / 'index.json'}")
+            self.log(f"   Übersicht: {output_path / 'README.md'}")
+
+
+# ╭─────────────────────────────────────────────────────────────────────────────╮
+# │                               BATCH MODE                                   │
+# ╰─────────────────────────────────────────────────────────────────────────────╯
+
+# Optionen, die im Batch-Modus für alle Sites gemeinsam gelten und nur auf der Kommandozeile stehen
+BATCH_GLOBAL_OPTIONS = {'batch', 'verbose', 'delay', 'per_host_limit', 'adaptive', 'breaker_threshold',
+                        'breaker_cooldown', 'recycle_after', 'cache_dir', 'cache_ttl', 'cache_max_mb',
+                        'search_db'}
+# Kurznamen im Manifest für Optionen, deren Ziel anders heißt
+BATCH_OPTION_ALIASES = {'filter': 'filter_pattern'}
+
+
+class CrawlScheduler:
+    """Gemeinsame Ressourcen mehrerer Crawls: globales Request-Limit, Host-Limits, Pools und Cache"""
+
+    def __init__(self, concurrency: int = 8, per_host_limit: Optional[int] = None, delay: float = 0,
+                 adaptive: bool = False, breaker_threshold: float = 0.5, breaker_cooldown: float = 30,
+                 timeout: int = 30, recycle_after: int = 100, cache: Optional[ResponseCache] = None,
+                 log: Callable[..., None] = print):
+        self.concurrency = max(1, concurrency)
+        # Meldungen zu den Hosts einer Site gehen an deren Crawl (SmartCrawler.iter_pages)
+        self.limiter = HostLimiter(delay, per_host_limit or self.concurrency, adaptive=adaptive,
+                                   breaker_threshold=breaker_threshold, breaker_cooldown=breaker_cooldown, log=log)
+        self.http_client = HttpClient(self.concurrency, timeout)
+        self.browser_pool = BrowserPool(self.concurrency, timeout, recycle_after, log)
+        self.cache = cache
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Erst den Host-Slot, dann einen der globalen Slots - wartende Hosts blockieren keine anderen"""
+        # Semaphore erst im laufenden Event-Loop anlegen
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        async with self.limiter.slot(url):
+            async with self._slots:
+                yield
+
+    async def close(self) -> None:
+        """Schließt Browser-Pool und HTTP-Client und speichert den Cache-Index"""
+        await self.browser_pool.close()
+        await self.http_client.close()
+        if self.cache is not None:
+            self.cache.save()
+
+
+def read_batch_manifest(path: str) -> List[dict]:
+    """Liest ein Batch-Manifest (JSON oder YAML) und liefert die Site-Einträge mit Defaults
+
+    Erlaubt ist eine Liste von Sites oder ein Objekt mit 'sites' und optional 'defaults'.
+    """
+    manifest_path = Path(path)
+    text = manifest_path.read_text(encoding='utf-8')
+    if manifest_path.suffix.lower() in ('.yaml', '.yml'):
+        if importlib.util.find_spec('yaml') is None:
+            raise ValueError("YAML-Manifeste benötigen das Paket PyYAML (pip install pyyaml) - alternativ JSON verwenden")
+        import yaml
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    defaults: dict = {}
+    if isinstance(data, dict):
+        defaults = data.get('defaults') or {}
+        data = data.get('sites')
+    if not isinstance(data, list) or not data or not all(isinstance(site, dict) for site in data):
+        raise ValueError(f"Manifest {path}: erwartet eine nicht-leere Liste von Sites")
+    sites = []
+    for number, site in enumerate(data, 1):
+        site = {**defaults, **site}
+        for key in ('url', 'output'):
+            if not site.get(key):
+                raise ValueError(f"Manifest {path}: Site {number} ohne '{key}'")
+        sites.append(site)
+    return sites
+
+
+def site_arguments(args: argparse.Namespace, site: dict) -> argparse.Namespace:
+    """Kommandozeilen-Optionen als Defaults, überschrieben durch einen Manifest-Eintrag"""
+    site_args = argparse.Namespace(**vars(args))
+    # Metrik-Dateien gelten pro Site nur, wenn das Manifest sie nennt
+    site_args.metrics_out = site_args.metrics_prom = None
+    for key, value in site.items():
+        if key == 'name':
+            continue
+        dest = BATCH_OPTION_ALIASES.get(key, key.replace('-', '_'))
+        if dest not in vars(args) or dest in BATCH_GLOBAL_OPTIONS:
+            raise ValueError(f"Option '{key}' ist im Manifest nicht erlaubt (unbekannt oder nur global)")
+        setattr(site_args, dest, value)
+    if site_args.format not in ['html', 'md'] + BUNDLE_FORMATS:
+        raise ValueError(f"Site {site_args.url}: ungültiges Format {site_args.format!r}")
+    return site_args
+
+
+async def run_batch(args: argparse.Namespace, sites: List[dict],
+                    cache: Optional[ResponseCache] = None,
+                    search_index: Optional[SearchIndex] = None) -> List[dict]:
+    """Crawlt alle Sites in einem Prozess unter einem gemeinsamen Scheduler
+
+    Liefert pro Site Name, URL, Ausgabe, Seiten-Status, Dauer, Metriken und ggf. den Fehler.
+    """
+    scheduler = CrawlScheduler(args.concurrency, args.per_host_limit, args.delay, args.adaptive,
+                               args.breaker_threshold, args.breaker_cooldown, args.timeout,
+                               args.recycle_after, cache)
+    site_args = [site_arguments(args, site) for site in sites]
+    width = max(len(site.get('name') or Path(site['output']).name) for site in sites)
+
+    async def run_site(site: dict, options: argparse.Namespace) -> dict:
+        name = site.get('name') or Path(options.output).name
+        prefix = f"[{name:<{width}}]"
+        crawler = build_crawler(options, scheduler=scheduler, search_index=search_index,
+                                log=lambda *values, **kwargs: print(prefix, *values, **kwargs))
+        start = time.time()
+        error = None
+        try:
+            await crawler.crawl_website(options.url, options.output, options.format, **crawl_options(options))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            print(f"{prefix} ❌ Fehler: {error}")
+        elapsed = time.time() - start
+        return {"name": name, "url": options.url, "output": options.output, "error": error,
+                "elapsed": elapsed, "pages": crawler.metrics.summary()["pages"],
+                "metrics": crawler.metrics.to_json(elapsed)}
+
+    try:
+        return await asyncio.gather(*(run_site(site, options) for site, options in zip(sites, site_args)))
+    finally:
+        await scheduler.close()
+
+
+def print_batch_summary(results: List[dict], elapsed: float, cache: Optional[ResponseCache]) -> None:
+    """Gemeinsame Zusammenfassung aller Sites"""
+    width = max(len(result["name"]) for result in results)
+    total_pages = sum(sum(result["pages"].values()) for result in results)
+    total_failed = sum(result["pages"].get("failed", 0) for result in results)
+    print("-" * 70)
+    print(f"📦 Batch abgeschlossen: {len(results)} Sites, {total_pages - total_failed}/{total_pages} Seiten "
+          f"erfolgreich, {elapsed:.1f}s")
+    for result in results:
+        pages = sum(result["pages"].values())
+        failed = result["pages"].get("failed", 0)
+        icon = "❌" if result["error"] or failed else "✅"
+        detail = f"Fehler: {result['error']}" if result["error"] else f"{pages - failed}/{pages} Seiten"
+        print(f"   {icon} {result['name']:<{width}}  {detail}, {result['elapsed']:.1f}s")
+    if cache is not None:
+        print(f"   Cache: {cache.hits} frisch, {cache.revalidated} revalidiert (304), {cache.misses} neu geladen")
 
 
 # ╭─────────────────────────────────────────────────────────────────────────────╮
@@ -547,17 +4581,26 @@ Beispiele:
   
   # Begrenzt auf 10 Seiten mit sauberem Output
   %(prog)s -u https://example.com/docs -o output -F md -m 10 -c
+  
+  # Mehrere Sites aus einem Manifest, insgesamt höchstens 16 gleichzeitige Requests
+  %(prog)s --batch sites.yaml -j 16 --per-host-limit 2
+  
+  # Beim Crawlen einen Volltextindex pflegen und später durchsuchen
+  %(prog)s -u https://example.com/docs -o output -F md --search-db suche.sqlite
+  %(prog)s search "daten einlesen" --db suche.sqlite
         """
     )
     
     # Erforderliche Argumente
     required = parser.add_argument_group('erforderliche Argumente')
-    required.add_argument('-u', '--url', required=True,
+    required.add_argument('-u', '--url',
                          help='Start-URL der zu crawlenden Website')
-    required.add_argument('-o', '--output', required=True,
+    required.add_argument('-o', '--output',
                          help='Output-Verzeichnis für die gespeicherten Dateien')
-    required.add_argument('-f', '--format', required=True, choices=['html', 'md'],
-                         help='Output-Format (html oder md)')
+    required.add_argument('-f', '--format', choices=['html', 'md'] + BUNDLE_FORMATS,
+                         help='Output-Format: html oder md als Einzeldateien, jsonl, tar.gz, tar.zst oder zip als Bundle-Datei')
+    required.add_argument('--batch', metavar='MANIFEST',
+                         help='Statt -u/-o/-f: alle Sites aus einem JSON- oder YAML-Manifest in einem Prozess crawlen')
     
     # Optionale Argumente
     optional = parser.add_argument_group('optionale Argumente')
@@ -570,6 +4613,21 @@ Beispiele:
     optional.add_argument('-r', '--max-retries', type=int, default=3,
                          help='Maximale Anzahl von Wiederholungen bei Fehlern (Standard: 3)')
     
+    optional.add_argument('--backoff', type=float, default=1.0,
+                         help='Basis-Wartezeit in Sekunden für exponentiellen Backoff mit Jitter (Standard: 1.0)')
+    
+    optional.add_argument('--max-backoff', type=float, default=60.0,
+                         help='Maximale Backoff-Wartezeit in Sekunden (Standard: 60)')
+    
+    optional.add_argument('--adaptive', action='store_true',
+                         help='Request-Rate pro Host an Latenz und Drosselung anpassen (--delay ist Untergrenze)')
+    
+    optional.add_argument('--breaker-threshold', type=float, default=0.5,
+                         help='Fehlerrate, ab der ein Host pausiert wird, 0 = aus (Standard: 0.5)')
+    
+    optional.add_argument('--breaker-cooldown', type=float, default=30.0,
+                         help='Pause in Sekunden nach Auslösen des Circuit Breakers (Standard: 30)')
+    
     optional.add_argument('-s', '--skip-existing', action='store_true',
                          help='Überspringe bereits existierende Dateien')
     
@@ -585,36 +4643,298 @@ Beispiele:
     optional.add_argument('-fil', '--filter', type=str, dest='filter_pattern',
                          help='Regex-Filter für Seitentitel oder URLs')
     
+    optional.add_argument('--include', action='append', metavar='RULE',
+                         help='Nur passende Seiten crawlen (mehrfach möglich): Kapitelbereich wie 3.1-3.9, '
+                              'URL-Pfad-Präfix wie /docs/api/ oder Regex für Titel und URL')
+    
+    optional.add_argument('--exclude', action='append', metavar='RULE',
+                         help='Passende Seiten auslassen (mehrfach möglich, gleiche Regeln wie --include)')
+    
     optional.add_argument('-m', '--max-pages', type=int,
-                         help='Maximale Anzahl von Seiten die gecrawlt werden sollen')
+                         help='Maximale Anzahl von Seiten die gecrawlt werden sollen (beendet die Suche vorzeitig)')
+    
+    optional.add_argument('-D', '--depth', type=int, default=0,
+                         help='Tiefe der Navigationssuche über Unterseiten, 0 = nur Startseite (Standard: 0)')
+    
+    optional.add_argument('-j', '--concurrency', type=int, default=1,
+                         help='Anzahl gleichzeitig gecrawlter Seiten, mit --batch über alle Sites (Standard: 1)')
+    
+    optional.add_argument('--per-host-limit', type=int,
+                         help='Maximale parallele Requests pro Host (Standard: wie --concurrency)')
+    
+    optional.add_argument('-e', '--engine', choices=['browser', 'http', 'auto'], default='browser',
+                         help='Abruf-Engine: browser (crawl4ai), http (ohne Browser) oder auto '
+                              '(HTTP, Browser nur für JavaScript-Seiten) (Standard: browser)')
+    
+    optional.add_argument('-w', '--workers', type=int, default=0,
+                         help='Prozesse für Bereinigung und Markdown-Konvertierung, 0 = im Event-Loop (Standard: 0)')
+    
+    optional.add_argument('-P', '--parser', choices=['auto'] + PARSER_BACKENDS, default='html.parser',
+                         help='HTML-Parser für die Bereinigung; lxml/selectolax müssen installiert sein, '
+                              'auto wählt das schnellste (Standard: html.parser)')
+    
+    optional.add_argument('--recycle-after', type=int, default=100,
+                         help='Browser-Session nach N Seiten neu starten, 0 = nie (Standard: 100)')
+    
+    optional.add_argument('-R', '--resume', action='store_true',
+                         help='Abgebrochenen Crawl fortsetzen (nutzt gespeicherte Reihenfolge und Journal)')
+    
+    optional.add_argument('-I', '--incremental', action='store_true',
+                         help='Nur neue, geänderte oder zu alte Seiten neu laden (nutzt index.json)')
+    
+    optional.add_argument('--max-age', type=float,
+                         help='Im inkrementellen Modus Seiten älter als N Sekunden immer neu laden')
+    
+    optional.add_argument('--cache-dir', type=str,
+                         help='Verzeichnis für den persistenten HTTP-Cache (aktiviert den Cache)')
+    
+    optional.add_argument('--cache-ttl', type=float, default=3600,
+                         help='Sekunden, in denen Cache-Einträge ohne Revalidierung genutzt werden (Standard: 3600)')
+    
+    optional.add_argument('--cache-max-mb', type=int, default=500,
+                         help='Maximale Cache-Größe in MB, älteste Einträge werden verdrängt (Standard: 500)')
+    
+    optional.add_argument('--bundle-content', choices=['md', 'html'], default='md',
+                         help='Inhaltsformat der Seiten in Bundle-Formaten (Standard: md)')
+    
+    optional.add_argument('--metrics-out', type=str, default=None, metavar='FILE',
+                         help='Zeiten pro Seite und Stufe, Wiederholungen, Bytes und Latenz-Perzentile als JSON speichern')
+    
+    optional.add_argument('--metrics-prom', type=str, default=None, metavar='FILE',
+                         help='Dieselben Kennzahlen im Prometheus-Textformat speichern')
+    
+    optional.add_argument('--no-fsync', action='store_true',
+                         help='Dateien ohne fsync schreiben (schneller, aber nicht absturzsicher bei Stromausfall)')
+    
+    optional.add_argument('--dedup', action='store_true',
+                         help='Boilerplate lernen und entfernen, (beinahe) doppelte Kapitel zusammenfassen')
+    
+    optional.add_argument('--dedup-distance', type=int, default=3, metavar='BITS',
+                         help='Maximale Simhash-Distanz für beinahe gleiche Kapitel (Standard: 3)')
+    
+    optional.add_argument('--mirror-assets', action='store_true',
+                         help='Bilder, Medien, Stylesheets und Skripte einmalig herunterladen, inhaltsadressiert unter assets/ ablegen und lokal verlinken')
+    
+    optional.add_argument('--asset-concurrency', type=int, default=8,
+                         help='Maximale parallele Asset-Downloads (Standard: 8)')
+    
+    optional.add_argument('--large-page-mb', type=float, default=16,
+                         help='Seiten ab dieser HTML-Größe in MB speicherarm im Streaming-Modus verarbeiten, '
+                              '0 = nie (Standard: 16)')
+    
+    optional.add_argument('--memory-stats', action='store_true',
+                         help='Spitzen-Speicherbedarf pro Seite messen und in der Zusammenfassung ausgeben '
+                              '(tracemalloc, verlangsamt die Verarbeitung)')
+    
+    optional.add_argument('--chunks', action='store_true',
+                         help='Kapitel zusätzlich an Überschriften in Chunks teilen und spaltenorientiert '
+                              'unter chunks/ ablegen (nur Markdown)')
+    
+    optional.add_argument('--chunk-tokens', type=int, default=512, metavar='N',
+                         help='Maximale (geschätzte) Tokens pro Chunk (Standard: 512)')
+    
+    optional.add_argument('--chunk-overlap', type=int, default=64, metavar='N',
+                         help='Tokens, die ein Chunk von seinem Vorgänger im selben Abschnitt wiederholt (Standard: 64)')
+    
+    optional.add_argument('--search-db', type=str, default=None, metavar='FILE',
+                         help='Seiten beim Schreiben in diesen SQLite-Volltextindex aufnehmen '
+                              '(durchsuchbar mit "%(prog)s search"; mehrere Crawls können ihn teilen)')
+    
+    optional.add_argument('--discovery', choices=DISCOVERY_SOURCES, default='nav',
+                         help='Kapitelquelle: nav (Navigation der Startseite), sitemap (robots.txt und sitemap.xml) '
+                              'oder auto (Sitemap, wenn die Navigation nichts findet) (Standard: nav)')
     
     optional.add_argument('-v', '--verbose', action='store_true',
                          help='Detaillierte Debug-Informationen')
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.batch:
+        missing = [option for option, value in (('-u/--url', args.url), ('-o/--output', args.output),
+                                                ('-f/--format', args.format)) if not value]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+    # Auswahlregeln vorab kompilieren, damit ungültige Regexe sofort auffallen
+    try:
+        PageSelector(args.include, args.exclude, filter_pattern=args.filter_pattern)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.chunks:
+        if args.chunk_tokens < 1 or not 0 <= args.chunk_overlap < args.chunk_tokens:
+            parser.error("--chunk-overlap muss zwischen 0 und --chunk-tokens liegen")
+        if args.format == 'html' or (args.format in BUNDLE_FORMATS and args.bundle_content == 'html'):
+            parser.error("--chunks benötigt Markdown (-f md oder --bundle-content md)")
+    return args
+
+
+def parse_search_arguments(argv: List[str]) -> argparse.Namespace:
+    """Argumente des Unterbefehls 'search'"""
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} search",
+        description="Volltextsuche über gecrawlte Seiten (SQLite FTS5, siehe --search-db)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Beispiele:
+  # Vorhandene Crawls nachträglich aufnehmen (anhand ihrer index.json)
+  %(prog)s --db suche.sqlite --add output other_site
+  
+  # Rangfolge nach BM25; FTS5-Syntax wie "data frame", einles* oder NOT ist erlaubt
+  %(prog)s "daten einlesen" --db suche.sqlite -n 5
+        """
+    )
+    parser.add_argument('query', nargs='?', help='Suchbegriffe (FTS5-Syntax)')
+    parser.add_argument('--db', required=True, metavar='FILE', help='SQLite-Datei des Suchindex')
+    parser.add_argument('--add', nargs='+', metavar='DIR', default=[],
+                        help='Ausgabeverzeichnisse anhand ihrer index.json (neu) indizieren')
+    parser.add_argument('-n', '--limit', type=int, default=10, help='Maximale Trefferzahl (Standard: 10)')
+    parser.add_argument('--site', type=str, help='Nur Sites, deren Pfad diesen Text enthält')
+    parser.add_argument('--json', action='store_true', help='Treffer als JSON ausgeben')
+    args = parser.parse_args(argv)
+    if not args.query and not args.add:
+        parser.error("Suchbegriffe oder --add angeben")
+    return args
+
+
+def search_main(argv: List[str]) -> None:
+    """Unterbefehl 'search': Verzeichnisse indizieren und/oder den Index abfragen"""
+    args = parse_search_arguments(argv)
+    try:
+        index = SearchIndex(args.db)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    try:
+        for output_dir in args.add:
+            try:
+                updated, removed = index.add_directory(output_dir)
+            except (OSError, ValueError) as e:
+                print(f"❌ {output_dir}: index.json nicht lesbar: {e}")
+                sys.exit(1)
+            print(f"📚 {output_dir}: {updated} Seiten indiziert, {removed} entfernt")
+        if not args.query:
+            return
+        
+        start = time.perf_counter()
+        hits = index.search(args.query, args.limit, args.site)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if args.json:
+            print(json.dumps(hits, ensure_ascii=False, indent=2))
+            return
+        print(f"🔎 {len(hits)} Treffer für \"{args.query}\" ({elapsed_ms:.1f} ms)")
+        for rank, hit in enumerate(hits, 1):
+            chapter = f"{hit['chapter_number']} " if hit['chapter_number'] else ""
+            print(f"{rank:3d}. {chapter}{hit['title']}")
+            print(f"     {Path(hit['site']) / hit['filename']}")
+            print(f"     {' '.join(hit['snippet'].split())}")
+            print(f"     {hit['url']}")
+    finally:
+        index.close()
 
 
 # ╭─────────────────────────────────────────────────────────────────────────────╮
 # │                              MAIN EXECUTION                                │
 # ╰─────────────────────────────────────────────────────────────────────────────╯
 
+def build_crawler(args: argparse.Namespace, cache: Optional[ResponseCache] = None,
+                  scheduler: Optional[CrawlScheduler] = None, log: Callable[..., None] = print,
+                  search_index: Optional[SearchIndex] = None) -> SmartCrawler:
+    """Erstellt einen SmartCrawler aus den Kommandozeilen- bzw. Manifest-Optionen"""
+    return SmartCrawler(
+        delay=args.delay,
+        timeout=args.timeout,
+        max_retries=args.max_retries,
+        concurrency=args.concurrency,
+        per_host_limit=args.per_host_limit,
+        recycle_after=args.recycle_after,
+        cache=cache,
+        engine=args.engine,
+        workers=args.workers,
+        parser=args.parser,
+        retry_policy=RetryPolicy(args.max_retries, base_delay=args.backoff, max_delay=args.max_backoff),
+        adaptive=args.adaptive,
+        breaker_threshold=args.breaker_threshold,
+        breaker_cooldown=args.breaker_cooldown,
+        fsync=not args.no_fsync,
+        bundle_content=args.bundle_content,
+        log=log,
+        dedup=args.dedup,
+        dedup_distance=args.dedup_distance,
+        mirror_assets=args.mirror_assets,
+        asset_concurrency=args.asset_concurrency,
+        large_page_mb=args.large_page_mb,
+        memory_stats=args.memory_stats,
+        export_chunks=args.chunks,
+        chunk_tokens=args.chunk_tokens,
+        chunk_overlap=args.chunk_overlap,
+        search_index=search_index,
+        scheduler=scheduler
+    )
+
+
+def crawl_options(args: argparse.Namespace) -> dict:
+    """Optionen für crawl_website aus den Kommandozeilen- bzw. Manifest-Optionen"""
+    return dict(
+        skip_existing=args.skip_existing,
+        dry_run=args.dry_run,
+        include_nav=not args.no_navigation,
+        clean_output=args.clean,
+        filter_pattern=args.filter_pattern,
+        max_pages=args.max_pages,
+        incremental=args.incremental,
+        max_age=args.max_age,
+        resume=args.resume,
+        depth=args.depth,
+        metrics_out=args.metrics_out,
+        metrics_prom=args.metrics_prom,
+        discovery=args.discovery,
+        include=args.include,
+        exclude=args.exclude
+    )
+
+
 def main():
     """Hauptfunktion für den Smart Crawler."""
+    if sys.argv[1:2] == ['search']:
+        search_main(sys.argv[2:])
+        return
     args = parse_arguments()
     
+    sites = None
+    if args.batch:
+        try:
+            sites = read_batch_manifest(args.batch)
+            for site in sites:
+                site_arguments(args, site)
+        except (OSError, ValueError) as e:
+            print(f"❌ Manifest nicht lesbar: {e}")
+            sys.exit(1)
+    
     # Konfiguration anzeigen
     print("-" * 70)
     print("🤖 Smart Website Crawler")
     print("-" * 70)
-    print(f"   URL: {args.url}")
-    print(f"   Output: {args.output}")
-    print(f"   Format: {args.format}")
+    if sites is not None:
+        print(f"   Batch: {args.batch} ({len(sites)} Sites)")
+        print(f"   Total concurrency: {args.concurrency}")
+        if args.metrics_prom:
+            print("⚠️  --metrics-prom gilt im Batch-Modus nur pro Site (metrics_prom im Manifest)")
+    else:
+        print(f"   URL: {args.url}")
+        print(f"   Output: {args.output}")
+        print(f"   Format: {args.format}")
+        if args.format in BUNDLE_FORMATS:
+            print(f"   Bundle content: {args.bundle_content}")
     
     # Optionen
     if args.delay > 0:
         print(f"   Delay: {args.delay}s")
+    if args.adaptive:
+        print("   Adaptive rate: ✓")
     if args.skip_existing:
         print(f"   Skip existing: ✓")
+    if args.incremental:
+        print("   Incremental: ✓")
+    if args.resume:
+        print("   Resume: ✓")
     if args.dry_run:
         print(f"   Mode: DRY RUN")
     if args.no_navigation:
@@ -623,29 +4943,62 @@ def main():
         print(f"   Clean output: ✓")
     if args.filter_pattern:
         print(f"   Filter: {args.filter_pattern}")
+    if args.include:
+        print(f"   Include: {', '.join(args.include)}")
+    if args.exclude:
+        print(f"   Exclude: {', '.join(args.exclude)}")
     if args.max_pages:
         print(f"   Max pages: {args.max_pages}")
+    if args.depth > 0:
+        print(f"   Depth: {args.depth}")
+    if args.discovery != 'nav':
+        print(f"   Discovery: {args.discovery}")
+    if args.concurrency > 1 and sites is None:
+        print(f"   Concurrency: {args.concurrency}")
+    if args.engine != 'browser':
+        print(f"   Engine: {args.engine}")
+    if args.workers > 0:
+        print(f"   Workers: {args.workers}")
+    if args.parser != 'html.parser':
+        print(f"   Parser: {args.parser}")
+    if args.cache_dir:
+        print(f"   Cache: {args.cache_dir}")
+    if args.dedup:
+        print("   Dedup: ✓")
+    if args.mirror_assets:
+        print("   Mirror assets: ✓")
+    if args.chunks:
+        print(f"   Chunks: {args.chunk_tokens} Tokens, {args.chunk_overlap} Überlappung")
+    if args.search_db:
+        print(f"   Search index: {args.search_db}")
         
     print("-" * 70)
     
+    search_index = None
     try:
-        crawler = SmartCrawler(
-            delay=args.delay,
-            timeout=args.timeout,
-            max_retries=args.max_retries
-        )
-        
-        asyncio.run(crawler.crawl_website(
-            args.url, 
-            args.output, 
-            args.format,
-            skip_existing=args.skip_existing,
-            dry_run=args.dry_run,
-            include_nav=not args.no_navigation,
-            clean_output=args.clean,
-            filter_pattern=args.filter_pattern,
-            max_pages=args.max_pages
-        ))
+        cache = None
+        if args.cache_dir:
+            cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl,
+                                  max_bytes=args.cache_max_mb * 1024 * 1024)
+        if args.search_db and not args.dry_run:
+            search_index = SearchIndex(args.search_db)
+        
+        if sites is not None:
+            start_time = time.time()
+            results = asyncio.run(run_batch(args, sites, cache, search_index))
+            elapsed_time = time.time() - start_time
+            print_batch_summary(results, elapsed_time, cache)
+            if args.metrics_out:
+                write_file_atomic(Path(args.metrics_out), json.dumps(
+                    {"elapsed_seconds": elapsed_time, "sites": results}, ensure_ascii=False, indent=2
+                ).encode('utf-8'))
+                print(f"   Metriken: {args.metrics_out}")
+            if any(result["error"] for result in results):
+                sys.exit(1)
+            return
+        
+        crawler = build_crawler(args, cache, search_index=search_index)
+        asyncio.run(crawler.crawl_website(args.url, args.output, args.format, **crawl_options(args)))
         
         print("✅ Smart crawling completed successfully!")
         
@@ -658,6 +5011,9 @@ def main():
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if search_index is not None:
+            search_index.close()
 
 
 if __name__ == "__main__":
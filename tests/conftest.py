@@ -0,0 +1,54 @@
+"""
+Gemeinsame Test-Hilfen: lokal ausgelieferte Websites und ein Crawl ohne Konsolenausgabe
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fixture_site import QuietHandler, serve  # noqa: E402
+from smart_crawler_final import SmartCrawler  # noqa: E402
+
+
+@pytest.fixture
+def serve_site():
+    """serve_site(root, handler_class) liefert ein Verzeichnis lokal aus und gibt die Basis-URL zurück"""
+    servers = []
+
+    def start(root: Path, handler_class=QuietHandler) -> str:
+        server, base_url = serve(root, handler_class=handler_class)
+        servers.append(server)
+        return base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+class Crawl:
+    """Crawlt mit der HTTP-Engine und sammelt die Meldungen in messages statt auf stdout"""
+
+    def __init__(self):
+        self.messages = []
+
+    def log(self, *values, **kwargs) -> None:
+        self.messages.append(" ".join(map(str, values)))
+
+    def __call__(self, start_url: str, output: Path, format_type: str = "md", crawl_options: dict = None,
+                 **options) -> SmartCrawler:
+        options.setdefault("engine", "http")
+        options.setdefault("fsync", False)
+        crawler = SmartCrawler(log=self.log, **options)
+        asyncio.run(crawler.crawl_website(start_url, str(output), format_type, **(crawl_options or {})))
+        return crawler
+
+
+@pytest.fixture
+def crawl():
+    return Crawl()
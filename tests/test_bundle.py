@@ -0,0 +1,80 @@
+"""
+Bundle-Formate: Seiten in Kapitel-Reihenfolge, auch wenn spätere Kapitel zuerst fertig sind; index.json zuletzt
+"""
+
+import asyncio
+import json
+import tarfile
+import time
+import zipfile
+
+import pytest
+
+from fixture_site import QuietHandler, build_site, chapter_file
+from smart_crawler_final import BundleWriter
+
+PAGES = 5
+
+
+def test_writer_emits_in_chapter_order(tmp_path):
+    urls = [f"https://example.org/{i}.html" for i in range(4)]
+    path = tmp_path / "crawl.jsonl"
+
+    async def run():
+        writer = BundleWriter(path, "jsonl", urls)
+        for position in (2, 0, 3):
+            writer.put(urls[position], {"index": position})
+        # Kapitel 1 schlägt fehl (kein Datensatz) und ist als letztes erledigt
+        for position in (3, 2, 0):
+            await writer.done(urls[position])
+        assert writer.records == 1
+        await writer.done(urls[1])
+        await writer.close()
+        return writer.records
+
+    assert asyncio.run(run()) == 3
+    assert [json.loads(line)["index"] for line in path.read_text(encoding="utf-8").splitlines()] == [0, 2, 3]
+    assert [p.name for p in tmp_path.iterdir()] == ["crawl.jsonl"]
+
+
+class SlowFirstChapterHandler(QuietHandler):
+    def do_GET(self):
+        if self.path.startswith("/" + chapter_file(1)):
+            time.sleep(0.3)
+        super().do_GET()
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    root = build_site(tmp_path / "site", pages=PAGES, page_kb=1, links=2).parent
+    return serve_site(root, SlowFirstChapterHandler) + "index.html"
+
+
+def bundle_members(path, bundle_format: str) -> list:
+    """(Name, Inhalt) der Einträge in Dateireihenfolge"""
+    if bundle_format == "zip":
+        with zipfile.ZipFile(path) as archive:
+            return [(name, archive.read(name).decode("utf-8")) for name in archive.namelist()]
+    with tarfile.open(path) as archive:
+        return [(member.name, archive.extractfile(member).read().decode("utf-8")) for member in archive]
+
+
+@pytest.mark.parametrize("bundle_format", ["jsonl", "tar.gz", "zip"])
+def test_crawl_bundle_order_and_index(site, tmp_path, crawl, bundle_format):
+    output = tmp_path / "out"
+    crawl(site, output, bundle_format, concurrency=PAGES)
+    path = output / f"crawl.{bundle_format}"
+    assert [p.name for p in output.iterdir()] == [path.name]
+
+    if bundle_format == "jsonl":
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert [record["index"] for record in records] == list(range(PAGES))
+        assert all(record["content"].startswith("<!--") and record["content_hash"] for record in records)
+        return
+
+    members = bundle_members(path, bundle_format)
+    names = [name for name, _ in members]
+    assert names[-1] == "index.json"
+    index = json.loads(members[-1][1])
+    assert [entry["filename"] for entry in index["files"]] == names[:-1]
+    assert [name.split("_")[0] for name in names[:-1]] == [str(i) for i in range(1, PAGES + 1)]
@@ -0,0 +1,37 @@
+"""
+Antwort-Cache: Lesen und Schreiben laufen nicht im Event-Loop, der zweite Crawl kommt aus dem Cache
+"""
+
+import threading
+
+import pytest
+
+from fixture_site import build_site
+from smart_crawler_final import ResponseCache
+
+PAGES = 4
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    return serve_site(build_site(tmp_path / "site", pages=PAGES, page_kb=1, links=2).parent) + "index.html"
+
+
+def test_cache_io_runs_off_the_event_loop(site, tmp_path, monkeypatch, crawl):
+    threads = {"read": set(), "store": set()}
+    for name in threads:
+        original = getattr(ResponseCache, name)
+
+        def record(self, *args, name=name, original=original, **kwargs):
+            threads[name].add(threading.current_thread() is threading.main_thread())
+            return original(self, *args, **kwargs)
+        monkeypatch.setattr(ResponseCache, name, record)
+
+    cache = ResponseCache(str(tmp_path / "cache"))
+    crawl(site, tmp_path / "first", cache=cache)
+    assert cache.misses >= PAGES and cache.hits == 0
+
+    cache = ResponseCache(str(tmp_path / "cache"))
+    crawl(site, tmp_path / "second", cache=cache)
+    assert cache.hits >= PAGES and cache.misses == 0
+    assert threads == {"read": {False}, "store": {False}}
@@ -0,0 +1,127 @@
+"""
+Chunk-Export: Grenzen an Überschriften und Absätzen, Überlappung und spaltenorientierte Ablage
+"""
+
+import asyncio
+import json
+import struct
+from array import array
+
+import pytest
+
+from smart_crawler_final import CHUNKS_FORMAT, ChunkWriter, chunk_markdown, count_tokens, token_starts
+
+MAX_TOKENS, OVERLAP = 20, 5
+
+
+def words(prefix: str, count: int) -> str:
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+def chapter_lines():
+    return ["# Titel", "", words("w", 100), "",
+            "## Teil", "", "```", "# kein Titel", "", "x = 1", "```", "", words("v", 30)]
+
+
+def overlap_tail(text: str) -> str:
+    starts = token_starts(text)
+    return text[starts[-OVERLAP]:]
+
+
+def read_npy(path):
+    """Liest eine .npy-Spalte von write_npy ohne numpy"""
+    data = path.read_bytes()
+    assert data[:8] == b'\x93NUMPY\x01\x00'
+    header_length = struct.unpack('<H', data[8:10])[0]
+    header = data[10:10 + header_length].decode('latin-1')
+    values = array('q' if "'<i8'" in header else 'i')
+    values.frombytes(data[10 + header_length:])
+    return values
+
+
+def test_chunks_respect_limit_and_repeat_overlap():
+    chunks = list(chunk_markdown(chapter_lines(), MAX_TOKENS, OVERLAP))
+
+    for text, _, tokens in chunks:
+        assert tokens == count_tokens(text)
+        assert tokens <= MAX_TOKENS
+    # Jeder Folge-Chunk desselben Abschnitts beginnt mit dem Ende seines Vorgängers
+    for (previous, path, _), (text, next_path, _) in zip(chunks, chunks[1:]):
+        if path == next_path and not text.startswith("#"):
+            assert text.startswith(overlap_tail(previous))
+    # Kein Wort geht verloren
+    body = " ".join(text for text, path, _ in chunks if path == ("Titel",))
+    assert all(f"w{i}" in body.split() for i in range(100))
+
+
+def test_headings_start_new_chunk_without_overlap():
+    chunks = list(chunk_markdown(chapter_lines(), MAX_TOKENS, OVERLAP))
+
+    first_part = next(i for i, (_, path, _) in enumerate(chunks) if path == ("Titel", "Teil"))
+    text = chunks[first_part][0]
+    assert text.startswith("## Teil\n\n")
+    assert "w99" not in text
+    assert chunks[0][0].startswith("# Titel\n\n")
+    assert [path for _, path, _ in chunks[:first_part]] == [("Titel",)] * first_part
+
+
+def test_code_fence_stays_in_one_chunk():
+    chunks = list(chunk_markdown(chapter_lines(), MAX_TOKENS, OVERLAP))
+
+    fence = "```\n# kein Titel\n\nx = 1\n```"
+    assert any(fence in text for text, _, _ in chunks)
+    # '#' im Code-Block ist keine Überschrift
+    assert all("kein Titel" not in path for _, path, _ in chunks)
+
+
+def test_long_line_is_split_at_token_boundaries():
+    line = words("t", 50)
+    chunks = list(chunk_markdown([line], MAX_TOKENS, 0))
+
+    assert [tokens for _, _, tokens in chunks] == [20, 20, 10]
+    assert " ".join(text for text, _, _ in chunks) == line
+
+
+def test_invalid_overlap_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ChunkWriter(tmp_path / "chunks", [], max_tokens=10, overlap=10)
+
+
+def test_chunk_writer_columns_follow_chapter_order(tmp_path):
+    chapters = [{"url": f"https://example.org/{i}", "index": i, "title": f"Kapitel {i}"} for i in range(3)]
+    directory = tmp_path / "chunks"
+    source = tmp_path / "kapitel-0.md"
+    source.write_text("\n".join(chapter_lines()), encoding='utf-8')
+
+    async def export():
+        writer = ChunkWriter(directory, chapters, MAX_TOKENS, OVERLAP)
+        # Kapitel werden in Fertigstellungs-Reihenfolge angehängt
+        added = [await writer.add(chapters[2]["url"], "# Zwei\n\nletztes Kapitel"),
+                 await writer.add(chapters[0]["url"], source),
+                 await writer.add("https://example.org/fremd", "# Fremd"),
+                 await writer.add(chapters[1]["url"], "")]
+        await writer.close()
+        return writer, added
+
+    writer, added = asyncio.run(export())
+
+    assert added[0] == 1 and added[1] > 1 and added[2:] == [0, 0]
+    assert writer.exported == 2
+    meta = json.loads((directory / "chunks.json").read_text(encoding='utf-8'))
+    assert meta["format"] == CHUNKS_FORMAT
+    assert meta["count"] == writer.count == sum(added)
+    assert (meta["max_tokens"], meta["overlap"]) == (MAX_TOKENS, OVERLAP)
+
+    offsets = read_npy(directory / "offsets.npy")
+    chapter = read_npy(directory / "chapter.npy")
+    tokens = read_npy(directory / "tokens.npy")
+    order = read_npy(directory / "order.npy")
+    text = (directory / "text.bin").read_bytes()
+    assert len(offsets) == meta["count"] + 1 and offsets[-1] == len(text)
+    chunks = [text[offsets[row]:offsets[row + 1]].decode('utf-8') for row in range(meta["count"])]
+    assert [count_tokens(chunk) for chunk in chunks] == list(tokens)
+
+    expected = [chunk for chunk, _, _ in chunk_markdown(chapter_lines(), MAX_TOKENS, OVERLAP)]
+    assert [chunks[row] for row in order] == expected + ["# Zwei\n\nletztes Kapitel"]
+    assert [chapter[row] for row in order] == [0] * len(expected) + [2]
+    assert not list(directory.glob(".*.tmp"))
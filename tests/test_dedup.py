@@ -0,0 +1,73 @@
+"""
+Duplikaterkennung: das Kapitel mit der kleinsten Position behält den Inhalt, unabhängig von -j
+"""
+
+import hashlib
+import json
+import random
+import time
+
+import pytest
+
+from fixture_site import QuietHandler, chapter_file
+from smart_crawler_final import simhash
+
+PAGES = 8
+# Die ersten Kapitel lädt schon das Boilerplate-Lernen - das Paar liegt dahinter
+SLOW, DUPLICATE = 7, 8
+WORDS = [f"wort{n}" for n in range(500)]
+
+
+def chapter_html(title: str, sidebar: str, seed: int) -> str:
+    """Kapitel mit eigenem Text, damit nur gewollte Duplikate ähnlich sind"""
+    rng = random.Random(seed)
+    paragraphs = "".join(f"<p>{' '.join(rng.choices(WORDS, k=60))}</p>" for _ in range(20))
+    return (f'<html><head><meta charset="utf-8"><title>{title}</title></head>'
+            f'<body>{sidebar}<main><h1>{title}</h1>{paragraphs}</main></body></html>')
+
+
+class SlowFirstChapterHandler(QuietHandler):
+    """Liefert ein Kapitel verzögert aus, damit das spätere gleiche Kapitel zuerst fertig wird"""
+
+    def do_GET(self):
+        if self.path.startswith("/" + chapter_file(SLOW)):
+            time.sleep(0.5)
+        super().do_GET()
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    root = tmp_path / "site"
+    root.mkdir()
+    items = "".join(f'<li><a href="{chapter_file(i)}">{i} Kapitel {i}</a></li>' for i in range(1, PAGES + 1))
+    sidebar = f'<nav class="sidebar"><ul>{items}</ul></nav>'
+    (root / "index.html").write_text(chapter_html("Start", sidebar, 0), encoding="utf-8")
+    for i in range(1, PAGES + 1):
+        # Das letzte Kapitel wiederholt das langsame wortgleich
+        (root / chapter_file(i)).write_text(chapter_html("Kapitel", sidebar, SLOW if i == DUPLICATE else i),
+                                            encoding="utf-8")
+    return serve_site(root, SlowFirstChapterHandler) + "index.html"
+
+
+def test_lowest_chapter_is_canonical(site, tmp_path, crawl):
+    output = tmp_path / "out"
+    crawl(site, output, dedup=True, concurrency=PAGES)
+
+    files = {entry["chapter_number"]: entry for entry in
+             json.loads((output / "index.json").read_text(encoding="utf-8"))["files"]}
+    canonical, duplicate = files[str(SLOW)], files[str(DUPLICATE)]
+    assert "duplicate_of" not in canonical
+    assert duplicate["duplicate_of"] == canonical["filename"]
+    assert "Same content as" in (output / duplicate["filename"]).read_text(encoding="utf-8")
+    assert "Same content as" not in (output / canonical["filename"]).read_text(encoding="utf-8")
+
+
+def test_simhash_matches_column_majority():
+    # Bit j (höchstes zuerst) ist gesetzt, wenn es in mehr als der Hälfte der Trigramm-Hashes gesetzt ist
+    words = random.Random(3).choices(WORDS, k=400)
+    trigrams = {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+    hashes = [int.from_bytes(hashlib.blake2b(trigram.encode("utf-8"), digest_size=8).digest(), "big")
+              for trigram in trigrams]
+    expected = sum(1 << bit for bit in range(64) if sum(h >> bit & 1 for h in hashes) > len(hashes) / 2)
+    assert simhash(" ".join(words)) == expected
+    assert simhash(" ".join(words[:20])) is None
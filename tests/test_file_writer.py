@@ -0,0 +1,78 @@
+"""
+Schreibstufe: Journal erst nach dem Umbenennen, Schreibfehler als fehlgeschlagen
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from fixture_site import build_site
+from smart_crawler_final import CrawlJournal
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    return serve_site(build_site(tmp_path / "site", pages=4, page_kb=1, links=2).parent) + "index.html"
+
+
+def journal_entries(output: Path) -> dict:
+    lines = (output / CrawlJournal.JOURNAL_FILE).read_text(encoding="utf-8").splitlines()
+    return {entry["filename"]: entry["status"] for entry in map(json.loads, lines)}
+
+
+def test_failed_write_is_journaled_as_failed(site, tmp_path, crawl):
+    output = tmp_path / "out"
+    crawl(site, output)
+    entries = journal_entries(output)
+    assert entries and set(entries.values()) == {"done"}
+
+    # Ein Verzeichnis an Stelle der Kapiteldatei lässt das Umbenennen scheitern
+    blocked = sorted(entries)[1]
+    (output / blocked).unlink()
+    (output / blocked).mkdir()
+    crawl(site, output)
+    entries = journal_entries(output)
+    assert entries[blocked] == "failed"
+    assert all(status == "done" for filename, status in entries.items() if filename != blocked)
+
+
+def test_journal_waits_for_writer(site, tmp_path, monkeypatch, crawl):
+    from smart_crawler_final import FileWriter
+
+    output = tmp_path / "out"
+    journaled_before_write = []
+    original = FileWriter._write_batch
+
+    def write_batch(self, batch):
+        # Zum Zeitpunkt des Schreibens darf keine dieser Dateien schon als erledigt im Journal stehen
+        path = output / CrawlJournal.JOURNAL_FILE
+        if path.exists():
+            done = {json.loads(line)["filename"] for line in path.read_text(encoding="utf-8").splitlines()}
+            journaled_before_write.extend(target.name for target, _ in batch if target.name in done)
+        return original(self, batch)
+
+    monkeypatch.setattr(FileWriter, "_write_batch", write_batch)
+    crawl(site, output)
+    assert journaled_before_write == []
+    assert set(journal_entries(output).values()) == {"done"}
+
+
+def test_same_target_twice_in_one_batch(tmp_path):
+    from smart_crawler_final import FileWriter, write_file_atomic
+
+    target = tmp_path / "seite.md"
+    writer = FileWriter(fsync=False)
+    results = writer._write_batch([(target, b"erste Fassung"), (target, b"zweite Fassung")])
+    assert [success for success, _ in results] == [True, True]
+    assert all(seconds > 0 for _, seconds in results)
+    assert writer.errors == []
+    assert target.read_bytes() == b"zweite Fassung"
+
+    assert write_file_atomic(target, b"dritte Fassung")
+    assert target.read_bytes() == b"dritte Fassung"
+    assert [path.name for path in tmp_path.iterdir()] == ["seite.md"]
+    # Rechte wie bei einer mit open() geschriebenen Datei, nicht 0600 wie bei mkstemp
+    reference = tmp_path / "referenz"
+    reference.write_bytes(b"")
+    assert target.stat().st_mode & 0o777 == reference.stat().st_mode & 0o777
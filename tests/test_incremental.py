@@ -0,0 +1,46 @@
+"""
+Inkrementeller Crawl über die Sitemap: lastmod erspart den Abruf, --max-age erzwingt ihn
+"""
+
+import time
+
+import pytest
+
+from fixture_site import build_site, chapter_file
+
+PAGES = 4
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{}</urlset>"""
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    root = build_site(tmp_path / "site", pages=PAGES, page_kb=1, links=2).parent
+    base_url = serve_site(root)
+    entries = "".join(f"<url><loc>{base_url}{chapter_file(i)}</loc><lastmod>2020-01-01</lastmod></url>"
+                      for i in range(1, PAGES + 1))
+    (root / "sitemap.xml").write_text(SITEMAP.format(entries), encoding="utf-8")
+    return base_url + "index.html"
+
+
+def skipped_by_sitemap(messages: list) -> int:
+    return sum("Unverändert laut Sitemap" in message for message in messages)
+
+
+def test_lastmod_skips_unless_max_age_expired(site, tmp_path, crawl):
+    output = tmp_path / "out"
+    options = {"discovery": "sitemap", "incremental": True}
+    crawl(site, output, crawl_options=options)
+    assert len(list(output.glob("*_chapter_*.md"))) == PAGES
+    assert skipped_by_sitemap(crawl.messages) == 0
+
+    crawl.messages.clear()
+    crawl(site, output, crawl_options=options)
+    assert skipped_by_sitemap(crawl.messages) == PAGES
+
+    # Älter als --max-age: trotz lastmod neu laden
+    time.sleep(0.01)
+    crawl.messages.clear()
+    crawl(site, output, crawl_options={**options, "max_age": 0.001})
+    assert skipped_by_sitemap(crawl.messages) == 0
+    assert not any("Unverändert" in message for message in crawl.messages)
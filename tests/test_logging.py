@@ -0,0 +1,22 @@
+"""
+Eingebettete Nutzung: mit log= landet keine Meldung des Crawls auf stdout, auch nicht im Batch-Modus
+"""
+
+import pytest
+
+from fixture_site import build_site
+from smart_crawler_final import CrawlScheduler
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    return serve_site(build_site(tmp_path / "site", pages=3, page_kb=1, links=2).parent) + "index.html"
+
+
+@pytest.mark.parametrize("shared", [False, True], ids=["crawler", "scheduler"])
+def test_limiter_messages_go_to_log(site, tmp_path, capsys, crawl, shared):
+    # Ein kleiner Abstand zwischen den Requests erzeugt Wartemeldungen des Host-Limiters
+    options = {"scheduler": CrawlScheduler(delay=0.05)} if shared else {"delay": 0.05}
+    crawl(site, tmp_path / "out", **options)
+    assert capsys.readouterr().out == ""
+    assert any("Warte" in message for message in crawl.messages)
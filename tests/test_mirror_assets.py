@@ -0,0 +1,76 @@
+"""
+Asset-Spiegelung: eine HTML-Kopie ohne -c darf keine entfernten Asset-URLs mehr enthalten
+"""
+
+import re
+
+import pytest
+
+PAGE = """<html><head><meta charset="utf-8"><title>Start</title>
+<link href="s.css" rel="stylesheet"/>
+<link rel="icon" href="favicon.ico"/>
+<script src="app.js"></script>
+</head><body><nav class="sidebar"><ul><li><a href="chapter-1.html">1 Kapitel 1</a></li></ul></nav>
+<main><h1>Start</h1><p>Text</p></main></body></html>"""
+
+CHAPTER = """<html><head><meta charset="utf-8"><title>1 Kapitel 1</title>
+<link rel="stylesheet" href="s.css">
+<script src="app.js"></script>
+</head><body><main><h1>1 Kapitel 1</h1><p>Ein Bild: <img src="img/logo.png" alt="Logo"></p>
+<p>Bilder zum Auswählen: <img srcset="img/logo.png 1x, img/logo@2x.png 2x" alt="Logo"></p>
+</main></body></html>"""
+
+STYLESHEET = """@import "theme.css";
+body { background: url(img/bg.png) no-repeat; }
+@font-face { font-family: Text; src: url('fonts/text.woff2#sans') format("woff2"); }
+.data { background: url(data:image/png;base64,AAAA); }
+"""
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    root = tmp_path / "site"
+    (root / "img").mkdir(parents=True)
+    (root / "fonts").mkdir()
+    (root / "index.html").write_text(PAGE, encoding="utf-8")
+    (root / "chapter-1.html").write_text(CHAPTER, encoding="utf-8")
+    (root / "s.css").write_text(STYLESHEET, encoding="utf-8")
+    # Zyklischer Import darf den Crawl nicht blockieren
+    (root / "theme.css").write_text('@import url("s.css");\nh1 { color: red; }\n', encoding="utf-8")
+    (root / "app.js").write_text("console.log('app');\n", encoding="utf-8")
+    for name in ("img/logo.png", "img/logo@2x.png", "img/bg.png", "fonts/text.woff2"):
+        (root / name).write_bytes(name.encode("utf-8"))
+    return serve_site(root)
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"parser": "selectolax"},
+    {"large_page_mb": 0.0001},
+], ids=["bs4", "selectolax", "streaming"])
+def test_html_crawl_leaves_no_remote_assets(site, tmp_path, crawl, options):
+    if options.get("parser") == "selectolax":
+        pytest.importorskip("selectolax")
+    output = tmp_path / "out"
+    crawl(site + "index.html", output, "html", mirror_assets=True, **options)
+
+    documents = [path.read_text(encoding="utf-8") for path in output.glob("*.html")]
+    assert documents
+    for document in documents:
+        # Nur die Quell-URL im Kopfkommentar und das nicht gespiegelte Favicon bleiben absolut
+        body = document.split("\n", 1)[1]
+        remote = [url for url in re.findall(r'(?:src|href|srcset)="([^"]*)"', body) if site in url]
+        assert remote == [site + "favicon.ico"] * ("favicon" in body)
+        assert "__asset_" not in body
+        assert 'href="assets/' in body and 'src="assets/' in body
+
+    stylesheets = [path.read_text(encoding="utf-8") for path in (output / "assets").glob("*.css")]
+    assert len(stylesheets) == 2
+    for stylesheet in stylesheets:
+        assert site not in stylesheet.replace(site + "s.css", "")
+    main_css = next(css for css in stylesheets if "@font-face" in css)
+    assert re.search(r'@import "[0-9a-f]{32}\.css"', main_css)
+    assert re.search(r'url\("[0-9a-f]{32}\.woff2#sans"\)', main_css)
+    assert "url(data:image/png;base64,AAAA)" in main_css
+    for name in re.findall(r'"([0-9a-f]{32}\.[a-z0-9]+)', main_css):
+        assert (output / "assets" / name).exists()
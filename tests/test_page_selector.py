@@ -0,0 +1,48 @@
+"""
+Kapitelauswahl: --filter schränkt zusätzlich zu --include/--exclude ein
+"""
+
+import pytest
+
+from smart_crawler_final import PageSelector
+
+CHAPTERS = [
+    ("https://example.org/book/intro.html", "1", "Einleitung"),
+    ("https://example.org/book/api.html", "2", "API"),
+    ("https://example.org/book/api-advanced.html", "2.1", "API für Fortgeschrittene"),
+    ("https://example.org/book/faq.html", "3", "FAQ"),
+]
+
+
+def selected(selector: PageSelector) -> list:
+    return [title for url, number, title in CHAPTERS if selector.accept(url, number, title)]
+
+
+def test_filter_and_include_both_apply():
+    # Früher ergab --filter ODER --include; jetzt müssen beide passen
+    assert selected(PageSelector(["2-3"], filter_pattern="api")) == ["API", "API für Fortgeschrittene"]
+    assert selected(PageSelector(["1"], filter_pattern="api")) == []
+
+
+def test_filter_alone_and_with_exclude():
+    assert selected(PageSelector(filter_pattern="api|faq")) == ["API", "API für Fortgeschrittene", "FAQ"]
+    assert selected(PageSelector(exclude=["2.1"], filter_pattern="API")) == ["API"]
+
+
+def test_filter_counts_towards_limit():
+    selector = PageSelector(limit=1, filter_pattern="api")
+    assert selected(selector) == ["API"]
+    assert selector.satisfied
+
+
+def test_invalid_filter_is_rejected():
+    with pytest.raises(ValueError):
+        PageSelector(filter_pattern="(")
+
+
+def test_include_regexes_that_cannot_be_merged():
+    # Einzeln gültig, als eine Alternation nicht: gleicher Gruppenname bzw. Inline-Flag
+    assert selected(PageSelector([r"(?P<x>intro)", r"(?P<x>faq)"])) == ["Einleitung", "FAQ"]
+    assert selected(PageSelector(["(?s)advanced", "re:faq"])) == ["API für Fortgeschrittene", "FAQ"]
+    with pytest.raises(ValueError):
+        PageSelector(["intro", "re:("])
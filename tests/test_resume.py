@@ -0,0 +1,67 @@
+"""
+Fortsetzen (--resume): ein abgebrochener Crawl lädt beim zweiten Lauf nur die noch offenen Seiten
+"""
+
+import json
+
+import pytest
+
+from fixture_site import QuietHandler, build_site, chapter_file
+from smart_crawler_final import CrawlJournal, SmartCrawler
+
+PAGES = 6
+INTERRUPT_AFTER = 3
+
+
+class Interrupted(Exception):
+    pass
+
+
+class RecordingHandler(QuietHandler):
+    requested: list = []
+
+    def do_GET(self):
+        self.requested.append(self.path.lstrip("/"))
+        super().do_GET()
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    RecordingHandler.requested = []
+    root = build_site(tmp_path / "site", pages=PAGES, page_kb=1, links=2).parent
+    return serve_site(root, RecordingHandler) + "index.html"
+
+
+def test_resume_fetches_only_unfinished_pages(site, tmp_path, monkeypatch, crawl):
+    output = tmp_path / "out"
+    original = SmartCrawler.save_page
+    saved = []
+
+    async def save_page(self, page, output_path):
+        # Absturz mitten im Lauf: nach einigen gespeicherten Seiten bricht der Crawl ab
+        if len(saved) == INTERRUPT_AFTER:
+            raise Interrupted()
+        saved.append(page.url)
+        return await original(self, page, output_path)
+
+    monkeypatch.setattr(SmartCrawler, "save_page", save_page)
+    with pytest.raises(Interrupted):
+        crawl(site, output)
+    monkeypatch.setattr(SmartCrawler, "save_page", original)
+
+    lines = (output / CrawlJournal.JOURNAL_FILE).read_text(encoding="utf-8").splitlines()
+    done = {entry["filename"] for entry in map(json.loads, lines) if entry["status"] == "done"}
+    assert len(done) == INTERRUPT_AFTER
+
+    RecordingHandler.requested = []
+    crawl.messages.clear()
+    crawl(site, output, crawl_options={"resume": True})
+
+    # Kapitel-Reihenfolge aus dem gespeicherten Status, erledigte Seiten ohne Anfrage
+    assert "index.html" not in RecordingHandler.requested
+    assert sorted(RecordingHandler.requested) == sorted(
+        chapter_file(i) for i in range(1, PAGES + 1) if not any(name.startswith(f"{i}_") for name in done))
+    assert sum("Bereits erledigt" in message for message in crawl.messages) == INTERRUPT_AFTER
+    assert len(list(output.glob("*_Kapitel_*.md"))) == PAGES
+    lines = (output / CrawlJournal.JOURNAL_FILE).read_text(encoding="utf-8").splitlines()
+    assert {entry["status"] for entry in map(json.loads, lines)} == {"done"}
@@ -0,0 +1,110 @@
+"""
+Retry-Policy und Circuit Breaker: Dauerfehler ohne Wiederholung, Drosselung mit Retry-After, Host-Pausen
+"""
+
+import email.utils
+import time
+
+import pytest
+
+from fixture_site import QuietHandler, build_site, chapter_file
+from smart_crawler_final import HostLimiter, RetryPolicy, parse_retry_after
+
+URL = "https://example.org/book/chapter-1.html"
+
+
+def test_permanent_errors_are_not_retried():
+    policy = RetryPolicy(max_retries=3)
+    assert not policy.should_retry(0, 404)
+    assert not policy.should_retry(0, 410)
+    assert policy.should_retry(0, 500) and policy.should_retry(1, 503) and policy.should_retry(0, None)
+    # Der letzte Versuch wird nicht wiederholt
+    assert not policy.should_retry(2, 500)
+
+
+def test_backoff_grows_and_honours_retry_after():
+    policy = RetryPolicy(base_delay=1, max_delay=8, jitter=0.5)
+    for attempt, limit in enumerate([1, 2, 4, 8, 8]):
+        assert limit / 2 <= policy.backoff(attempt) <= limit
+    assert policy.backoff(0, 429, retry_after=30) == 30
+    assert policy.backoff(0, 503, retry_after=10 ** 6) == RetryPolicy.MAX_RETRY_AFTER
+    # Retry-After gilt nur für Drosselung
+    assert policy.backoff(0, 500, retry_after=30) <= 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(None) is None and parse_retry_after("bald") is None
+    date = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= parse_retry_after(date) <= 60
+    assert parse_retry_after(email.utils.formatdate(time.time() - 60, usegmt=True)) == 0
+
+
+def breaker(messages: list, **options) -> HostLimiter:
+    return HostLimiter(breaker_threshold=0.5, breaker_window=10, breaker_cooldown=30, log=messages.append,
+                       **options)
+
+
+def test_breaker_pauses_host_at_error_rate():
+    messages = []
+    limiter = breaker(messages)
+    for _ in range(4):
+        limiter.record(URL, False, 500)
+    assert messages == []
+    limiter.record(URL, False, 500)
+    assert messages == ["🛑 Pausiere example.org für 30s (Fehlerrate 100%)"]
+
+
+def test_breaker_ignores_permanent_errors_and_backs_off(monkeypatch):
+    messages = []
+    limiter = breaker(messages)
+    for _ in range(20):
+        limiter.record(URL, False, 404)
+    assert messages == []
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    for _ in range(5):
+        limiter.record(URL, False, 503)
+    # Die zweite Auslösung in Folge verdoppelt die Pause, sobald die erste abgelaufen ist
+    now += 31
+    for _ in range(5):
+        limiter.record(URL, False, 503)
+    assert [message.split(" für ")[1].split()[0] for message in messages] == ["30s", "60s"]
+
+
+def test_retry_after_pauses_host():
+    messages = []
+    HostLimiter(log=messages.append).record(URL, False, 429, retry_after=12)
+    assert messages == ["🛑 Pausiere example.org für 12s (HTTP 429, Retry-After 12s)"]
+
+
+class FlakyHandler(QuietHandler):
+    """Kapitel 1 fehlt dauerhaft, Kapitel 2 ist beim ersten Abruf überlastet"""
+
+    requested: list = []
+
+    def do_GET(self):
+        path = self.path.lstrip("/")
+        self.requested.append(path)
+        if path == chapter_file(1):
+            self.send_error(404)
+        elif path == chapter_file(2) and self.requested.count(path) == 1:
+            self.send_error(503)
+        else:
+            super().do_GET()
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    FlakyHandler.requested = []
+    root = build_site(tmp_path / "site", pages=3, page_kb=1, links=2).parent
+    return serve_site(root, FlakyHandler) + "index.html"
+
+
+def test_crawl_retries_transient_errors_only(site, tmp_path, crawl):
+    output = tmp_path / "out"
+    crawl(site, output, retry_policy=RetryPolicy(max_retries=3, base_delay=0.01), breaker_threshold=0)
+    assert FlakyHandler.requested.count(chapter_file(1)) == 1
+    assert FlakyHandler.requested.count(chapter_file(2)) == 2
+    assert sorted(path.name.split("_")[0] for path in output.glob("*_Kapitel_*.md")) == ["2", "3"]
@@ -0,0 +1,90 @@
+"""
+Volltextindex: Aufnehmen, unveränderte Seiten überspringen, Bereinigen und Rangfolge der Suche
+"""
+
+import pytest
+
+from fixture_site import build_site
+from smart_crawler_final import SearchIndex
+
+SITE = "/ausgabe/buch"
+
+
+def entry(i: int, title: str) -> dict:
+    return {"url": f"https://example.org/chapter-{i}.html", "filename": f"{i}_chapter_{i}.md",
+            "chapter_number": str(i), "title": title, "index": i}
+
+
+@pytest.fixture
+def index(tmp_path):
+    search_index = SearchIndex(str(tmp_path / "search.db"))
+    yield search_index
+    search_index.close()
+
+
+def test_update_skips_unchanged_and_reindexes_changes(index):
+    assert index.update(SITE, entry(1, "Dateien"), "Wir lesen eine Tabelle ein.", "md")
+    assert not index.update(SITE, entry(1, "Dateien"), "Wir lesen eine Tabelle ein.", "md")
+    assert (index.updated, index.unchanged) == (1, 1)
+
+    index.update(SITE, entry(1, "Dateien"), "Jetzt geht es um Diagramme.", "md")
+    index.commit()
+    assert index.search("Tabelle") == []
+    assert [hit["url"] for hit in index.search("Diagramme")] == [entry(1, "")["url"]]
+
+
+def test_title_ranks_before_body_and_snippet_marks_match(index):
+    index.update(SITE, entry(1, "Einleitung"), "Hier taucht Pandas nur einmal nebenbei auf.", "md")
+    index.update(SITE, entry(2, "Pandas"), "Ein Kapitel über Datenrahmen.", "md")
+    index.commit()
+
+    hits = index.search("pandas")
+    assert [hit["chapter_number"] for hit in hits] == ["2", "1"]
+    assert "»Pandas«" in hits[1]["snippet"]
+    # Linkziele und HTML-Kommentare werden nicht indiziert
+    index.update(SITE, entry(3, "Links"), "<!-- https://example.org/geheim -->[Verweis](zielseite.html)", "md")
+    index.commit()
+    assert index.search("zielseite") == [] and index.search("geheim") == []
+    assert [hit["title"] for hit in index.search("Verweis")] == ["Links"]
+
+
+def test_invalid_fts_syntax_falls_back_to_phrases(index):
+    index.update(SITE, entry(1, "Operatoren"), 'Der Ausdruck "a AND" (b ist kaputt.', "md")
+    index.commit()
+
+    assert [hit["title"] for hit in index.search('"a AND" (b')] == ["Operatoren"]
+    assert index.search("ausdruck NOT kaputt") == []
+
+
+def test_prune_removes_only_missing_pages_of_site(index):
+    for i in range(1, 4):
+        index.update(SITE, entry(i, f"Kapitel {i}"), f"Gemeinsamer Text {i}", "md")
+    index.update("/ausgabe/anderes", entry(9, "Fremd"), "Gemeinsamer Text", "md")
+
+    assert index.prune(SITE, [entry(1, "")["url"], entry(3, "")["url"]]) == 1
+    assert sorted(hit["chapter_number"] for hit in index.search("gemeinsamer")) == ["1", "3", "9"]
+    assert index.indexed_hash(SITE, entry(2, "")["url"]) is None
+    assert index.search("gemeinsamer", site="anderes")[0]["title"] == "Fremd"
+
+
+def test_crawl_updates_and_prunes_index(tmp_path, serve_site, crawl):
+    base_url = serve_site(build_site(tmp_path / "site", pages=6, page_kb=2, links=0).parent)
+    search_index = SearchIndex(str(tmp_path / "search.db"))
+    output = tmp_path / "out"
+    site = str(output.resolve())
+    try:
+        crawl(base_url + "index.html", output, search_index=search_index)
+        first = search_index.updated
+        assert first == 6
+        assert len(search_index.search("Kapitel", limit=20, site=site)) == 6
+
+        # Unveränderter zweiter Lauf indiziert nichts neu
+        crawl(base_url + "index.html", output, search_index=search_index)
+        assert (search_index.updated, search_index.unchanged) == (first, 6)
+
+        # Lauf mit weniger Kapiteln: die fehlenden fliegen raus
+        crawl(base_url + "index.html", output, crawl_options={"max_pages": 4}, search_index=search_index)
+        hits = search_index.search("Kapitel", limit=20, site=site)
+        assert sorted(hit["chapter_number"] for hit in hits) == ["1", "2", "3", "4"]
+    finally:
+        search_index.close()
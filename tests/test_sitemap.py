@@ -0,0 +1,61 @@
+"""
+Kapitel aus robots.txt und Sitemaps: Sitemap-Index, gzip, robots-Sperren, Crawl-delay und Pfadfilter
+"""
+
+import gzip
+
+import pytest
+
+from smart_crawler_final import PageSelector, SmartCrawler
+
+URLSET = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{}</urlset>"""
+
+
+def urlset(urls) -> str:
+    return URLSET.format("".join(f"<url><loc>{url}</loc></url>" for url in urls))
+
+
+@pytest.fixture
+def site(tmp_path, serve_site):
+    root = tmp_path / "site"
+    (root / "docs").mkdir(parents=True)
+    base_url = serve_site(root)
+    (root / "robots.txt").write_text(
+        f"User-agent: *\nDisallow: /docs/private-\nCrawl-delay: 2\nSitemap: {base_url}sitemap-index.xml\n",
+        encoding="utf-8")
+    (root / "sitemap-index.xml").write_text(
+        '<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        "<sitemap><loc>sitemap-a.xml</loc></sitemap><sitemap><loc>sitemap-b.xml.gz</loc></sitemap>"
+        "</sitemapindex>", encoding="utf-8")
+    (root / "sitemap-a.xml").write_text(urlset([
+        f"{base_url}docs/chapter-2.html",
+        f"{base_url}docs/chapter-1.html#anker",
+        f"{base_url}docs/private-notes.html",   # robots.txt
+        f"{base_url}blog/chapter-9.html",       # außerhalb von /docs/
+        "https://example.org/docs/chapter-8.html",  # fremder Host
+        f"{base_url}docs/handbuch.pdf",          # keine Seite
+    ]), encoding="utf-8")
+    (root / "sitemap-b.xml.gz").write_bytes(gzip.compress(urlset([
+        f"{base_url}docs/chapter-3.html",
+        f"{base_url}docs/chapter-1.html",        # doppelt
+    ]).encode("utf-8")))
+    return base_url
+
+
+def test_sitemap_discovery_filters_and_follows_index(site):
+    messages = []
+    crawler = SmartCrawler(engine="http", log=messages.append)
+    chapters = crawler.discover_sitemap(site + "docs/index.html")
+
+    assert [url.rsplit("/", 1)[1] for url, _, _ in chapters] == [
+        "chapter-1.html", "chapter-2.html", "chapter-3.html"]
+    assert [number for _, number, _ in chapters] == ["1", "2", "3"]
+    assert any("3 Seiten aus 3 Sitemaps, 1 durch robots.txt gesperrt" in message for message in messages)
+    assert any("Crawl-delay 2" in message for message in messages)
+
+
+def test_sitemap_discovery_stops_at_limit(site):
+    crawler = SmartCrawler(engine="http", log=lambda *args, **kwargs: None)
+    chapters = crawler.discover_sitemap(site + "docs/index.html", PageSelector(limit=2))
+    assert len(chapters) == 2
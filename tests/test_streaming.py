@@ -0,0 +1,56 @@
+"""
+Speicherarmer Modus: render_page_streaming liefert dasselbe Markdown wie render_page
+"""
+
+import pytest
+
+import smart_crawler_final
+from smart_crawler_final import LinkIndex, MarkdownStream, SmartCrawler, render_page, render_page_streaming
+
+PAGES = 20
+CHAPTERS = [(f"https://example.org/book/chapter-{i}.html", str(i), f"Kapitel {i}") for i in range(1, PAGES + 1)]
+
+
+def rich_page(sections: int = 150) -> str:
+    """Seite mit allem, was html2text Zustand kostet: Listen, Code, Zitate, Tabellen, Links, Entitäten"""
+    blocks = []
+    for j in range(sections):
+        target = j % PAGES + 1
+        blocks.append(
+            f'<h2 id="s{j}">Abschnitt {j} <a href="chapter-{target}.html#x">Link</a></h2>'
+            f'<p>Text mit <em>Betonung</em>, <strong>fett</strong>, <code>code()</code> &amp; Entitäten&nbsp;hier '
+            f'&lt;tag&gt; und &#8364; sowie <a href="chapter-{(j * 7) % PAGES + 1}.html">Kapitel</a>.<br>Zeile</p>'
+            f'<ul><li>Punkt<ul><li>verschachtelt <a href="https://other.org/x">extern</a></li></ul></li>'
+            f'<li>Punkt zwei</li></ul><ol><li>erstens</li><li>zweitens</li></ol>'
+            f'<pre><code>def f(x):\n    return x * {j}\n\nprint(f(2))</code></pre>'
+            f'<blockquote><p>Zitat {j}</p><p>zweiter Absatz</p></blockquote>'
+            f'<table><tr><th>A</th><th>B</th></tr><tr><td>{j}</td><td>x</td></tr></table>'
+            f'<div><div><p>tief verschachtelt {j}</p></div></div><img src="img/{j}.png" alt="Bild {j}"><hr>')
+    sidebar = "".join(f'<li><a href="chapter-{i}.html">{i}</a></li>' for i in range(1, PAGES + 1))
+    return (f'<html><head><title>T</title><script>var a = 1;</script><style>p {{}}</style></head>'
+            f'<body><nav class="sidebar"><ul>{sidebar}</ul></nav><main><h1>Titel</h1>{"".join(blocks)}</main>'
+            f'</body></html>')
+
+
+@pytest.mark.parametrize("incremental", [True, False], ids=["incremental", "fallback"])
+@pytest.mark.parametrize("clean_output", [False, True], ids=["raw", "clean"])
+def test_streaming_markdown_matches_render_page(tmp_path, monkeypatch, clean_output, incremental):
+    # Kleine Happen, damit Schnitte mitten in Listen, Code und Links landen
+    monkeypatch.setattr(smart_crawler_final, "STREAM_CHUNK_CHARS", 4093)
+    if not incremental:
+        original = MarkdownStream.__init__
+
+        def without_internals(self):
+            original(self)
+            self.incremental = False
+        monkeypatch.setattr(MarkdownStream, "__init__", without_internals)
+
+    html = rich_page()
+    url = CHAPTERS[0][0]
+    link_index = LinkIndex(CHAPTERS, 'md', SmartCrawler().generate_filename)
+    expected = render_page(html, url, 'md', True, clean_output, link_index)
+    path = tmp_path / "seite.md"
+    size, _ = render_page_streaming(html, url, 'md', True, clean_output, link_index, path)
+
+    assert path.read_text(encoding="utf-8") == expected
+    assert size == len(expected.encode("utf-8"))